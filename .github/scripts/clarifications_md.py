@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""Incremental maintenance of clarifications.md
+
+Every question block written to clarifications.md carries the fingerprint of
+the spec.md marker it came from, as an HTML comment (invisible when rendered):
+
+    ## Question 3: Data retention
+    <!-- clarification: 1f2e3d4c5b6a7988 -->
+
+The fingerprint hashes the marker's section header and question text. On the
+next run the markers found by spec_scanner are fingerprinted again and only
+added (or changed - same thing, a new fingerprint) markers are extracted; blocks
+of removed markers are dropped and unchanged blocks are kept verbatim,
+including any Answer / ADO Issue fields filled in since. The first run extracts
+whole sections and files each question under the marker it matches best
+(assign_fingerprints).
+"""
+
+import hashlib
+import re
+from difflib import SequenceMatcher
+from dataclasses import dataclass, field
+
+_FINGERPRINT_RE = re.compile(r'<!--\s*clarification:\s*([0-9a-f]+)\s*-->')
+_QUESTION_HEADING_RE = re.compile(r'^## Question \d+:', re.MULTILINE)
+_FOOTER_RE = re.compile(r'^## Resolution Notes', re.MULTILINE)
+_TOTAL_RE = re.compile(r'(\*\*Total Questions\*\*:\s*)\d+')
+
+
+def fingerprint_markers(records: list[dict]) -> list[str]:
+    """Fingerprint spec_scanner records by section + question text
+
+    A question repeated in the same section gets an occurrence suffix so every
+    marker has a distinct fingerprint.
+    """
+    fingerprints = []
+    seen = {}
+    for record in records:
+        digest = hashlib.sha256(f"{record['section']}\x00{record['question']}".encode()).hexdigest()[:16]
+        occurrence = seen.get(digest, 0)
+        seen[digest] = occurrence + 1
+        fingerprints.append(digest if occurrence == 0 else f"{digest}{occurrence:x}")
+    return fingerprints
+
+
+def _normalize(text: str) -> str:
+    return ' '.join(re.sub(r'[^\w\s]', ' ', (text or '').lower()).split())
+
+
+def assign_fingerprints(questions: list[dict], records: list[dict], fingerprints: list[str]) -> list[dict]:
+    """File questions from a full (section chunk) extraction under spec_scanner markers
+
+    Each question gets the fingerprint of the marker whose question text (or
+    topic) it resembles most, so the next incremental run recognizes it.
+
+    Returns:
+        Copies of the questions with a ``fingerprint`` key
+    """
+    if not records:
+        return [dict(question) for question in questions]
+    targets = [(_normalize(record['question']), _normalize(record.get('topic'))) for record in records]
+    assigned = []
+    for question in questions:
+        text, topic = _normalize(question.get('question')), _normalize(question.get('topic'))
+        scores = [
+            max(SequenceMatcher(None, text, target_text).ratio(), SequenceMatcher(None, topic, target_topic).ratio())
+            for target_text, target_topic in targets
+        ]
+        best = max(range(len(scores)), key=scores.__getitem__)
+        assigned.append({**question, 'fingerprint': fingerprints[best]})
+    return assigned
+
+
+def fingerprint_comment(fingerprint: str) -> str:
+    return f"<!-- clarification: {fingerprint} -->"
+
+
+@dataclass
+class ClarificationsDoc:
+    """clarifications.md split into header, question blocks and footer"""
+    header: str
+    blocks: list[tuple[str | None, str]] = field(default_factory=list)  # (fingerprint, block text)
+    footer: str = ""
+
+    def fingerprints(self) -> set[str]:
+        return {fingerprint for fingerprint, _ in self.blocks if fingerprint}
+
+
+def parse_clarifications(content: str) -> ClarificationsDoc:
+    """Split an existing clarifications.md on its "## Question N:" headings"""
+    footer_match = _FOOTER_RE.search(content)
+    body_end = footer_match.start() if footer_match else len(content)
+    starts = [m.start() for m in _QUESTION_HEADING_RE.finditer(content, 0, body_end)]
+    if not starts:
+        return ClarificationsDoc(header=content[:body_end], footer=content[body_end:])
+
+    doc = ClarificationsDoc(header=content[:starts[0]], footer=content[body_end:])
+    for start, end in zip(starts, starts[1:] + [body_end]):
+        block = content[start:end]
+        match = _FINGERPRINT_RE.search(block)
+        doc.blocks.append((match.group(1) if match else None, block))
+    return doc
+
+
+def patch_clarifications(doc: ClarificationsDoc, fingerprints: list[str], new_blocks: dict[str, list[str]]) -> str:
+    """Rebuild clarifications.md in spec order from kept and new question blocks
+
+    Args:
+        doc: Parsed previous clarifications.md
+        fingerprints: Current markers' fingerprints, in spec order
+        new_blocks: Freshly generated blocks for added markers (a marker may
+            yield several questions, or none)
+
+    Returns:
+        The patched document; questions are renumbered and the total updated
+    """
+    kept: dict[str, list[str]] = {}
+    for fingerprint, block in doc.blocks:
+        if fingerprint:
+            kept.setdefault(fingerprint, []).append(block)
+
+    blocks = []
+    for fingerprint in fingerprints:
+        blocks.extend(new_blocks[fingerprint] if fingerprint in new_blocks else kept.get(fingerprint, []))
+
+    body = ''.join(
+        _QUESTION_HEADING_RE.sub(f"## Question {number}:", block, count=1)
+        for number, block in enumerate(blocks, 1)
+    )
+    header = _TOTAL_RE.sub(lambda m: f"{m.group(1)}{len(blocks)}", doc.header, count=1)
+    return header + body + doc.footer
@@ -6,84 +6,99 @@ import sys
 import os
 import json
 import hashlib
+import random
 import re
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
-# Try to import html2text for HTML to markdown conversion
-try:
-    import html2text
-    HTML2TEXT_AVAILABLE = True
-except ImportError:
-    HTML2TEXT_AVAILABLE = False
-
 # Add function_app to path for ado_client import
 GITHUB_WORKSPACE = os.getenv("GITHUB_WORKSPACE", ".")
 sys.path.insert(0, os.path.join(GITHUB_WORKSPACE, "function_app"))
 
 try:
-    from ado_client import create_issue_workitem
+    from ado_client import create_issue_if_missing, create_issue_workitem, get_existing_idempotency_keys
+    from html_markdown import html_to_markdown
 except ImportError:
     print("❌ Error: Could not import ado_client. Make sure function_app is in the path.", file=sys.stderr)
     sys.exit(1)
 
+from llm_cache import cache_key, get_llm_cache
 
-def convert_html_to_markdown(html_text: str) -> str:
-    """Convert HTML to markdown format
-    
-    If html2text is available, use it. Otherwise, do basic conversion.
-    """
-    if HTML2TEXT_AVAILABLE:
-        h = html2text.HTML2Text()
-        h.ignore_links = False
-        h.ignore_images = False
-        h.body_width = 0  # Don't wrap lines
-        markdown = h.handle(html_text)
-        return markdown.strip()
+# LLM concurrency: questions are prepared in parallel, at most LLM_MAX_IN_FLIGHT requests at once
+LLM_MAX_IN_FLIGHT = int(os.getenv("LLM_MAX_IN_FLIGHT", "4"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "5"))
+LLM_BACKOFF_BASE_SECONDS = 1.0
+LLM_BACKOFF_MAX_SECONDS = 30.0
+
+_llm_slots = threading.BoundedSemaphore(LLM_MAX_IN_FLIGHT)
+
+
+def configure_llm_concurrency(max_in_flight: int) -> None:
+    """Resize the in-flight LLM request limit (call before starting workers)"""
+    global _llm_slots
+    _llm_slots = threading.BoundedSemaphore(max(1, max_in_flight))
+
+# Per-thread output buffer so concurrent questions print in question order
+_output = threading.local()
+
+
+def log(message: str = "", error: bool = False) -> None:
+    """Print, or buffer when called from a question worker (flushed in question order)"""
+    buffer = getattr(_output, "buffer", None)
+    if buffer is not None:
+        buffer.append((error, message))
     else:
-        # Basic HTML to markdown conversion without library
-        # Remove HTML tags but preserve structure
-        text = html_text
-        
-        # Convert <br/> and <br> to newlines
-        text = re.sub(r'<br\s*/?>', '\n', text, flags=re.IGNORECASE)
-        
-        # Convert <p> tags to double newlines
-        text = re.sub(r'<p[^>]*>', '\n\n', text, flags=re.IGNORECASE)
-        text = re.sub(r'</p>', '\n', text, flags=re.IGNORECASE)
-        
-        # Convert <strong> and <b> to **
-        text = re.sub(r'<(strong|b)[^>]*>', '**', text, flags=re.IGNORECASE)
-        text = re.sub(r'</(strong|b)>', '**', text, flags=re.IGNORECASE)
-        
-        # Convert <em> and <i> to *
-        text = re.sub(r'<(em|i)[^>]*>', '*', text, flags=re.IGNORECASE)
-        text = re.sub(r'</(em|i)>', '*', text, flags=re.IGNORECASE)
-        
-        # Convert <h1> to #
-        text = re.sub(r'<h1[^>]*>', '# ', text, flags=re.IGNORECASE)
-        text = re.sub(r'</h1>', '\n', text, flags=re.IGNORECASE)
-        
-        # Convert <h2> to ##
-        text = re.sub(r'<h2[^>]*>', '## ', text, flags=re.IGNORECASE)
-        text = re.sub(r'</h2>', '\n', text, flags=re.IGNORECASE)
-        
-        # Convert <h3> to ###
-        text = re.sub(r'<h3[^>]*>', '### ', text, flags=re.IGNORECASE)
-        text = re.sub(r'</h3>', '\n', text, flags=re.IGNORECASE)
-        
-        # Convert <ul><li> to markdown list
-        text = re.sub(r'<ul[^>]*>', '\n', text, flags=re.IGNORECASE)
-        text = re.sub(r'</ul>', '\n', text, flags=re.IGNORECASE)
-        text = re.sub(r'<li[^>]*>', '- ', text, flags=re.IGNORECASE)
-        text = re.sub(r'</li>', '\n', text, flags=re.IGNORECASE)
-        
-        # Remove remaining HTML tags
-        text = re.sub(r'<[^>]+>', '', text)
-        
-        # Clean up multiple newlines
-        text = re.sub(r'\n{3,}', '\n\n', text)
-        
-        return text.strip()
+        print(message, file=sys.stderr if error else sys.stdout)
+
+
+def flush_log(buffer: list) -> None:
+    """Print a question's buffered output"""
+    for error, message in buffer:
+        print(message, file=sys.stderr if error else sys.stdout)
+
+
+def _retry_after_seconds(exc) -> float | None:
+    """Server-requested wait from an OpenAI error's response headers, if any"""
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    for header in ("retry-after-ms", "retry-after"):
+        value = headers.get(header)
+        if value:
+            try:
+                seconds = float(value)
+                return seconds / 1000 if header == "retry-after-ms" else seconds
+            except ValueError:
+                continue
+    return None
+
+
+def chat_completion(client, **kwargs):
+    """chat.completions.create bounded by LLM_MAX_IN_FLIGHT, with 429/5xx-aware backoff
+
+    Honors Retry-After from Azure OpenAI; otherwise jittered exponential backoff.
+    The slot is released while sleeping so other questions keep the pipe full.
+    """
+    for attempt in range(LLM_MAX_RETRIES + 1):
+        with _llm_slots:
+            try:
+                return client.chat.completions.create(**kwargs)
+            except Exception as e:
+                status = getattr(e, "status_code", None)
+                if status not in (429, 500, 502, 503, 504) or attempt == LLM_MAX_RETRIES:
+                    raise
+                delay = _retry_after_seconds(e)
+                if delay is None:
+                    delay = min(LLM_BACKOFF_MAX_SECONDS, LLM_BACKOFF_BASE_SECONDS * 2 ** attempt) * random.uniform(0.5, 1.0)
+        log(f"⏳ LLM HTTP {status} - retrying in {delay:.1f}s (attempt {attempt + 2}/{LLM_MAX_RETRIES + 1})", error=True)
+        time.sleep(delay)
+
+
+def convert_html_to_markdown(html_text: str) -> str:
+    """Convert HTML to markdown format (shared single-pass converter, function_app/html_markdown.py)"""
+    return html_to_markdown(html_text)
 
 
 def validate_and_fix_markdown(markdown_text: str) -> tuple[str, list[str]]:
@@ -252,7 +267,7 @@ def convert_table_to_markdown(table_text: str) -> str:
     return '\n'.join(options) if options else table_text
 
 
-def build_description(
+def build_raw_description(
     question_num: int,
     topic: str,
     question_text: str,
@@ -260,12 +275,9 @@ def build_description(
     answer_options: str,
     recommended_option: str = None,
     suggested_answer: str = None,
-    branch_name: str = None,
-    use_llm: bool = False,
-    api_key: str = None,
-    client=None
+    branch_name: str = None
 ) -> str:
-    """Build ADO Issue description with optional LLM formatting"""
+    """Build the unformatted ADO Issue description markdown"""
     
     # Build raw description parts
     raw_description_parts = [
@@ -308,12 +320,61 @@ def build_description(
     if branch_name:
         raw_description_parts.append(f"**Branch**: {branch_name}\n")
     
-    raw_description = ''.join(raw_description_parts)
-    
-    # Use LLM to clean and fix markdown if available
-    if use_llm and api_key and client:
-        try:
-            fix_prompt = f"""Clean and fix this ADO work item description markdown for Azure DevOps. Requirements:
+    return ''.join(raw_description_parts)
+
+
+# "Question 2:", "Q2:", "Q2 -", "#2.", "2)" - repeated prefixes are all stripped
+_TOPIC_PREFIX_PATTERN = re.compile(r'^\s*(?:(?:question|q)\s*#?\s*\d+|#?\s*\d+)\s*[:.)\-–—]\s*', re.IGNORECASE)
+_TOPIC_MARKUP_PATTERN = re.compile(r'^[#>*_`\s]+|[*_`\s]+$')
+TOPIC_MAX_CHARS = 200
+
+
+def clean_topic_locally(topic: str) -> str | None:
+    """Strip "Question N:" style prefixes and markdown markers from a topic
+
+    Returns:
+        The clean topic, or None when the result does not look like a title
+        (empty, multi-line, too long) and the LLM should decide instead
+    """
+    clean = (topic or "").strip()
+    while True:
+        stripped = _TOPIC_MARKUP_PATTERN.sub('', clean)
+        stripped = _TOPIC_PREFIX_PATTERN.sub('', stripped, count=1)
+        if stripped == clean:
+            break
+        clean = stripped
+    
+    if not clean or '\n' in clean or len(clean) > TOPIC_MAX_CHARS:
+        return None
+    # Anything left that still looks like markup or a table row needs the LLM
+    if clean.startswith('|') or re.search(r'<[a-zA-Z/][^>]*>', clean):
+        return None
+    return clean
+
+
+def _strip_code_fences(text: str) -> str:
+    """Remove a surrounding ``` fence the LLM sometimes adds"""
+    if text.startswith("```"):
+        lines = text.split('\n')
+        if lines and lines[0].strip().startswith("```"):
+            lines = lines[1:]
+        if lines and lines[-1].strip() == "```":
+            lines = lines[:-1]
+        text = '\n'.join(lines).strip()
+    return text
+
+
+def format_with_llm(raw_description: str, client, topic: str = None) -> tuple[str, str | None]:
+    """Format the description - and, when topic is given, clean the title - in one LLM call
+
+    With a topic the model is asked for a JSON object {"title", "description"}
+    (structured output); without one it returns the markdown directly.
+
+    Returns:
+        (description, title) - description falls back to raw_description and
+        title to None when the response is unusable
+    """
+    requirements = """Requirements:
 1. Remove duplicate "Question N:" text from the heading (e.g., "Question 2: Question 2: Topic" should become "Question 2: Topic")
 2. Ensure all markdown syntax is correct and will render properly in Azure DevOps
 3. Convert any markdown tables to list format - Azure DevOps work items don't render tables well. Convert tables like this:
@@ -326,84 +387,235 @@ def build_description(
 5. Improve readability:
    - Use proper markdown formatting (bold, italic where appropriate)
    - Break long lines if needed
-6. Keep all content intact, just improve formatting and readability
+6. Keep all content intact, just improve formatting and readability"""
+    system_prompt = "You are a markdown formatter for Azure DevOps work items. Your job is to:\n1. Convert markdown tables to list format - Azure DevOps work items don't render tables well, so convert tables to bullet lists with bold option labels\n2. Improve readability with proper spacing and line breaks\n3. Remove duplicate text\n4. Ensure all markdown syntax is valid for Azure DevOps\n"
+    
+    request = {}
+    if topic is not None:
+        user_template = f"""Clean and fix this ADO work item description markdown for Azure DevOps, and extract a clean, concise title. {requirements}
+
+Title rules: take the topic below, remove any "Question N:" prefix and markdown markers, return only the topic text.
+
+Topic: {{topic}}
 
 Raw description:
-{raw_description}
+{{raw_description}}
+
+Return a JSON object with exactly two string fields: "title" (the clean topic) and "description" (the cleaned and fixed markdown description, no code blocks)."""
+        system_prompt += 'Respond with a JSON object {"title": ..., "description": ...} and nothing else.'
+        request["response_format"] = {"type": "json_object"}
+    else:
+        user_template = f"""Clean and fix this ADO work item description markdown for Azure DevOps. {requirements}
+
+Raw description:
+{{raw_description}}
 
 Return ONLY the cleaned and fixed markdown description, no code blocks, no explanation."""
-            
-            response = client.chat.completions.create(
+        system_prompt += "Return only the fixed markdown text, no code blocks, no explanation."
+    
+    fix_prompt = user_template.replace("{topic}", topic or "").replace("{raw_description}", raw_description)
+    
+    # Keyed on the prompt templates (inputs left out), the model and the inputs
+    llm_cache = get_llm_cache()
+    key = cache_key(system_prompt + user_template, "gpt-5-nano", raw_description, topic)
+    content = llm_cache.get(key)
+    cached = content is not None
+    if cached:
+        log(f"🗄️  Using cached LLM response")
+    else:
+        try:
+            response = chat_completion(
+                client,
                 model="gpt-5-nano",
                 messages=[
-                    {"role": "system", "content": "You are a markdown formatter for Azure DevOps work items. Your job is to:\n1. Convert markdown tables to list format - Azure DevOps work items don't render tables well, so convert tables to bullet lists with bold option labels\n2. Improve readability with proper spacing and line breaks\n3. Remove duplicate text\n4. Ensure all markdown syntax is valid for Azure DevOps\nReturn only the fixed markdown text, no code blocks, no explanation."},
+                    {"role": "system", "content": system_prompt},
                     {"role": "user", "content": fix_prompt}
                 ],
                 max_completion_tokens=4000,
-                extra_query={'api-version': '2025-01-01-preview'}
+                extra_query={'api-version': '2025-01-01-preview'},
+                **request
             )
-            
-            description = response.choices[0].message.content.strip()
-            
-            # Remove markdown code fences if LLM added them
-            if description.startswith("```"):
-                lines = description.split('\n')
-                if lines and lines[0].strip().startswith("```"):
-                    lines = lines[1:]
-                if lines and lines[-1].strip() == "```":
-                    lines = lines[:-1]
-                description = '\n'.join(lines).strip()
-            
-            # Validate LLM response - if empty or whitespace-only, fallback to raw
-            if not description or not description.strip():
-                print(f"⚠️  LLM returned empty description, using raw description", file=sys.stderr)
-                return raw_description
-            
-            # Check if LLM response has meaningful content (at least a header or some text)
-            if len(description.strip()) < 10:
-                print(f"⚠️  LLM returned very short description ({len(description)} chars), using raw description", file=sys.stderr)
-                return raw_description
-            
-            # Check if LLM stripped all newlines (raw_description has them, but LLM response doesn't)
-            # This indicates LLM broke the formatting
-            if '\n' not in description and '\n' in raw_description:
-                print(f"⚠️  LLM stripped all newlines (raw had {raw_description.count(chr(10))} newlines), using raw description", file=sys.stderr)
-                return raw_description
-            
-            print(f"✅ Cleaned and fixed markdown using LLM")
-            return description
-            
+            content = _strip_code_fences((response.choices[0].message.content or "").strip())
         except Exception as e:
-            print(f"⚠️  Could not fix markdown with LLM: {e}, using original", file=sys.stderr)
-            # Fallback to raw description
-            return raw_description
-    else:
-        # No LLM, return raw description
-        return raw_description
+            log(f"⚠️  Could not fix markdown with LLM: {e}, using original", error=True)
+            return raw_description, None
+    
+    title = None
+    description = content
+    if topic is not None:
+        try:
+            parsed = json.loads(content)
+        except ValueError:
+            parsed = None
+        if not isinstance(parsed, dict):
+            log(f"⚠️  LLM did not return a JSON object, using raw description", error=True)
+            return raw_description, None
+        description = parsed.get("description") if isinstance(parsed.get("description"), str) else ""
+        description = _strip_code_fences(description.strip())
+        if isinstance(parsed.get("title"), str):
+            # The model's title goes through the same local rules as a fast-path title
+            title = clean_topic_locally(parsed["title"])
+    
+    # Validate LLM response - if empty or whitespace-only, fallback to raw
+    if not description or not description.strip():
+        log(f"⚠️  LLM returned empty description, using raw description", error=True)
+        return raw_description, title
+    
+    # Check if LLM response has meaningful content (at least a header or some text)
+    if len(description.strip()) < 10:
+        log(f"⚠️  LLM returned very short description ({len(description)} chars), using raw description", error=True)
+        return raw_description, title
+    
+    # Check if LLM stripped all newlines (raw_description has them, but LLM response doesn't)
+    # This indicates LLM broke the formatting
+    if '\n' not in description and '\n' in raw_description:
+        log(f"⚠️  LLM stripped all newlines (raw had {raw_description.count(chr(10))} newlines), using raw description", error=True)
+        return raw_description, title
+    
+    # Only responses that passed validation are worth replaying
+    if not cached:
+        llm_cache.set(key, content, model="gpt-5-nano")
+    log(f"✅ Cleaned and fixed markdown using LLM")
+    return description, title
+
 
+def prepare_issue(i: int, q: dict, args, api_key: str, client) -> dict:
+    """Build the title, description and idempotency key for one question
 
-def clean_topic_with_llm(topic: str, api_key: str, client) -> str:
-    """Extract clean topic using LLM"""
+    Returns:
+        dict with question_num, title, description, idempotency_key (description
+        is empty when it could not be built)
+    """
+    topic = q.get('topic', f'Question {i}').strip()
+    question_text = q.get('question', '').strip()
+    context = q.get('context', '').strip()
+    answer_options = q.get('answer_options', '').strip()
+    recommended_option = q.get('recommended_option', '').strip() if q.get('recommended_option') else None
+    suggested_answer = q.get('suggested_answer', '').strip() if q.get('suggested_answer') else None
+    
+    log(f"\n📝 Processing Question {i}: {topic}")
+    
+    # Generate idempotency key
+    question_hash = hashlib.sha256(question_text.encode()).hexdigest()[:8]
+    idempotency_key = f"{args.feature_id}-{question_hash}"
+    
+    # Clean title locally when the topic is already plain text; only an
+    # unusual topic is left to the LLM, in the same call as the description
+    clean_topic = clean_topic_locally(topic)
+    
+    description = build_raw_description(
+        question_num=i,
+        topic=clean_topic or topic,
+        question_text=question_text,
+        context=context,
+        answer_options=answer_options,
+        recommended_option=recommended_option,
+        suggested_answer=suggested_answer,
+        branch_name=args.branch
+    )
+    
+    if api_key and client:
+        description, llm_topic = format_with_llm(description, client, topic=None if clean_topic else topic)
+        clean_topic = clean_topic or llm_topic
+    clean_topic = clean_topic or topic
+    
+    # Check if description contains HTML (from previous conversions)
+    # If it does, convert to markdown first
+    if '<' in description and '>' in description and not description.strip().startswith('#'):
+        # Looks like HTML, convert to markdown
+        log(f"🔄 Converting HTML to markdown...")
+        description = convert_html_to_markdown(description)
+    
+    # Validate and fix markdown before sending to Azure DevOps
+    validated_description, warnings = validate_and_fix_markdown(description)
+    
+    if warnings:
+        log(f"⚠️  Markdown validation warnings:")
+        for warning in warnings:
+            log(f"   - {warning}")
+    
+    # Azure DevOps now supports markdown (2025) via /multilineFieldsFormat API
+    # Send pure markdown - ado_client.py will set the format to Markdown
+    return {
+        "question_num": i,
+        "title": f"Q{i}: {clean_topic}",
+        "description": validated_description,
+        "tags": "clarification; auto-generated",
+        "idempotency_key": idempotency_key,
+    }
+
+
+def prepare_issue_buffered(i: int, q: dict, args, api_key: str, client) -> tuple[dict | None, list, dict | None]:
+    """Run prepare_issue on a worker thread with its output captured
+
+    Returns:
+        (issue, buffered_output, failure_result) - exactly one of issue /
+        failure_result is set
+    """
+    _output.buffer = []
     try:
-        title_prompt = f"""Extract a clean, concise topic from this text. Remove any "Question N:" prefix. Return only the topic text, nothing else.
-
-Text: {topic}
-
-Topic:"""
-        title_response = client.chat.completions.create(
-            model="gpt-5-nano",
-            messages=[
-                {"role": "system", "content": "Extract clean topic text. Remove 'Question N:' prefixes. Return only the topic."},
-                {"role": "user", "content": title_prompt}
-            ],
-            max_completion_tokens=100,
-            extra_query={'api-version': '2025-01-01-preview'}
-        )
-        clean_topic = title_response.choices[0].message.content.strip()
-        return clean_topic if clean_topic else topic
-    except Exception as e:
-        print(f"⚠️  Could not clean topic with LLM: {e}, using original", file=sys.stderr)
-        return topic
+        try:
+            issue = prepare_issue(i, q, args, api_key, client)
+        except Exception as e:
+            log(f"❌ Exception preparing Issue for Question {i}: {e}", error=True)
+            log(traceback.format_exc().rstrip(), error=True)
+            # Continue with next question instead of failing entire script
+            return None, _output.buffer, {"question_num": i, "title": q.get('topic', f'Question {i}'), "status": "failed", "id": None}
+        
+        # Final validation: ensure description is not empty
+        if not issue["description"] or not issue["description"].strip():
+            log(f"❌ Error: Final description is empty for Question {i}, skipping issue creation", error=True)
+            return None, _output.buffer, {**issue, "status": "failed", "id": None}
+        return issue, _output.buffer, None
+    finally:
+        _output.buffer = None
+
+
+def print_results_table(results: list[dict]) -> None:
+    """Print a per-question result table (and add it to the GitHub step summary)"""
+    icons = {"created": "✅", "exists": "♻️", "skipped": "⏭️", "failed": "❌"}
+    rows = ["| Q# | Status | Issue | Title |", "|----|--------|-------|-------|"]
+    for result in results:
+        status = result.get("status", "failed")
+        issue_id = result.get("id") or "-"
+        title = (result.get("title") or "").replace("|", "\\|")
+        rows.append(f"| {result.get('question_num', '?')} | {icons.get(status, '')} {status} | {issue_id} | {title} |")
+    table = "\n".join(rows)
+    
+    print(f"\n{table}")
+    
+    summary_path = os.getenv("GITHUB_STEP_SUMMARY")
+    if summary_path:
+        try:
+            with open(summary_path, "a") as f:
+                f.write(f"\n### Clarification Issues\n\n{table}\n")
+        except OSError as e:
+            print(f"⚠️  Could not write step summary: {e}", file=sys.stderr)
+
+
+def create_issues_sequential(prepared: list[dict], feature_id: int) -> list[dict]:
+    """One idempotency check + create per question (pre-batch behaviour)"""
+    results = []
+    for issue in prepared:
+        result = {**issue, "status": "skipped", "id": None}
+        try:
+            created = create_issue_workitem(
+                parent_feature_id=feature_id,
+                title=issue["title"],
+                description=issue["description"],
+                tags=issue["tags"],
+                idempotency_key=issue["idempotency_key"]
+            )
+            if created:
+                result.update(status="created", id=created["id"])
+                print(f"✅ Created Issue {created['id']}")
+            else:
+                print(f"⚠️ Issue creation failed for Question {issue['question_num']} (may be duplicate or API error)", file=sys.stderr)
+        except Exception as e:
+            result["status"] = "failed"
+            print(f"❌ Exception creating Issue for Question {issue['question_num']}: {e}", file=sys.stderr)
+        results.append(result)
+    return results
 
 
 def main():
@@ -413,6 +625,12 @@ def main():
     parser.add_argument("--branch", required=True, help="Branch name")
     parser.add_argument("--org-url", required=True, help="ADO organization URL")
     parser.add_argument("--project", required=True, help="ADO project name")
+    parser.add_argument("--no-batch", action="store_true",
+                        help="Check and create Issues one at a time instead of one key lookup + parallel creates")
+    parser.add_argument("--max-workers", type=int, default=None,
+                        help="Concurrent Issue creates in batch mode (default: ADO_ISSUE_CREATE_CONCURRENCY or 4)")
+    parser.add_argument("--llm-concurrency", type=int, default=None,
+                        help="Max in-flight LLM requests / questions prepared at once (default: LLM_MAX_IN_FLIGHT or 4)")
     
     args = parser.parse_args()
     
@@ -451,88 +669,62 @@ def main():
             print("⚠️  openai package not available, skipping LLM features", file=sys.stderr)
             api_key = None
     
-    # Process each question
-    for i, q in enumerate(questions, 1):
-        try:
-            topic = q.get('topic', f'Question {i}').strip()
-            question_text = q.get('question', '').strip()
-            context = q.get('context', '').strip()
-            answer_options = q.get('answer_options', '').strip()
-            recommended_option = q.get('recommended_option', '').strip() if q.get('recommended_option') else None
-            suggested_answer = q.get('suggested_answer', '').strip() if q.get('suggested_answer') else None
-            
-            print(f"\n📝 Processing Question {i}: {topic}")
-            
-            # Generate idempotency key
-            question_hash = hashlib.sha256(question_text.encode()).hexdigest()[:8]
-            idempotency_key = f"{args.feature_id}-{question_hash}"
-            
-            # Build description
-            description = build_description(
-                question_num=i,
-                topic=topic,
-                question_text=question_text,
-                context=context,
-                answer_options=answer_options,
-                recommended_option=recommended_option,
-                suggested_answer=suggested_answer,
-                branch_name=args.branch,
-                use_llm=bool(api_key and client),
-                api_key=api_key,
-                client=client
-            )
-            
-            # Extract clean topic for title (use LLM if available)
-            if api_key and client:
-                clean_topic = clean_topic_with_llm(topic, api_key, client)
-            else:
-                clean_topic = topic
-            
-            # Check if description contains HTML (from previous conversions)
-            # If it does, convert to markdown first
-            if '<' in description and '>' in description and not description.strip().startswith('#'):
-                # Looks like HTML, convert to markdown
-                print(f"🔄 Converting HTML to markdown...")
-                description = convert_html_to_markdown(description)
-            
-            # Validate and fix markdown before sending to Azure DevOps
-            validated_description, warnings = validate_and_fix_markdown(description)
-            
-            if warnings:
-                print(f"⚠️  Markdown validation warnings:")
-                for warning in warnings:
-                    print(f"   - {warning}")
-            
-            # Azure DevOps now supports markdown (2025) via /multilineFieldsFormat API
-            # Send pure markdown - ado_client.py will set the format to Markdown
-            final_description = validated_description
-            
-            # Final validation: ensure description is not empty
-            if not final_description or not final_description.strip():
-                print(f"❌ Error: Final description is empty for Question {i}, skipping issue creation", file=sys.stderr)
-                print(f"   Raw description length: {len(description) if 'description' in locals() else 'N/A'}", file=sys.stderr)
-                continue
-            
-            # Create Issue
-            result = create_issue_workitem(
-                parent_feature_id=int(args.feature_id),
-                title=f"Q{i}: {clean_topic}",
-                description=final_description,
-                tags="clarification; auto-generated",
-                idempotency_key=idempotency_key
-            )
-            
-            if result:
-                print(f"✅ Created Issue {result['id']}")
+    # Stage 1 (LLM, concurrent): build every Issue - descriptions, titles, idempotency keys
+    # Stage 2 (ADO, concurrent): create each Issue as soon as its Stage 1 finishes
+    # Output is buffered per question and printed in question order
+    feature_id = int(args.feature_id)
+    llm_workers = max(1, args.llm_concurrency or LLM_MAX_IN_FLIGHT)
+    ado_workers = max(1, args.max_workers or int(os.getenv("ADO_ISSUE_CREATE_CONCURRENCY", "4")))
+    configure_llm_concurrency(llm_workers)
+    
+    results = {}
+    prepared = {}
+    outputs = {}
+    next_to_print = 1
+    
+    with ThreadPoolExecutor(max_workers=ado_workers, thread_name_prefix="ado") as ado_pool, \
+            ThreadPoolExecutor(max_workers=llm_workers, thread_name_prefix="llm") as llm_pool:
+        # One idempotency-key lookup overlaps with the LLM stage
+        keys_future = None if args.no_batch else ado_pool.submit(get_existing_idempotency_keys, feature_id)
+        
+        def _create(issue: dict) -> dict:
+            result = create_issue_if_missing(feature_id, issue, keys_future.result())
+            return {**result, "question_num": issue["question_num"]}
+        
+        prepare_futures = {
+            llm_pool.submit(prepare_issue_buffered, i, q, args, api_key, client): i
+            for i, q in enumerate(questions, 1)
+        }
+        create_futures = []
+        for future in as_completed(prepare_futures):
+            i = prepare_futures[future]
+            issue, buffer, failure = future.result()
+            outputs[i] = buffer
+            if failure:
+                results[i] = failure
             else:
-                print(f"⚠️ Issue creation failed for Question {i} (may be duplicate or API error)", file=sys.stderr)
-                # Continue with next question
+                prepared[i] = issue
+                if not args.no_batch:
+                    create_futures.append(ado_pool.submit(_create, issue))
             
-        except Exception as e:
-            print(f"❌ Exception creating Issue for Question {i}: {e}", file=sys.stderr)
-            import traceback
-            traceback.print_exc(file=sys.stderr)
-            # Continue with next question instead of failing entire script
+            # Print every question whose predecessors are all done
+            while next_to_print in outputs:
+                flush_log(outputs.pop(next_to_print))
+                next_to_print += 1
+        
+        for future in create_futures:
+            result = future.result()
+            results[result["question_num"]] = result
+    
+    if args.no_batch and prepared:
+        for result in create_issues_sequential([prepared[i] for i in sorted(prepared)], feature_id):
+            results[result["question_num"]] = result
+    
+    results = list(results.values())
+    results.sort(key=lambda r: r["question_num"])
+    print_results_table(results)
+    if client:
+        print(get_llm_cache().summary())
     
     print(f"\n✅ Issue creation complete - processed {len(questions)} questions")
     return 0
@@ -540,4 +732,3 @@ def main():
 
 if __name__ == "__main__":
     sys.exit(main())
-
@@ -2,118 +2,348 @@
 """Extract [NEEDS CLARIFICATION] markers from spec.md using LLM (Azure OpenAI)"""
 
 import os
+import re
 import sys
 import json
 import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from datetime import datetime
-from openai import OpenAI
+from clarifications_md import assign_fingerprints, fingerprint_comment, fingerprint_markers, parse_clarifications, patch_clarifications
+from llm_cache import cache_key, get_llm_cache
+from spec_scanner import scan_markers
 
-def extract_markers_with_llm(spec_content: str) -> list[dict]:
-    """Extract all clarification questions using Azure OpenAI LLM"""
-    
-    # Initialize Azure OpenAI client
+# Section-aware chunking: specs are split on "## " headers (optionally behind a
+# GitHub Actions log timestamp) and consecutive sections are packed into chunks
+# of at most EXTRACT_CHUNK_MAX_CHARS, extracted concurrently
+EXTRACT_CHUNK_MAX_CHARS = int(os.getenv("EXTRACT_CHUNK_MAX_CHARS", "12000"))
+EXTRACT_MAX_WORKERS = int(os.getenv("EXTRACT_MAX_WORKERS", "4"))
+MODEL = "gpt-5-nano"
+
+_SECTION_HEADER_PATTERN = re.compile(r'^[\t ]*(?:\d{4}-\d{2}-\d{2}T\S+Z[\t ]+)?##(?!#)', re.MULTILINE)
+_MARKER_HINTS = ('[NEEDS CLARIFICATION', '## Question')
+_REQUIRED_FIELDS = ['topic', 'question', 'context', 'answer_options']
+
+
+def split_spec_sections(spec_content: str, max_chars: int = EXTRACT_CHUNK_MAX_CHARS) -> list[str]:
+    """Split spec content into chunks of whole "## " sections
+
+    The preamble before the first header stays with the first section; a single
+    section longer than max_chars becomes a chunk of its own.
+    """
+    starts = [0] + [m.start() for m in _SECTION_HEADER_PATTERN.finditer(spec_content) if m.start() > 0]
+    sections = [spec_content[start:end] for start, end in zip(starts, starts[1:] + [len(spec_content)])]
+    if len(sections) > 1 and not _SECTION_HEADER_PATTERN.match(sections[0]):
+        # Preamble (title, metadata) gives the first section its context
+        sections[1] = sections[0] + sections[1]
+        sections.pop(0)
+
+    chunks = []
+    current = ""
+    for section in sections:
+        if current and len(current) + len(section) > max_chars:
+            chunks.append(current)
+            current = ""
+        current += section
+    if current.strip():
+        chunks.append(current)
+    return chunks
+
+
+class IncrementalJSONArrayParser:
+    """Yield the elements of a streamed JSON array as soon as each one is complete
+
+    Text before the opening '[' (e.g. a ```json fence) is ignored, as is
+    anything after the closing ']'. Objects, arrays and strings are complete at
+    their closing delimiter; a bare number or literal at the end of the buffer
+    may still be streaming ("12" of "123"), so it is only taken once a ',' or
+    ']' follows it.
+    """
+
+    def __init__(self):
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = None  # index just after '[' once the array has started
+        self.done = False
+
+    def feed(self, text: str) -> list:
+        """Add streamed text; return the elements completed by it"""
+        if self.done:
+            return []
+        self._buffer += text
+        if self._pos is None:
+            start = self._buffer.find('[')
+            if start == -1:
+                return []
+            self._pos = start + 1
+
+        items = []
+        while True:
+            pos = self._pos
+            while pos < len(self._buffer) and self._buffer[pos] in ' \t\r\n,':
+                pos += 1
+            if pos >= len(self._buffer):
+                break
+            if self._buffer[pos] == ']':
+                self.done = True
+                break
+            try:
+                item, end = self._decoder.raw_decode(self._buffer, pos)
+            except json.JSONDecodeError:
+                # Element still streaming in (or malformed - close() decides)
+                break
+            if self._buffer[pos] not in '{["':
+                following = end
+                while following < len(self._buffer) and self._buffer[following] in ' \t\r\n':
+                    following += 1
+                if following >= len(self._buffer) or self._buffer[following] not in ',]':
+                    # "2" of "2.5", or malformed - close() decides
+                    break
+            items.append(item)
+            self._pos = end
+        return items
+
+    def close(self) -> None:
+        """Raise if the stream ended before the array was complete"""
+        if self._pos is None:
+            raise ValueError("no JSON array in response")
+        if not self.done:
+            tail = self._buffer[self._pos:].strip()
+            raise ValueError(f"JSON array incomplete or malformed near: {tail[:200]!r}")
+
+
+def _load_prompts() -> tuple[str, str]:
+    """Return (system_prompt, user_template) from .github/prompts/custom"""
+    prompts_dir = Path(__file__).parent.parent / "prompts" / "custom"
+    system_prompt = (prompts_dir / "extract-questions.system.md").read_text().strip()
+    user_template = (prompts_dir / "extract-questions.user.md").read_text().strip()
+    return system_prompt, user_template
+
+
+def extract_chunk(client, system_prompt: str, user_template: str, chunk: str) -> list[dict]:
+    """Extract the questions of one chunk, parsing the streamed JSON as it arrives
+
+    Raises:
+        ValueError / API errors - handled per chunk by extract_markers_with_llm
+    """
+    # Unchanged sections + unchanged prompts = same questions; skip the call on re-runs
+    llm_cache = get_llm_cache()
+    key = cache_key(system_prompt + user_template, MODEL, chunk)
+    parser = IncrementalJSONArrayParser()
+    markers = []
+
+    cached = llm_cache.get(key)
+    if cached is not None:
+        markers.extend(parser.feed(cached))
+        parser.close()
+        return markers
+
+    stream = client.chat.completions.create(
+        model=MODEL,
+        messages=[
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_template.replace("{spec_content}", chunk)}
+        ],
+        max_completion_tokens=16000,  # Allow up to 16K tokens for large JSON responses
+        extra_query={'api-version': '2025-01-01-preview'},
+        stream=True
+    )
+    parts = []
+    for event in stream:
+        # Azure sends a leading event with content filter results and no choices
+        if not event.choices:
+            continue
+        delta = event.choices[0].delta.content
+        if delta:
+            parts.append(delta)
+            markers.extend(parser.feed(delta))
+    parser.close()
+
+    llm_cache.set(key, ''.join(parts), model=MODEL)
+    return markers
+
+
+def _question_fingerprint(marker: dict) -> str:
+    """Normalized question text used to drop duplicates across chunks"""
+    text = marker.get('question') or marker.get('topic') or ''
+    return ' '.join(re.sub(r'[^\w\s]', ' ', text.lower()).split())
+
+
+def merge_markers(chunk_markers: list[list[dict]]) -> list[dict]:
+    """Concatenate per-chunk questions in document order, dropping duplicates"""
+    merged = []
+    seen = set()
+    for markers in chunk_markers:
+        for marker in markers:
+            if not isinstance(marker, dict):
+                print(f"⚠️  Warning: Skipping non-object entry in LLM response: {str(marker)[:100]}", file=sys.stderr)
+                continue
+            fingerprint = _question_fingerprint(marker)
+            if fingerprint and fingerprint in seen:
+                continue
+            seen.add(fingerprint)
+            merged.append(marker)
+    return merged
+
+
+def _create_client():
+    """Azure OpenAI client (exits if AZURE_OPENAI_API_KEY is not set)"""
     api_key = os.getenv("AZURE_OPENAI_API_KEY")
     if not api_key:
         print("❌ Error: AZURE_OPENAI_API_KEY environment variable not set", file=sys.stderr)
         sys.exit(1)
     
-    client = OpenAI(
+    from openai import OpenAI
+    return OpenAI(
         base_url="https://ruste-mhinjxi0-eastus2.cognitiveservices.azure.com/openai/deployments/gpt-5-nano",
         api_key=api_key,
         default_headers={'api-key': api_key}
-    )    # Load prompts from dedicated files
-    script_dir = Path(__file__).parent
-    prompts_dir = script_dir.parent / "prompts" / "custom"
+    )
+
+
+def _extract_chunks(client, chunks: list[str]) -> list[list[dict] | None]:
+    """Extract every chunk concurrently; a failed chunk's entry is None
+
+    Exits if every chunk fails.
+    """
+    # Load prompts from dedicated files
+    system_prompt, user_template = _load_prompts()
     
-    system_prompt = (prompts_dir / "extract-questions.system.md").read_text().strip()
-    user_template = (prompts_dir / "extract-questions.user.md").read_text().strip()
+    results = [None] * len(chunks)
+    failed = 0
+    with ThreadPoolExecutor(max_workers=max(1, EXTRACT_MAX_WORKERS)) as pool:
+        futures = {
+            pool.submit(extract_chunk, client, system_prompt, user_template, chunk): index
+            for index, chunk in enumerate(chunks)
+        }
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                results[index] = future.result()
+                print(f"   ✅ Chunk {index + 1}/{len(chunks)}: {len(results[index])} question(s)")
+            except Exception as e:
+                failed += 1
+                print(f"   ❌ Chunk {index + 1}/{len(chunks)} failed: {e}", file=sys.stderr)
     
-    # Replace placeholder in user prompt
-    user_prompt = user_template.replace("{spec_content}", spec_content)
-
-    json_str = ""  # Initialize to avoid unbound variable error
-    try:
-        response = client.chat.completions.create(
-            model="gpt-5-nano",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            max_completion_tokens=16000,  # Allow up to 16K tokens for large JSON responses
-            extra_query={'api-version': '2025-01-01-preview'}
-        )
-        
-        # Parse JSON response
-        json_str = response.choices[0].message.content.strip()
-        
-        # Remove markdown code fences if LLM added them despite instructions
-        if json_str.startswith("```json"):
-            json_str = json_str.replace("```json", "").replace("```", "").strip()
-        elif json_str.startswith("```"):
-            json_str = json_str.replace("```", "").strip()
-        
-        markers = json.loads(json_str)
-        
-        # Validate structure
-        required_fields = ['topic', 'question', 'context', 'answer_options']
-        optional_fields = ['recommended_option', 'suggested_answer']
-        for marker in markers:
-            missing_required = [k for k in required_fields if k not in marker]
-            if missing_required:
-                print(f"⚠️  Warning: Marker missing required fields: {missing_required}", file=sys.stderr)
-            # Note: recommended_option and suggested_answer are optional (spec kit format)
-        
-        return markers
-        
-    except json.JSONDecodeError as e:
-        print(f"❌ Error: Failed to parse LLM response as JSON: {e}", file=sys.stderr)
-        if json_str:
-            print(f"Raw response: {json_str[:500]}", file=sys.stderr)
-        sys.exit(1)
-    except Exception as e:
-        print(f"❌ Error calling Azure OpenAI API: {e}", file=sys.stderr)
+    if chunks and failed == len(chunks):
+        print("❌ Error: Question extraction failed for every chunk", file=sys.stderr)
         sys.exit(1)
+    if failed:
+        print(f"⚠️  Warning: {failed} of {len(chunks)} chunk(s) failed - their questions are missing", file=sys.stderr)
+    return results
 
-def generate_clarifications_md(markers: list[dict], feature_name: str, spec_link: str = "./spec.md") -> str:
-    """Generate clarifications.md content with answer options"""
-    created_date = datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
+
+def _validate_markers(markers: list[dict]) -> None:
+    """Warn about questions missing required fields"""
+    for marker in markers:
+        missing_required = [k for k in _REQUIRED_FIELDS if k not in marker]
+        if missing_required:
+            print(f"⚠️  Warning: Marker missing required fields: {missing_required}", file=sys.stderr)
+        # Note: recommended_option and suggested_answer are optional (spec kit format)
+
+
+def extract_markers_with_llm(spec_content: str) -> list[dict]:
+    """Extract all clarification questions using Azure OpenAI LLM
+
+    The spec is split into section chunks extracted concurrently; a chunk that
+    fails is reported and skipped, the extraction only fails if every chunk does.
+    """
+    client = _create_client()
     
-    content = f"""# Clarification Questions: {feature_name}
+    chunks = split_spec_sections(spec_content)
+    # Sections without any clarification marker cannot contribute questions
+    chunks = [chunk for chunk in chunks if any(hint in chunk for hint in _MARKER_HINTS)] or chunks
+    print(f"🧩 Extracting from {len(chunks)} chunk(s) of up to {EXTRACT_CHUNK_MAX_CHARS} chars")
+    
+    markers = merge_markers([result for result in _extract_chunks(client, chunks) if result is not None])
+    _validate_markers(markers)
+    return markers
 
-**Feature**: [{spec_link}]({spec_link})  
-**Created**: {created_date}  
-**Status**: Open  
-**Total Questions**: {len(markers)}
 
----
+def extract_records_with_llm(records: list[dict], fingerprints: list[str]) -> dict[str, list[dict]]:
+    """Extract the questions of individual spec_scanner markers (incremental mode)
 
-"""
+    Each marker is sent on its own - section header, the line leading up to
+    the marker and its question block - so its questions can be filed under
+    its fingerprint.
+
+    Returns:
+        fingerprint -> questions, for every marker whose extraction succeeded
+        (failed markers are reported and retried on the next run)
+    """
+    if not records:
+        return {}
+    client = _create_client()
     
-    for i, marker in enumerate(markers, 1):
-        content += f"""## Question {i}: {marker['topic']}
+    chunks = []
+    for record in records:
+        lead_in = record['context'].rsplit('\n', 1)[-1]
+        block = record['full_block']
+        # A block can hold several markers - stop at the line before the next one
+        next_marker = block.find('[NEEDS CLARIFICATION', 1)
+        if next_marker != -1:
+            block = block[:next_marker]
+            block = block[:block.rfind('\n')] if '\n' in block else block
+        chunks.append(f"## {record['section']}\n\n{lead_in} {block.strip()}\n")
+    print(f"🧩 Extracting {len(chunks)} new or changed marker(s)")
+    
+    extracted = {}
+    for record, fingerprint, questions in zip(records, fingerprints, _extract_chunks(client, chunks)):
+        if questions is None:
+            print(f"⚠️  Warning: Marker in '{record['section']}' not extracted, will be retried next run: "
+                  f"{record['question'][:100]}", file=sys.stderr)
+            continue
+        questions = merge_markers([questions])
+        _validate_markers(questions)
+        extracted[fingerprint] = [{**question, 'fingerprint': fingerprint} for question in questions]
+    return extracted
 
+def format_question_block(i: int, marker: dict) -> str:
+    """One "## Question N" block of clarifications.md"""
+    block = f"## Question {i}: {marker['topic']}\n"
+    if marker.get('fingerprint'):
+        block += f"{fingerprint_comment(marker['fingerprint'])}\n"
+    block += f"""
 **Context**: {marker['context']}
 
 **Question**: {marker['question']}
 
 """
-        # Include answer options if present
-        if marker.get('answer_options') and marker['answer_options'].strip():
-            content += f"""**Answer Options**:
+    # Include answer options if present
+    if marker.get('answer_options') and marker['answer_options'].strip():
+        block += f"""**Answer Options**:
 
 {marker['answer_options']}
 
 """
-        
-        content += f"""**Answer**: _Pending_
+    
+    block += f"""**Answer**: _Pending_
 
 **ADO Issue**: _To be created_
 
 ---
 
+"""
+    return block
+
+def generate_clarifications_md(markers: list[dict], feature_name: str, spec_link: str = "./spec.md") -> str:
+    """Generate clarifications.md content with answer options"""
+    created_date = datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
+    
+    content = f"""# Clarification Questions: {feature_name}
+
+**Feature**: [{spec_link}]({spec_link})  
+**Created**: {created_date}  
+**Status**: Open  
+**Total Questions**: {len(markers)}
+
+---
+
 """
     
+    for i, marker in enumerate(markers, 1):
+        content += format_question_block(i, marker)
+    
     content += """## Resolution Notes
 
 _This section will be populated when questions are answered (manual or automated)._
@@ -122,12 +352,65 @@ _This section will be populated when questions are answered (manual or automated
     
     return content
 
+def update_clarifications_md(spec_content: str, output_path: Path, feature_name: str) -> bool:
+    """Incremental mode: extract only new/changed markers and patch clarifications.md
+
+    Without an existing clarifications.md every marker is new: the spec is then
+    extracted in whole section chunks (extract_markers_with_llm) and the
+    questions are fingerprinted afterwards, rather than one call per marker.
+
+    Returns:
+        False when spec.md has no [NEEDS CLARIFICATION] markers to fingerprint
+        (the caller falls back to a full extraction)
+    """
+    records = list(scan_markers(spec_content))
+    if not records:
+        return False
+    fingerprints = fingerprint_markers(records)
+    
+    previous = parse_clarifications(output_path.read_text()) if output_path.exists() else None
+    known = previous.fingerprints() if previous else set()
+    todo = [(fingerprint, record) for fingerprint, record in zip(fingerprints, records) if fingerprint not in known]
+    removed = known - set(fingerprints)
+    print(f"🔁 Incremental: {len(records) - len(todo)} unchanged, {len(todo)} new or changed, {len(removed)} removed marker(s)")
+    
+    if previous and not todo and not removed:
+        print(f"✅ Clarifications file is up to date: {output_path}")
+        return True
+    
+    print("📡 Calling Azure OpenAI API to extract questions...")
+    if previous:
+        extracted = extract_records_with_llm([record for _, record in todo], [fingerprint for fingerprint, _ in todo])
+        print(get_llm_cache().summary())
+        new_blocks = {fingerprint: [format_question_block(0, q) for q in questions] for fingerprint, questions in extracted.items()}
+        content = patch_clarifications(previous, fingerprints, new_blocks)
+        action = "Updated"
+    else:
+        markers = extract_markers_with_llm(spec_content)
+        print(get_llm_cache().summary())
+        if not markers:
+            print("ℹ️  No clarification questions extracted")
+            return True
+        markers = assign_fingerprints(markers, records, fingerprints)
+        unmatched = set(fingerprints) - {marker['fingerprint'] for marker in markers}
+        if unmatched:
+            print(f"ℹ️  {len(unmatched)} marker(s) matched no extracted question - they are extracted on their own next run")
+        content = generate_clarifications_md(markers, feature_name)
+        action = "Created"
+    
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    output_path.write_text(content)
+    print(f"✅ {action} clarifications file: {output_path}")
+    return True
+
 def main():
     parser = argparse.ArgumentParser(description="Extract clarification markers from spec.md or spec_output.txt using LLM")
     parser.add_argument("--spec-file", help="Path to spec.md (legacy)")
     parser.add_argument("--spec-output-file", help="Path to spec_output.txt (Copilot output)")
     parser.add_argument("--output", required=True, help="Path to output JSON file with extracted questions")
     parser.add_argument("--feature-name", help="Feature name for header (optional, used only for clarifications.md generation)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="With --spec-file: only extract markers added or changed since the existing --output and patch it in place")
     
     args = parser.parse_args()
     
@@ -146,6 +429,10 @@ def main():
         print(f"❌ Error: Input file not found: {input_path}", file=sys.stderr)
         sys.exit(1)
     
+    if not output_json and not args.feature_name:
+        print("❌ Error: --feature-name required when using --spec-file", file=sys.stderr)
+        sys.exit(1)
+    
     spec_content = input_path.read_text()
     
     # Use LLM to clean the content (remove timestamps, fix formatting) instead of regex
@@ -154,9 +441,16 @@ def main():
         print("ℹ️  No clarification markers found")
         sys.exit(0)
     
+    output_path = Path(args.output)
+    if args.incremental and not output_json:
+        if update_clarifications_md(spec_content, output_path, args.feature_name):
+            return
+        print("ℹ️  No [NEEDS CLARIFICATION] markers to fingerprint - running full extraction")
+    
     print("📡 Calling Azure OpenAI API to extract questions...")
-    # LLM will handle cleaning timestamps and extracting questions in one pass
+    # LLM will handle cleaning timestamps and extracting questions, one section chunk per call
     markers = extract_markers_with_llm(spec_content)
+    print(get_llm_cache().summary())
     
     if not markers:
         print("ℹ️  No clarification questions extracted")
@@ -164,19 +458,14 @@ def main():
     
     print(f"✅ Extracted {len(markers)} clarification markers")
     
-    output_path = Path(args.output)
     output_path.parent.mkdir(parents=True, exist_ok=True)
     
     if output_json:
         # Output JSON for direct use in create-ado-issues.sh
-        import json
         output_path.write_text(json.dumps(markers, indent=2))
         print(f"✅ Created JSON file with extracted questions: {output_path}")
     else:
         # Legacy: Generate clarifications.md
-        if not args.feature_name:
-            print("❌ Error: --feature-name required when using --spec-file", file=sys.stderr)
-            sys.exit(1)
         clarifications_content = generate_clarifications_md(markers, args.feature_name)
         output_path.write_text(clarifications_content)
         print(f"✅ Created clarifications file: {output_path}")
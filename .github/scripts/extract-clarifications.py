@@ -1,93 +1,47 @@
 #!/usr/bin/env python3
 """Extract [NEEDS CLARIFICATION] markers from spec.md and create clarifications.md"""
 
-import re
 import sys
 import argparse
 from pathlib import Path
 from datetime import datetime
 
-MARKER_PATTERN = r'\[NEEDS CLARIFICATION:\s*([^\]]+)\]'
+from clarifications_md import fingerprint_comment, fingerprint_markers, parse_clarifications, patch_clarifications
+from spec_scanner import MARKER_PATTERN, scan_markers  # noqa: F401 - MARKER_PATTERN re-exported
 
 def extract_markers(spec_content: str) -> list[dict]:
-    """Extract all clarification markers with context and answer options"""
-    markers = []
-    
-    for match in re.finditer(MARKER_PATTERN, spec_content):
-        question = match.group(1).strip()
-        pos = match.start()
-        
-        # Extract context (200 chars before marker)
-        start = max(0, pos - 200)
-        context_before = spec_content[start:pos].strip()
-        
-        # Extract extended context AFTER marker to capture answer options
-        # Look for content until next section header (##) or end of paragraph
-        after_marker = spec_content[pos:]
-        
-        # Find end of question block (next ## header, ---, or blank line + ##)
-        end_patterns = [
-            r'\n\s*#{1,6}\s+',  # Next section header
-            r'\n\s*---\s*\n',   # Horizontal rule
-            r'\n\s*\n\s*#{1,6}\s+',  # Blank line then header
-        ]
-        
-        end_pos = len(after_marker)
-        for pattern in end_patterns:
-            end_match = re.search(pattern, after_marker)
-            if end_match:
-                end_pos = min(end_pos, end_match.start())
-        
-        # Extract full question block (marker + everything after until boundary)
-        full_question_block = after_marker[:end_pos].strip()
-        
-        # Extract just the answer options table if present
-        answer_options = ""
-        table_match = re.search(
-            r'\*\*Suggested Answers\*\*:?\s*\n\n(.+?)(?=\n\n\*\*Your choice\*\*|\n\n---|\Z)',
-            full_question_block,
-            re.DOTALL
-        )
-        if table_match:
-            answer_options = table_match.group(1).strip()
-        
-        # Find section header (search backwards for ##)
-        before_marker = spec_content[:pos]
-        section_match = re.findall(r'^#{1,6}\s+(.+)$', before_marker, re.MULTILINE)
-        section = section_match[-1] if section_match else "Unknown Section"
-        
-        # Extract clean topic from full_question_block if Copilot generated heading
-        # Pattern: ## Question N: Topic Name
-        topic_match = re.search(r'^##\s+Question\s+\d+:\s+(.+)$', full_question_block, re.MULTILINE)
-        if topic_match:
-            topic = topic_match.group(1).strip()
-        else:
-            # Fallback: first 50 chars of question (remove question markers)
-            clean_question = question.replace('?', '').strip()
-            topic = clean_question[:50] + ("..." if len(clean_question) > 50 else "")
-        
-        # Extract actual question text from "What we need to know:" section
-        question_text_match = re.search(
-            r'\*\*What we need to know\*\*:?\s+(.+?)(?=\n\n\*\*Suggested Answers\*\*|\n\n---|\Z)',
-            full_question_block,
-            re.DOTALL
-        )
-        if question_text_match:
-            question_text = question_text_match.group(1).strip()
-        else:
-            # Fallback: use marker content
-            question_text = question
-        
-        markers.append({
-            'question': question_text,
-            'answer_options': answer_options,
-            'context': context_before,
-            'section': section,
-            'topic': topic,
-            'full_block': full_question_block
-        })
+    """Extract all clarification markers with context and answer options (one pass, see spec_scanner)"""
+    return list(scan_markers(spec_content))
+
+def format_question_block(i: int, marker: dict) -> str:
+    """One "## Question N" block of clarifications.md"""
+    block = f"## Question {i}: {marker['topic']}\n"
+    if marker.get('fingerprint'):
+        block += f"{fingerprint_comment(marker['fingerprint'])}\n"
+    block += f"""
+**Spec Section**: {marker['section']}
+
+**Context**: {marker['context']}
+
+**Question**: {marker['question']}
+
+"""
+    # Include answer options if present
+    if marker.get('answer_options'):
+        block += f"""**Answer Options**:
+
+{marker['answer_options']}
+
+"""
     
-    return markers
+    block += f"""**Answer**: _Pending_
+
+**ADO Issue**: _To be created_
+
+---
+
+"""
+    return block
 
 def generate_clarifications_md(markers: list[dict], feature_name: str, spec_link: str = "./spec.md") -> str:
     """Generate clarifications.md content with answer options"""
@@ -105,30 +59,7 @@ def generate_clarifications_md(markers: list[dict], feature_name: str, spec_link
 """
     
     for i, marker in enumerate(markers, 1):
-        content += f"""## Question {i}: {marker['topic']}
-
-**Spec Section**: {marker['section']}
-
-**Context**: {marker['context']}
-
-**Question**: {marker['question']}
-
-"""
-        # Include answer options if present
-        if marker.get('answer_options'):
-            content += f"""**Answer Options**:
-
-{marker['answer_options']}
-
-"""
-        
-        content += f"""**Answer**: _Pending_
-
-**ADO Issue**: _To be created_
-
----
-
-"""
+        content += format_question_block(i, marker)
     
     content += """## Resolution Notes
 
@@ -143,6 +74,8 @@ def main():
     parser.add_argument("--spec-file", required=True, help="Path to spec.md")
     parser.add_argument("--output", required=True, help="Path to output clarifications.md")
     parser.add_argument("--feature-name", required=True, help="Feature name for header")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Keep unchanged questions of an existing --output and patch in only added/removed markers")
     
     args = parser.parse_args()
     
@@ -160,9 +93,26 @@ def main():
     
     print(f"✅ Extracted {len(markers)} clarification markers")
     
-    clarifications_content = generate_clarifications_md(markers, args.feature_name)
+    fingerprints = fingerprint_markers(markers)
+    for marker, fingerprint in zip(markers, fingerprints):
+        marker['fingerprint'] = fingerprint
     
     output_path = Path(args.output)
+    if args.incremental and output_path.exists():
+        previous = parse_clarifications(output_path.read_text())
+        known = previous.fingerprints()
+        new_blocks = {m['fingerprint']: [format_question_block(0, m)] for m in markers if m['fingerprint'] not in known}
+        removed = known - set(fingerprints)
+        print(f"🔁 Incremental: {len(markers) - len(new_blocks)} unchanged, {len(new_blocks)} new or changed, {len(removed)} removed marker(s)")
+        if not new_blocks and not removed:
+            print(f"✅ Clarifications file is up to date: {output_path}")
+            return
+        output_path.write_text(patch_clarifications(previous, fingerprints, new_blocks))
+        print(f"✅ Updated clarifications file: {output_path}")
+        return
+    
+    clarifications_content = generate_clarifications_md(markers, args.feature_name)
+    
     output_path.parent.mkdir(parents=True, exist_ok=True)
     output_path.write_text(clarifications_content)
     
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""On-disk cache of LLM responses shared by the clarification scripts
+
+Entries are keyed by (prompt template hash, model, input hash), so a re-run on
+an unchanged spec.md / question set makes no LLM calls, while editing a prompt
+template or switching the model misses naturally.
+
+Layout: LLM_CACHE_DIR/<first two hex chars>/<key>.json, one JSON file per
+response. Reads touch the file's mtime; once the directory grows past
+LLM_CACHE_MAX_BYTES the least recently used entries are deleted. The
+directory is restored/saved between workflow runs with actions/cache.
+
+Environment:
+    LLM_CACHE_DIR        cache directory (default ~/.cache/spec-kit-llm)
+    LLM_CACHE_MAX_BYTES  size limit before eviction (default 50 MB)
+    LLM_CACHE_DISABLED   set to 1/true to bypass the cache
+"""
+
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "spec-kit-llm")
+DEFAULT_MAX_BYTES = 50 * 1024 * 1024
+
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def cache_key(template: str, model: str, *inputs: str) -> str:
+    """Key for one LLM call: hash of (template hash, model, input hash)
+
+    Args:
+        template: Prompt template(s) with the inputs left out
+        model: Model / deployment name
+        inputs: Values substituted into the template (None is treated as empty)
+    """
+    input_hash = _sha256("\x00".join(value or "" for value in inputs))
+    return _sha256(f"{_sha256(template)}\x00{model}\x00{input_hash}")
+
+
+class LLMCache:
+    """Size-bounded directory of cached responses (thread-safe)"""
+
+    def __init__(self, directory: str, max_bytes: int = DEFAULT_MAX_BYTES, enabled: bool = True):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self._size = None  # bytes on disk, computed on first write
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> str | None:
+        """Return the cached response content, or None on a miss"""
+        if not self.enabled:
+            return None
+        path = self._path(key)
+        try:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+            content = entry["content"]
+        except (OSError, ValueError, KeyError, TypeError):
+            with self._lock:
+                self.misses += 1
+            return None
+        try:
+            os.utime(path)  # LRU position
+        except OSError:
+            pass
+        with self._lock:
+            self.hits += 1
+        return content
+
+    def set(self, key: str, content: str, model: str = None) -> None:
+        """Store a response, evicting the least recently used entries if over max_bytes"""
+        if not self.enabled:
+            return
+        path = self._path(key)
+        data = json.dumps({"model": model, "created": time.time(), "content": content}).encode("utf-8")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write-then-rename so a concurrent reader never sees a partial file
+            tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp_path.write_bytes(data)
+            try:
+                replaced = path.stat().st_size  # overwriting a key frees the old entry
+            except FileNotFoundError:
+                replaced = 0
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"⚠️  Could not write LLM cache entry: {e}", file=sys.stderr)
+            return
+
+        with self._lock:
+            self.writes += 1
+            if self._size is None:
+                self._size = sum(size for _, size, _ in self._entries())
+            else:
+                self._size += len(data) - replaced
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _entries(self) -> list[tuple[float, int, Path]]:
+        """(mtime, size, path) for every entry on disk"""
+        entries = []
+        for path in self.directory.glob("*/*.json"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _evict(self) -> None:
+        """Delete oldest entries until the directory fits max_bytes. Caller holds the lock."""
+        entries = sorted(self._entries())
+        size = sum(size for _, size, _ in entries)
+        for _, entry_size, path in entries:
+            if size <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            size -= entry_size
+            self.evictions += 1
+        self._size = size
+
+    def stats(self) -> dict:
+        """Return hit/miss/write/eviction counters"""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "writes": self.writes,
+                "evictions": self.evictions,
+            }
+
+    def summary(self) -> str:
+        """One-line stats for the script output"""
+        if not self.enabled:
+            return "🗄️  LLM cache: disabled"
+        stats = self.stats()
+        return (f"🗄️  LLM cache: {stats['hits']} hits, {stats['misses']} misses, "
+                f"{stats['writes']} writes, {stats['evictions']} evictions ({self.directory})")
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> LLMCache:
+    """Return the process-wide cache configured from the environment"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = LLMCache(
+                os.getenv("LLM_CACHE_DIR") or DEFAULT_CACHE_DIR,
+                max_bytes=int(os.getenv("LLM_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES)),
+                enabled=os.getenv("LLM_CACHE_DISABLED", "").lower() not in ("1", "true", "yes")
+            )
+        return _cache
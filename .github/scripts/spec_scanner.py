@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""Single-pass scanner for [NEEDS CLARIFICATION] markers in spec.md
+
+Walks the document once: markers are found in order, the section header
+in effect is tracked as the scan moves forward, and the end of each question
+block is located with one precompiled search that is shared by every marker
+inside the same block. Extraction is linear in the document size.
+"""
+
+import re
+from typing import Iterator
+
+MARKER_PATTERN = r'\[NEEDS CLARIFICATION:\s*([^\]]+)\]'
+CONTEXT_CHARS = 200
+
+_MARKER_RE = re.compile(MARKER_PATTERN)
+_HEADER_RE = re.compile(r'^#{1,6}\s+(.+)$', re.MULTILINE)
+# Question block ends at the next header or horizontal rule (leading blank lines excluded)
+_BLOCK_END_RE = re.compile(r'\n\s*(?:#{1,6}\s|---\s*\n)')
+_ANSWER_OPTIONS_RE = re.compile(
+    r'\*\*Suggested Answers\*\*:?\s*\n\n(.+?)(?=\n\n\*\*Your choice\*\*|\n\n---|\Z)',
+    re.DOTALL
+)
+_TOPIC_RE = re.compile(r'^##\s+Question\s+\d+:\s+(.+)$', re.MULTILINE)
+_QUESTION_TEXT_RE = re.compile(
+    r'\*\*What we need to know\*\*:?\s+(.+?)(?=\n\n\*\*Suggested Answers\*\*|\n\n---|\Z)',
+    re.DOTALL
+)
+
+
+class _SectionTracker:
+    """Follows the last header before a position as positions move forward"""
+
+    def __init__(self, content: str):
+        self._content = content
+        self._headers = _HEADER_RE.finditer(content)
+        self._next = next(self._headers, None)
+        self._complete = None   # last header ending at or before the position
+        self._straddling = None  # header starting before but ending after the position
+
+    def section_at(self, pos: int) -> str:
+        while True:
+            if self._straddling is not None and self._straddling.end() <= pos:
+                self._complete, self._straddling = self._straddling, None
+            if self._next is None or self._next.start() >= pos:
+                break
+            if self._next.end() <= pos:
+                self._complete = self._next
+            else:
+                self._straddling = self._next
+            self._next = next(self._headers, None)
+
+        if self._straddling is not None:
+            # Marker sits on the header line itself - only the text before it counts
+            partial = _HEADER_RE.findall(self._content, self._straddling.start(), pos)
+            if partial:
+                return partial[-1]
+        return self._complete.group(1) if self._complete else "Unknown Section"
+
+
+def scan_markers(spec_content: str) -> Iterator[dict]:
+    """Yield one record per clarification marker, in document order
+
+    Record keys: question, answer_options, context, section, topic, full_block
+    """
+    sections = _SectionTracker(spec_content)
+    block_end = -1  # boundary shared by markers in the same block (len(spec_content) if none is left)
+
+    for match in _MARKER_RE.finditer(spec_content):
+        question = match.group(1).strip()
+        pos = match.start()
+
+        # Context: CONTEXT_CHARS before the marker
+        context_before = spec_content[max(0, pos - CONTEXT_CHARS):pos].strip()
+
+        # Question block: marker up to the next header / horizontal rule
+        if block_end < pos:
+            end_match = _BLOCK_END_RE.search(spec_content, pos)
+            block_end = end_match.start() if end_match else len(spec_content)
+        full_question_block = spec_content[pos:block_end].strip()
+
+        table_match = _ANSWER_OPTIONS_RE.search(full_question_block)
+        answer_options = table_match.group(1).strip() if table_match else ""
+
+        # Extract clean topic from full_question_block if Copilot generated heading
+        topic_match = _TOPIC_RE.search(full_question_block)
+        if topic_match:
+            topic = topic_match.group(1).strip()
+        else:
+            # Fallback: first 50 chars of question (remove question markers)
+            clean_question = question.replace('?', '').strip()
+            topic = clean_question[:50] + ("..." if len(clean_question) > 50 else "")
+
+        question_text_match = _QUESTION_TEXT_RE.search(full_question_block)
+        question_text = question_text_match.group(1).strip() if question_text_match else question
+
+        yield {
+            'question': question_text,
+            'answer_options': answer_options,
+            'context': context_before,
+            'section': sections.section_at(pos),
+            'topic': topic,
+            'full_block': full_question_block
+        }
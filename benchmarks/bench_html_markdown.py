@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""Benchmark html_markdown.html_to_markdown against html2text on large work-item bodies
+
+Usage:
+    python benchmarks/bench_html_markdown.py [--sizes 10,100,1000] [--repeat 5]
+
+Sizes are the number of repeated ADO-style sections per body (one section is
+roughly 1 KB of HTML: heading, paragraphs, nested lists, a link and a table).
+html2text is optional; its column is skipped when it is not installed.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "function_app"))
+
+from html_markdown import html_to_markdown  # noqa: E402
+
+try:
+    import html2text
+except ImportError:
+    html2text = None
+
+SECTION = (
+    "<h2>Question {n}: Data retention</h2>"
+    "<div>How long should <b>audit events</b> be kept?&nbsp;Compliance asks for &gt;= 1 year.</div>"
+    "<div><br></div>"
+    "<p>Options considered by the team:</p>"
+    "<ul><li>Keep <i>everything</i> in hot storage</li>"
+    "<li>Tiered:<ol><li>30 days hot</li><li>1 year cool</li></ol></li>"
+    "<li>See <a href=\"https://dev.azure.com/org/project/_workitems/edit/{n}\">related item</a></li></ul>"
+    "<table><tr><th>Option</th><th>Cost</th><th>Implications</th></tr>"
+    "<tr><td>A</td><td>High</td><td>Simple queries</td></tr>"
+    "<tr><td>B</td><td>Low</td><td>Rehydration delay | extra jobs</td></tr></table>"
+)
+
+
+def _html2text(html: str) -> str:
+    h = html2text.HTML2Text()
+    h.ignore_links = False
+    h.ignore_images = False
+    h.body_width = 0  # Don't wrap lines
+    return h.handle(html).strip()
+
+
+def _best_of(func, html: str, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(html)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark HTML to Markdown conversion")
+    parser.add_argument("--sizes", default="10,100,1000", help="Comma-separated section counts per body")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement (best is reported)")
+    args = parser.parse_args()
+
+    print(f"{'sections':>8} {'html KB':>8} {'html_markdown ms':>17} {'html2text ms':>13} {'speedup':>8}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        html = "".join(SECTION.format(n=n) for n in range(size))
+        ours = _best_of(html_to_markdown, html, args.repeat)
+        row = f"{size:>8} {len(html) / 1024:>8.1f} {ours * 1000:>17.2f}"
+        if html2text:
+            theirs = _best_of(_html2text, html, args.repeat)
+            row += f" {theirs * 1000:>13.2f} {theirs / ours:>7.1f}x"
+        else:
+            row += f" {'n/a':>13} {'':>8}"
+        print(row)
+
+    if not html2text:
+        print("\nhtml2text not installed - pip install html2text to compare")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""Replay recorded ADO service-hook payloads through spec_dispatch against local stand-ins
+
+Usage:
+    python benchmarks/bench_webhook.py [--events 500] [--concurrency 8] [--latency-ms 40]
+                                       [--error-rate 0.01] [--throttle-rate 0.02] [--json]
+
+Every payload in --corpus (default benchmarks/payloads/*.json, one recorded
+hook body per file) is replayed in turn through the real spec_dispatch HTTP
+trigger, in sync dispatch mode, against stand-ins for dev.azure.com and
+api.github.com (benchmarks/standins.py) running in a child process. Each replay
+gets its own work item id and revision so caches and dedup see distinct events;
+--dedup turns hook deduplication back on.
+
+Reports throughput, p50/p99 latency of spec_dispatch, outbound calls per event
+(per stand-in route, including injected faults), max RSS, and p50/p99 per
+pipeline stage from metrics.snapshot(). --trace-memory adds peak traced Python
+memory (tracemalloc slows allocation several-fold, so compare its latencies only
+with other --trace-memory runs). --json prints the same numbers as one JSON
+object for comparing runs.
+"""
+
+import argparse
+import copy
+import glob
+import json
+import multiprocessing
+import os
+import resource
+import sys
+import time
+import tracemalloc
+import urllib.request
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "function_app"))
+
+import standins  # noqa: E402
+
+
+def _percentile(samples, p):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, max(0, int(round(p / 100 * len(ordered))) - 1))]
+
+
+def _stats(url, method="GET"):
+    with urllib.request.urlopen(urllib.request.Request(f"{url}/_stats", method=method)) as response:
+        body = response.read()
+    return json.loads(body) if body else {}
+
+
+def load_corpus(pattern: str) -> list:
+    paths = sorted(glob.glob(pattern))
+    if not paths:
+        sys.exit(f"No payloads match {pattern}")
+    corpus = []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            corpus.append((os.path.basename(path), json.load(f)))
+    return corpus
+
+
+def build_events(corpus: list, count: int, first_id: int = 100000) -> list:
+    """Serialized hook bodies cycling through the corpus, each with a unique work item id and rev."""
+    events = []
+    for n in range(count):
+        name, payload = corpus[n % len(corpus)]
+        payload = copy.deepcopy(payload)
+        resource_ = payload.get("resource") or {}
+        work_item_id, rev = first_id + n, 2 + n % 50
+        resource_["workItemId"] = work_item_id
+        resource_["rev"] = rev
+        revision = resource_.get("revision")
+        if isinstance(revision, dict):
+            revision["id"], revision["rev"] = work_item_id, rev
+        events.append((name, json.dumps(payload).encode("utf-8")))
+    return events
+
+
+def configure_environment(args, ado_url: str, github_url: str):
+    os.environ.update({
+        "ADO_ORG_URL": f"{ado_url}/benchorg",
+        "ADO_PROJECT": "bench",
+        "ADO_WORK_ITEM_PAT": "bench-ado-pat",
+        "GH_WORKFLOW_DISPATCH_PAT": "bench-github-pat",
+        "GITHUB_API_URL": github_url,
+        "GITHUB_OWNER": "bench",
+        "GITHUB_REPO": "specs",
+        "DISPATCH_MODE": "sync",
+        "DEDUP_ENABLED": "true" if args.dedup else "false",
+        "ARTIFACT_STORE_BACKEND": "none",
+        "LOG_LEVEL": args.log_level,
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the spec_dispatch webhook path against local stand-ins")
+    parser.add_argument("--corpus", default=os.path.join(BENCH_DIR, "payloads", "*.json"), help="Glob of recorded hook payloads")
+    parser.add_argument("--events", type=int, default=500, help="Replayed hook deliveries (measured)")
+    parser.add_argument("--warmup", type=int, default=20, help="Deliveries replayed before measuring")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent spec_dispatch invocations")
+    parser.add_argument("--dedup", action="store_true", help="Keep hook deduplication enabled")
+    parser.add_argument("--trace-memory", action="store_true", help="Report peak traced Python memory (slows the run)")
+    parser.add_argument("--log-level", default="CRITICAL", help="LOG_LEVEL for the function while replaying (injected faults log errors)")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    standins.add_fault_arguments(parser)
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus)
+
+    # Stand-ins run in their own process - their work isn't measured
+    parent_end, child_end = multiprocessing.get_context("spawn").Pipe()
+    server = multiprocessing.get_context("spawn").Process(target=standins.serve, args=(args, 0, 0, child_end), daemon=True)
+    server.start()
+    ado_url, github_url = parent_end.recv()
+    configure_environment(args, ado_url, github_url)
+
+    import azure.functions as func  # noqa: E402
+    import function_app  # noqa: E402  - builds config / routing from the environment above
+    import metrics  # noqa: E402
+
+    def deliver(body: bytes):
+        request = func.HttpRequest(method="POST", url="http://localhost/api/spec-dispatch", body=body,
+                                   headers={"Content-Type": "application/json"})
+        started = time.perf_counter()
+        response = function_app.spec_dispatch(request)
+        return (time.perf_counter() - started) * 1000, response.status_code
+
+    try:
+        with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+            list(executor.map(lambda event: deliver(event[1]), build_events(corpus, args.warmup, first_id=900000)))
+
+            events = build_events(corpus, args.events)
+            for url in (ado_url, github_url):
+                _stats(url, "DELETE")
+            metrics.reset_metrics()
+            if args.trace_memory:
+                tracemalloc.start()
+
+            started = time.perf_counter()
+            results = list(executor.map(lambda event: deliver(event[1]), events))
+            elapsed = time.perf_counter() - started
+
+        peak_traced = tracemalloc.get_traced_memory()[1] if tracemalloc.is_tracing() else None
+        tracemalloc.stop()
+        outbound = {**_stats(ado_url), **_stats(github_url)}
+    finally:
+        server.terminate()
+
+    latencies = [latency for latency, _ in results]
+    report = {
+        "events": len(results),
+        "corpus": [name for name, _ in corpus],
+        "concurrency": args.concurrency,
+        "stand_in": {key: getattr(args, key) for key in ("latency_ms", "jitter_ms", "error_rate", "throttle_rate",
+                                                         "retry_after", "closed_issues", "comments")},
+        "throughput_per_s": round(len(results) / elapsed, 1),
+        "latency_ms": {
+            "p50": round(_percentile(latencies, 50), 2),
+            "p99": round(_percentile(latencies, 99), 2),
+            "max": round(max(latencies), 2),
+        },
+        "status": dict(sorted(Counter(status for _, status in results).items())),
+        "outbound_per_event": {name: round(count / len(results), 3) for name, count in sorted(outbound.items())},
+        "outbound_total_per_event": round(sum(count for name, count in outbound.items()
+                                              if "_injected_" not in name) / len(results), 3),
+        "peak_traced_mb": round(peak_traced / 2 ** 20, 2) if peak_traced is not None else None,
+        "max_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "stages_ms": {
+            name[len("spec_dispatch.stage."):-len("_ms")]: {"p50": summary["p50"], "p99": summary["p99"]}
+            for name, summary in metrics.snapshot().items()
+            if name.startswith("spec_dispatch.stage.") and "p50" in summary
+        },
+    }
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"events           {report['events']} ({len(corpus)} payloads, concurrency {args.concurrency})")
+    print(f"throughput       {report['throughput_per_s']} events/s")
+    print(f"latency          p50 {report['latency_ms']['p50']} ms   p99 {report['latency_ms']['p99']} ms   max {report['latency_ms']['max']} ms")
+    print(f"status           {report['status']}")
+    print(f"outbound/event   {report['outbound_total_per_event']}")
+    for name, per_event in report["outbound_per_event"].items():
+        print(f"  {name:<26} {per_event}")
+    memory = f"peak traced {report['peak_traced_mb']} MB   " if report["peak_traced_mb"] is not None else ""
+    print(f"memory           {memory}max RSS {report['max_rss_mb']} MB")
+    print(f"{'stage':<26} {'p50 ms':>8} {'p99 ms':>8}")
+    for name, summary in sorted(report["stages_ms"].items(), key=lambda item: -item[1]["p99"]):
+        print(f"  {name:<24} {summary['p50']:>8} {summary['p99']:>8}")
+
+
+if __name__ == "__main__":
+    main()
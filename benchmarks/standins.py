@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""Local HTTP stand-ins for dev.azure.com and api.github.com
+
+Usage:
+    python benchmarks/standins.py [--ado-port 8081] [--github-port 8082] [--latency-ms 40] [--error-rate 0.01]
+
+Serves the endpoints ado_client and dispatch call, with synthetic data derived
+from the work item id (every Feature has --closed-issues closed child Issues
+with --comments comments each). Faults are drawn per request:
+
+- latency: --latency-ms (+/- --jitter-ms) before every response
+- errors: --error-rate of requests answer 503 with Retry-After
+- throttling: --throttle-rate of requests answer 429 with Retry-After
+  (--retry-after seconds, default 0 so retries cost calls, not sleeps)
+
+GET /_stats returns request counts per route, plus <service>_injected_<fault>;
+DELETE /_stats resets them. bench_webhook.py runs both stand-ins in a child
+process so their CPU and memory stay out of the measured numbers.
+"""
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+WIT = r"/(?P<org>[^/]+)/(?P<project>[^/]+)/_apis/wit"
+
+
+def _work_item(work_item_id: int, rev: int = 1) -> dict:
+    return {
+        "id": work_item_id,
+        "rev": rev,
+        "fields": {
+            "System.Id": work_item_id,
+            "System.Rev": rev,
+            "System.WorkItemType": "Feature",
+            "System.Title": f"Feature {work_item_id}: Export audit events to the data lake",
+            "System.Description": "<div>Stream <b>audit events</b> to the lake.</div><ul><li>Tiered storage</li></ul>",
+            "System.ChangedBy": {"displayName": "Product Owner", "uniqueName": "po@example.com"},
+            "System.ChangedDate": "2025-10-27T14:30:00Z",
+        },
+    }
+
+
+def _issue(issue_id: int) -> dict:
+    return {
+        "id": issue_id,
+        "rev": 3,
+        "fields": {
+            "System.Id": issue_id,
+            "System.Title": f"Clarify retention for events {issue_id}",
+            "System.Description": (
+                "<p>How long should <b>audit events</b> be kept?</p>"
+                "<table><tr><th>Option</th><th>Cost</th></tr><tr><td>A</td><td>High</td></tr></table>"
+            ),
+            "System.Rev": 3,
+            "System.ChangedDate": "2025-10-20T09:00:00Z",
+        },
+    }
+
+
+class StandInServer(ThreadingHTTPServer):
+    """ThreadingHTTPServer with a route table, fault injection and request counters."""
+
+    daemon_threads = True
+
+    def __init__(self, address, name, routes, latency_ms=0.0, jitter_ms=0.0, error_rate=0.0,
+                 throttle_rate=0.0, retry_after=0, seed=0):
+        super().__init__(address, _Handler)
+        self.name = name
+        self.routes = [(method, re.compile(pattern + r"$"), name, fn) for method, pattern, name, fn in routes]
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.counts = Counter()
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def draw(self):
+        """Latency and injected fault (None, "error" or "throttle") for one request."""
+        with self._lock:
+            latency = max(0.0, self.latency_ms + self._rng.uniform(-self.jitter_ms, self.jitter_ms)) / 1000
+            roll = self._rng.random()
+        if roll < self.throttle_rate:
+            return latency, "throttle"
+        if roll < self.throttle_rate + self.error_rate:
+            return latency, "error"
+        return latency, None
+
+    def count(self, name: str):
+        with self._lock:
+            self.counts[name] += 1
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real services
+    disable_nagle_algorithm = True  # headers and body go out in separate writes
+
+    def _send(self, status: int, payload=None, headers=None):
+        body = json.dumps(payload).encode() if payload is not None else b""
+        self.send_response(status)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        if payload is not None:
+            self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _handle(self, method: str):
+        server: StandInServer = self.server
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        url = urlsplit(self.path)
+
+        if url.path == "/_stats":
+            if method == "DELETE":
+                with server._lock:
+                    server.counts.clear()
+                return self._send(204)
+            with server._lock:
+                return self._send(200, dict(server.counts))
+
+        for route_method, pattern, name, fn in server.routes:
+            match = pattern.match(url.path)
+            if route_method == method and match:
+                break
+        else:
+            server.count(f"{server.name}_unmatched")
+            return self._send(404, {"message": f"No stand-in route for {method} {url.path}"})
+
+        server.count(name)
+        latency, fault = server.draw()
+        if latency:
+            time.sleep(latency)
+        if fault:
+            server.count(f"{server.name}_injected_{fault}")
+            status = 429 if fault == "throttle" else 503
+            return self._send(status, {"message": f"stand-in {fault}"}, {"Retry-After": str(server.retry_after)})
+
+        status, payload = fn(match, parse_qs(url.query), json.loads(body) if body else None)
+        self._send(status, payload)
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def do_PATCH(self):
+        self._handle("PATCH")
+
+    def do_DELETE(self):
+        self._handle("DELETE")
+
+    def log_message(self, format, *args):
+        pass
+
+
+def ado_routes(closed_issues: int = 3, comments: int = 2) -> list:
+    """dev.azure.com work item endpoints used by ado_client."""
+
+    def work_item(match, query, body):
+        return 200, _work_item(int(match["id"]))
+
+    def revision(match, query, body):
+        return 200, _work_item(int(match["id"]), int(match["rev"]))
+
+    def wiql(match, query, body):
+        parent = re.search(r"\[System\.Parent\]\s*=\s*(\d+)", (body or {}).get("query", ""))
+        parent_id = int(parent.group(1)) if parent else 0
+        return 200, {"workItems": [{"id": parent_id * 100 + n} for n in range(1, closed_issues + 1)]}
+
+    def batch(match, query, body):
+        ids = [int(i) for i in query.get("ids", [""])[0].split(",") if i]
+        return 200, {"count": len(ids), "value": [_issue(i) for i in ids]}
+
+    def item_comments(match, query, body):
+        issue_id = int(match["id"])
+        return 200, {
+            "totalCount": comments,
+            "comments": [{"id": n, "text": f"<div>Decision {n} for {issue_id}: keep 30 days hot, 1 year cool.</div>"}
+                         for n in range(comments, 0, -1)]
+        }
+
+    return [
+        ("GET", WIT + r"/workitems/(?P<id>\d+)", "ado_work_item", work_item),
+        ("GET", WIT + r"/workitems/(?P<id>\d+)/revisions/(?P<rev>\d+)", "ado_revision", revision),
+        ("POST", WIT + r"/wiql", "ado_wiql", wiql),
+        ("GET", WIT + r"/workitems", "ado_batch", batch),
+        ("GET", WIT + r"/workitems/(?P<id>\d+)/comments", "ado_comments", item_comments),
+    ]
+
+
+def github_routes() -> list:
+    """api.github.com workflow_dispatch endpoint used by dispatch."""
+
+    def dispatches(match, query, body):
+        if not body or "ref" not in body:
+            return 422, {"message": "Invalid request. \"ref\" wasn't supplied."}
+        return 204, None
+
+    return [
+        ("POST", r"/repos/(?P<owner>[^/]+)/(?P<repo>[^/]+)/actions/workflows/(?P<workflow>[^/]+)/dispatches",
+         "github_dispatch", dispatches),
+    ]
+
+
+def start(name: str, routes, port: int = 0, **faults) -> StandInServer:
+    """Serve routes on 127.0.0.1:port (0 = any free port) from a daemon thread."""
+    server = StandInServer(("127.0.0.1", port), name, routes, **faults)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def add_fault_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Added latency per stand-in response")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Uniform +/- jitter on the latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered 503")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Fraction of requests answered 429")
+    parser.add_argument("--retry-after", type=int, default=0, help="Retry-After seconds on injected faults")
+    parser.add_argument("--closed-issues", type=int, default=3, help="Closed child Issues per Feature")
+    parser.add_argument("--comments", type=int, default=2, help="Comments per closed Issue")
+    parser.add_argument("--seed", type=int, default=0, help="Fault injection seed")
+
+
+def serve(args, ado_port: int = 0, github_port: int = 0, ready=None):
+    """Run both stand-ins until interrupted; sends (ado_url, github_url) to ready when listening."""
+    faults = dict(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate,
+                  throttle_rate=args.throttle_rate, retry_after=args.retry_after, seed=args.seed)
+    ado = start("ado", ado_routes(args.closed_issues, args.comments), ado_port, **faults)
+    github = start("github", github_routes(), github_port, **faults)
+    urls = (f"http://127.0.0.1:{ado.server_address[1]}", f"http://127.0.0.1:{github.server_address[1]}")
+    if ready is not None:
+        ready.send(urls)
+    else:
+        print(f"ADO stand-in:    {urls[0]}  (ADO_ORG_URL={urls[0]}/<org>)")
+        print(f"GitHub stand-in: {urls[1]}  (GITHUB_API_URL={urls[1]})")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local ADO / GitHub stand-ins")
+    parser.add_argument("--ado-port", type=int, default=8081)
+    parser.add_argument("--github-port", type=int, default=8082)
+    add_fault_arguments(parser)
+    args = parser.parse_args()
+    serve(args, args.ado_port, args.github_port)
+
+
+if __name__ == "__main__":
+    main()
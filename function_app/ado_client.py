@@ -1,164 +1,250 @@
 """
 Azure DevOps REST API client for fetching and updating work items.
 """
-import base64
-import logging
 import os
+import re
 import sys
-from typing import List, Optional
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Dict, Iterable, List, Optional
 
 import requests
 
-logger = logging.getLogger(__name__)
+try:
+    from . import constants, http_session, metrics
+    from .app_logging import StructuredLogger
+    from .config import Config, get_config
+    from .models import WorkItemDetails
+except ImportError:
+    import constants
+    import http_session
+    import metrics
+    from app_logging import StructuredLogger
+    from config import Config, get_config
+    from models import WorkItemDetails
 
+logger = StructuredLogger(__name__)
 
-def get_work_item(work_item_id: int) -> Optional[dict]:
+_IDENTITY_EMAIL_PATTERN = re.compile(r'<([^>]+)>')
+# Matches the marker create_issue_workitem appends, raw or HTML-escaped by ADO
+_IDEMPOTENCY_KEY_PATTERN = re.compile(r'(?:<|&lt;)!--\s*idempotency_key:\s*([\w.-]+)')
+
+
+def get_work_item(work_item_id: int, cfg: Optional[Config] = None) -> Optional[dict]:
     """
     Fetch work item details from Azure DevOps REST API.
     
     Args:
         work_item_id: Work item ID to fetch
+        cfg: Optional config snapshot (default: config.get_config())
     
     Returns:
         Work item JSON if successful, None on error
     
-    Uses environment variables:
+    Uses settings (config snapshot, read once per instance):
         - ADO_ORG_URL: Azure DevOps organization URL (e.g., https://dev.azure.com/org)
         - ADO_PROJECT: Project name
         - ADO_WORK_ITEM_PAT: Personal Access Token (Work Items: Read)
     """
-    org_url = os.getenv("ADO_ORG_URL")
-    project = os.getenv("ADO_PROJECT")
-    pat = os.getenv("ADO_WORK_ITEM_PAT")
-    
-    if not all([org_url, project, pat]):
-        logger.error("Missing required ADO environment variables (ADO_ORG_URL, ADO_PROJECT, ADO_WORK_ITEM_PAT)")
+    cfg = cfg or get_config()
+    if not cfg.ado_configured:
+        logger.error("ado_config_error", {"error": cfg.keyvault_error("ADO_WORK_ITEM_PAT") or "Missing required ADO environment variables (ADO_ORG_URL, ADO_PROJECT, ADO_WORK_ITEM_PAT)"})
         return None
     
     # Construct API URL
-    url = f"{org_url}/{project}/_apis/wit/workitems/{work_item_id}?api-version=7.0"
-    
-    # Encode PAT for basic auth
-    import base64
-    auth_header = base64.b64encode(f":{pat}".encode()).decode()
-    headers = {
-        "Authorization": f"Basic {auth_header}",
-        "Content-Type": "application/json"
-    }
+    url = f"{cfg.ado_base_url}/workitems/{work_item_id}?api-version=7.0"
+    
+    headers = cfg.ado_headers
     
     try:
-        response = requests.get(url, headers=headers, timeout=15)
+        response = http_session.get(url, headers=headers, timeout=15)
         
         if response.status_code == 200:
             return response.json()
         else:
-            logger.error(f"Failed to fetch work item {work_item_id}: HTTP {response.status_code} - {response.text[:500]}")
+            logger.error("ado_request_failed", {"operation": "get_work_item", "work_item_id": work_item_id, "status": response.status_code, "error": response.text[:500]})
             return None
             
     except requests.exceptions.Timeout:
-        logger.error(f"Timeout fetching work item {work_item_id}")
+        logger.error("ado_request_failed", {"operation": "get_work_item", "work_item_id": work_item_id, "error": "timeout"})
         return None
     except requests.exceptions.RequestException as e:
-        logger.error(f"Error fetching work item {work_item_id}: {str(e)}")
+        logger.error("ado_request_failed", {"operation": "get_work_item", "work_item_id": work_item_id, "error": str(e)})
         return None
 
 
-def get_work_item_latest_revision(work_item_id: int) -> Optional[dict]:
+def get_work_item_revision(work_item_id: int, rev: int, cfg: Optional[Config] = None) -> Optional[dict]:
     """
-    Fetch the latest revision of a work item from Azure DevOps REST API.
-    This is useful for getting the most recent ChangedBy user information.
+    Fetch a specific revision of a work item from Azure DevOps REST API.
     
     Args:
-        work_item_id: Work item ID to fetch revisions for
+        work_item_id: Work item ID
+        rev: Revision number (e.g. resource.rev from the Service Hook payload)
+        cfg: Optional config snapshot (default: config.get_config())
     
     Returns:
-        Latest revision JSON if successful, None on error
+        Revision JSON if successful, None on error
     
-    Uses environment variables:
+    Uses settings (config snapshot, read once per instance):
         - ADO_ORG_URL: Azure DevOps organization URL (e.g., https://dev.azure.com/org)
         - ADO_PROJECT: Project name
         - ADO_WORK_ITEM_PAT: Personal Access Token (Work Items: Read)
     """
-    org_url = os.getenv("ADO_ORG_URL")
-    project = os.getenv("ADO_PROJECT")
-    pat = os.getenv("ADO_WORK_ITEM_PAT")
-    
-    if not all([org_url, project, pat]):
-        logger.error("Missing required ADO environment variables (ADO_ORG_URL, ADO_PROJECT, ADO_WORK_ITEM_PAT)")
-        return None
-    
-    # First, get the work item to find the latest revision number
-    work_item = get_work_item(work_item_id)
-    if work_item is None:
-        logger.error(f"Failed to fetch work item {work_item_id} to get revision number")
+    cfg = cfg or get_config()
+    if not cfg.ado_configured:
+        logger.error("ado_config_error", {"error": cfg.keyvault_error("ADO_WORK_ITEM_PAT") or "Missing required ADO environment variables (ADO_ORG_URL, ADO_PROJECT, ADO_WORK_ITEM_PAT)"})
         return None
     
-    # Get the latest revision number from the work item
-    latest_rev = work_item.get("rev", None)
-    if latest_rev is None:
-        logger.warning(f"Work item {work_item_id} has no 'rev' field")
-        return None
-    
-    # Construct API URL to get the specific revision
-    url = f"{org_url}/{project}/_apis/wit/workitems/{work_item_id}/revisions/{latest_rev}?api-version=7.0"
+    url = f"{cfg.ado_base_url}/workitems/{work_item_id}/revisions/{rev}?api-version=7.0"
     
-    # Encode PAT for basic auth
-    import base64
-    auth_header = base64.b64encode(f":{pat}".encode()).decode()
-    headers = {
-        "Authorization": f"Basic {auth_header}",
-        "Content-Type": "application/json"
-    }
+    headers = cfg.ado_headers
     
     try:
-        response = requests.get(url, headers=headers, timeout=15)
+        response = http_session.get(url, headers=headers, timeout=15)
         
         if response.status_code == 200:
             return response.json()
         else:
-            logger.error(f"Failed to fetch revision {latest_rev} for work item {work_item_id}: HTTP {response.status_code} - {response.text[:500]}")
+            logger.error("ado_request_failed", {"operation": "get_work_item_revision", "work_item_id": work_item_id, "rev": rev, "status": response.status_code, "error": response.text[:500]})
             return None
             
     except requests.exceptions.Timeout:
-        logger.error(f"Timeout fetching revision {latest_rev} for work item {work_item_id}")
+        logger.error("ado_request_failed", {"operation": "get_work_item_revision", "work_item_id": work_item_id, "rev": rev, "error": "timeout"})
         return None
     except requests.exceptions.RequestException as e:
-        logger.error(f"Error fetching revision {latest_rev} for work item {work_item_id}: {str(e)}")
+        logger.error("ado_request_failed", {"operation": "get_work_item_revision", "work_item_id": work_item_id, "rev": rev, "error": str(e)})
+        return None
+
+
+def get_work_item_latest_revision(work_item_id: int, cfg: Optional[Config] = None) -> Optional[dict]:
+    """
+    Fetch the latest revision of a work item from Azure DevOps REST API.
+    This is useful for getting the most recent ChangedBy user information.
+    
+    The work item endpoint already returns the latest revision's fields and
+    ``rev``, so this is a single call rather than work item + revisions/{rev}.
+    
+    Args:
+        work_item_id: Work item ID to fetch revisions for
+        cfg: Optional config snapshot (default: config.get_config())
+    
+    Returns:
+        Latest revision JSON (id, rev, fields) if successful, None on error
+    """
+    work_item = get_work_item(work_item_id, cfg=cfg)
+    if work_item is None:
+        logger.error("ado_request_failed", {"operation": "get_work_item_latest_revision", "work_item_id": work_item_id})
+        return None
+    
+    if work_item.get("rev") is None:
+        logger.warning("work_item_rev_missing", {"work_item_id": work_item_id})
         return None
+    
+    return work_item
 
 
-def update_work_item_description(work_item_id: int, description: str) -> bool:
+def extract_unique_name(identity) -> Optional[str]:
+    """
+    Extract the email/UPN from an ADO identity field.
+    
+    Identity fields are either a dict with ``uniqueName`` or a string in the
+    form "Display Name <email>". The REST API needs the email, not the GUID.
+    """
+    if isinstance(identity, dict):
+        return identity.get("uniqueName") or None
+    if isinstance(identity, str):
+        email_match = _IDENTITY_EMAIL_PATTERN.search(identity)
+        if email_match:
+            return email_match.group(1)
+    return None
+
+
+def resolve_work_item_details(work_item_id: int, resource: Optional[dict] = None, cfg: Optional[Config] = None) -> WorkItemDetails:
+    """
+    Resolve title, description and ChangedBy for dispatch with at most one ADO call.
+    
+    The payload is authoritative when ``resource.revision.fields`` is present and
+    names who made the revision (``resource.revisedBy`` or ``System.ChangedBy``):
+    that revision is exactly the state the hook fired for. Otherwise a single ADO
+    call is made - for the revision number from the payload when known, else for
+    the current work item.
+    
+    Args:
+        work_item_id: Work item ID
+        resource: ``resource`` object from the Service Hook payload (optional)
+        cfg: Optional config snapshot (default: config.get_config())
+    
+    Returns:
+        WorkItemDetails with ``source`` set to the place that answered
+    """
+    resource = resource or {}
+    details = WorkItemDetails(work_item_id=work_item_id, title=f"Work Item #{work_item_id}")
+    
+    revision = resource.get("revision") or {}
+    fields = revision.get("fields") or {}
+    rev = revision.get("rev") or resource.get("rev")
+    
+    if fields:
+        changed_by = extract_unique_name(resource.get("revisedBy")) or extract_unique_name(fields.get("System.ChangedBy"))
+        if changed_by:
+            details.title = fields.get("System.Title") or details.title
+            details.description = fields.get("System.Description", "")
+            details.changed_by = changed_by
+            details.rev = rev
+            details.source = "payload"
+            return details
+        logger.debug("payload_changed_by_missing", {"work_item_id": work_item_id, "fallback": "ado"})
+    
+    if rev:
+        fetched = get_work_item_revision(work_item_id, rev, cfg=cfg)
+        source = "ado_revision"
+    else:
+        fetched = get_work_item(work_item_id, cfg=cfg)
+        source = "ado_work_item"
+    
+    if fetched is None:
+        # Keep whatever the payload had so dispatch can still proceed
+        if fields:
+            details.title = fields.get("System.Title") or details.title
+            details.description = fields.get("System.Description", "")
+            details.rev = rev
+            details.source = "payload"
+        logger.warning("work_item_resolution_fallback", {"work_item_id": work_item_id, "source": details.source})
+        return details
+    
+    fetched_fields = fetched.get("fields", {})
+    details.title = fetched_fields.get("System.Title") or details.title
+    details.description = fetched_fields.get("System.Description", "")
+    details.changed_by = extract_unique_name(fetched_fields.get("System.ChangedBy"))
+    details.rev = fetched.get("rev", rev)
+    details.source = source
+    return details
+
+
+def update_work_item_description(work_item_id: int, description: str, cfg: Optional[Config] = None) -> bool:
     """
     Update work item description using PATCH operation.
     
     Args:
         work_item_id: Work item ID to update
         description: New description HTML content
+        cfg: Optional config snapshot (default: config.get_config())
     
     Returns:
         True if successful, False on error
     
-    Uses environment variables:
+    Uses settings (config snapshot, read once per instance):
         - ADO_ORG_URL: Azure DevOps organization URL
         - ADO_PROJECT: Project name
         - ADO_WORK_ITEM_PAT: Personal Access Token (Work Items: Read & Write)
     """
-    org_url = os.getenv("ADO_ORG_URL")
-    project = os.getenv("ADO_PROJECT")
-    pat = os.getenv("ADO_WORK_ITEM_PAT")
-    
-    if not all([org_url, project, pat]):
-        logger.error("Missing required ADO environment variables")
+    cfg = cfg or get_config()
+    if not cfg.ado_configured:
+        logger.error("ado_config_error", {"error": cfg.keyvault_error("ADO_WORK_ITEM_PAT") or "Missing required ADO environment variables"})
         return False
     
-    url = f"{org_url}/{project}/_apis/wit/workitems/{work_item_id}?api-version=7.1"
+    url = f"{cfg.ado_base_url}/workitems/{work_item_id}?api-version=7.1"
     
-    import base64
-    auth_header = base64.b64encode(f":{pat}".encode()).decode()
-    headers = {
-        "Authorization": f"Basic {auth_header}",
-        "Content-Type": "application/json-patch+json"
-    }
+    headers = cfg.ado_patch_headers
     
     # JSON Patch format for ADO API
     payload = [
@@ -170,20 +256,20 @@ def update_work_item_description(work_item_id: int, description: str) -> bool:
     ]
     
     try:
-        response = requests.patch(url, json=payload, headers=headers, timeout=15)
+        response = http_session.patch(url, json=payload, headers=headers, timeout=15)
         
         if response.status_code in [200, 201]:
-            logger.info(f"Successfully updated description for work item {work_item_id}")
+            logger.info("work_item_description_updated", {"work_item_id": work_item_id})
             return True
         else:
-            logger.error(f"Failed to update work item {work_item_id}: HTTP {response.status_code} - {response.text}")
+            logger.error("ado_request_failed", {"operation": "update_work_item_description", "work_item_id": work_item_id, "status": response.status_code, "error": response.text[:500]})
             return False
             
     except requests.exceptions.Timeout:
-        logger.error(f"Timeout updating work item {work_item_id}")
+        logger.error("ado_request_failed", {"operation": "update_work_item_description", "work_item_id": work_item_id, "error": "timeout"})
         return False
     except requests.exceptions.RequestException as e:
-        logger.error(f"Error updating work item {work_item_id}: {str(e)}")
+        logger.error("ado_request_failed", {"operation": "update_work_item_description", "work_item_id": work_item_id, "error": str(e)})
         return False
 
 
@@ -193,7 +279,9 @@ def create_issue_workitem(
     description: str,
     tags: str,
     idempotency_key: str,
-    assigned_to: Optional[str] = None
+    assigned_to: Optional[str] = None,
+    skip_idempotency_check: bool = False,
+    cfg: Optional[Config] = None
 ) -> Optional[dict]:
     """
     Create ADO Issue work item with Parent-Child link to Feature.
@@ -205,28 +293,25 @@ def create_issue_workitem(
         tags: Semicolon-separated tags
         idempotency_key: Unique key to prevent duplicates
         assigned_to: Optional assignee email/UPN
+        skip_idempotency_check: Skip the per-Issue WIQL lookup (the caller already
+            diffed against get_existing_idempotency_keys)
+        cfg: Optional config snapshot (default: config.get_config())
     
     Returns:
         Issue dict if created, None if duplicate detected or error
     
-    Uses environment variables:
+    Uses settings (config snapshot, read once per instance):
         - ADO_ORG_URL: Azure DevOps organization URL
         - ADO_PROJECT: Project name  
         - ADO_WORK_ITEM_PAT: Personal Access Token (Work Items: Read & Write)
     """
-    org_url = os.getenv("ADO_ORG_URL")
-    project = os.getenv("ADO_PROJECT")
-    pat = os.getenv("ADO_WORK_ITEM_PAT")
-    
-    if not all([org_url, project, pat]):
-        logger.error("Missing required ADO environment variables")
+    cfg = cfg or get_config()
+    if not cfg.ado_configured:
+        logger.error("ado_config_error", {"error": cfg.keyvault_error("ADO_WORK_ITEM_PAT") or "Missing required ADO environment variables"})
         return None
     
-    import base64
-    auth_header = base64.b64encode(f":{pat}".encode()).decode()
-    
     # Check for existing Issue (idempotency)
-    query_url = f"{org_url}/{project}/_apis/wit/wiql?api-version=7.0"
+    query_url = f"{cfg.ado_base_url}/wiql?api-version=7.0"
     query_payload = {
         "query": f"""
             SELECT [System.Id] 
@@ -237,25 +322,23 @@ def create_issue_workitem(
         """
     }
     
-    try:
-        query_response = requests.post(
-            query_url,
-            json=query_payload,
-            headers={
-                "Authorization": f"Basic {auth_header}",
-                "Content-Type": "application/json"
-            },
-            timeout=10
-        )
-        
-        if query_response.ok and query_response.json().get('workItems'):
-            logger.info(f"Issue already exists for idempotency key {idempotency_key}")
-            return None  # Duplicate, skip
-    except requests.exceptions.RequestException as e:
-        logger.warning(f"Idempotency check failed: {str(e)} - proceeding with creation")
+    if not skip_idempotency_check:
+        try:
+            query_response = http_session.post(
+                query_url,
+                json=query_payload,
+                headers=cfg.ado_headers,
+                timeout=10
+            )
+            
+            if query_response.ok and query_response.json().get('workItems'):
+                logger.info("issue_exists", {"idempotency_key": idempotency_key})
+                return None  # Duplicate, skip
+        except requests.exceptions.RequestException as e:
+            logger.warning("idempotency_check_failed", {"idempotency_key": idempotency_key, "error": str(e), "fallback": "create"})
     
     # Create Issue (JSON Patch format)
-    create_url = f"{org_url}/{project}/_apis/wit/workitems/$Issue?api-version=7.0"
+    create_url = f"{cfg.ado_base_url}/workitems/$Issue?api-version=7.0"
     
     # Add idempotency key to description for duplicate detection
     description_with_key = f"{description}\n\n<!-- idempotency_key: {idempotency_key} -->"
@@ -272,7 +355,7 @@ def create_issue_workitem(
             "path": "/relations/-",
             "value": {
                 "rel": "System.LinkTypes.Hierarchy-Reverse",
-                "url": f"{org_url}/{project}/_apis/wit/workitems/{parent_feature_id}",
+                "url": f"{cfg.ado_base_url}/workitems/{parent_feature_id}",
                 "attributes": {"comment": "Auto-generated clarification"}
             }
         }
@@ -282,19 +365,16 @@ def create_issue_workitem(
         payload.append({"op": "add", "path": "/fields/System.AssignedTo", "value": assigned_to})
     
     try:
-        response = requests.post(
+        response = http_session.post(
             create_url,
             json=payload,
-            headers={
-                "Authorization": f"Basic {auth_header}",
-                "Content-Type": "application/json-patch+json"
-            },
+            headers=cfg.ado_patch_headers,
             timeout=30
         )
         
         if response.ok:
             issue = response.json()
-            logger.info(f"Created Issue {issue['id']}: {title}")
+            logger.info("issue_created", {"issue_id": issue["id"], "work_item_id": parent_feature_id, "title": title})
             return issue
         else:
             error_msg = f"HTTP {response.status_code}"
@@ -307,52 +387,206 @@ def create_issue_workitem(
             else:
                 error_msg += f" - {response.text[:500]}"
             
-            logger.error(f"Failed to create Issue: {error_msg}")
+            logger.error("ado_request_failed", {"operation": "create_issue", "work_item_id": parent_feature_id, "error": error_msg})
             print(f"❌ Failed to create Issue: {error_msg}", file=sys.stderr)
             if response.text:
                 print(f"Response: {response.text[:500]}", file=sys.stderr)
             return None
             
     except requests.exceptions.Timeout:
-        logger.error(f"Timeout creating Issue for Feature {parent_feature_id}")
+        logger.error("ado_request_failed", {"operation": "create_issue", "work_item_id": parent_feature_id, "error": "timeout"})
+        return None
+    except requests.exceptions.RequestException as e:
+        logger.error("ado_request_failed", {"operation": "create_issue", "work_item_id": parent_feature_id, "error": str(e)})
+        return None
+
+
+def get_existing_idempotency_keys(parent_feature_id: int, cfg: Optional[Config] = None) -> Optional[Dict[str, int]]:
+    """
+    List the idempotency keys of all Issues already under a Feature.
+    
+    One WIQL query for the child Issue IDs (no full-text CONTAINS scan) plus
+    one batch fetch of System.Description per WORK_ITEM_BATCH_SIZE Issues;
+    keys are parsed from the ``<!-- idempotency_key: ... -->`` marker that
+    create_issue_workitem appends.
+    
+    Args:
+        parent_feature_id: Parent Feature work item ID
+        cfg: Optional config snapshot (default: config.get_config())
+    
+    Returns:
+        Dict of idempotency key -> Issue ID, or None if the lookup failed
+        (callers should fall back to per-Issue checks)
+    """
+    cfg = cfg or get_config()
+    if not cfg.ado_configured:
+        logger.error("ado_config_error", {"error": cfg.keyvault_error("ADO_WORK_ITEM_PAT") or "Missing required ADO environment variables for get_existing_idempotency_keys"})
+        return None
+    
+    headers = cfg.ado_headers
+    
+    wiql_url = f"{cfg.ado_base_url}/wiql?api-version=7.0"
+    wiql_query = {
+        "query": f"""
+            SELECT [System.Id]
+            FROM WorkItems
+            WHERE [System.WorkItemType] = 'Issue'
+            AND [System.Parent] = {parent_feature_id}
+        """
+    }
+    
+    try:
+        response = http_session.post(wiql_url, json=wiql_query, headers=headers, timeout=15)
+        if response.status_code != 200:
+            logger.error("ado_request_failed", {"operation": "get_existing_idempotency_keys", "step": "wiql", "work_item_id": parent_feature_id, "status": response.status_code, "error": response.text[:500]})
+            return None
+        
+        ids = [wi["id"] for wi in response.json().get("workItems", [])]
+        keys: Dict[str, int] = {}
+        for start in range(0, len(ids), constants.WORK_ITEM_BATCH_SIZE):
+            chunk = ids[start:start + constants.WORK_ITEM_BATCH_SIZE]
+            ids_param = ",".join(str(wi_id) for wi_id in chunk)
+            batch_url = f"{cfg.ado_base_url}/workitems?ids={ids_param}&fields=System.Id,System.Description&api-version=7.0"
+            batch_response = http_session.get(batch_url, headers=headers, timeout=15)
+            if batch_response.status_code != 200:
+                logger.error("ado_request_failed", {"operation": "get_existing_idempotency_keys", "step": "batch", "work_item_id": parent_feature_id, "status": batch_response.status_code, "error": batch_response.text[:500]})
+                return None
+            for wi in batch_response.json().get("value", []):
+                description = wi.get("fields", {}).get("System.Description") or ""
+                for key in _IDEMPOTENCY_KEY_PATTERN.findall(description):
+                    keys[key] = wi.get("id")
+        
+        logger.info("idempotency_keys_listed", {"work_item_id": parent_feature_id, "keys": len(keys), "issues": len(ids)})
+        return keys
+    
+    except requests.exceptions.Timeout:
+        logger.error("ado_request_failed", {"operation": "get_existing_idempotency_keys", "work_item_id": parent_feature_id, "error": "timeout"})
         return None
     except requests.exceptions.RequestException as e:
-        logger.error(f"Error creating Issue: {str(e)}")
+        logger.error("ado_request_failed", {"operation": "get_existing_idempotency_keys", "work_item_id": parent_feature_id, "error": str(e)})
         return None
 
 
-def get_child_issues(parent_feature_id: int) -> List[dict]:
+def create_issue_if_missing(
+    parent_feature_id: int,
+    issue: dict,
+    existing_keys: Optional[Dict[str, int]],
+    cfg: Optional[Config] = None
+) -> dict:
+    """
+    Create one clarification Issue unless its key is in ``existing_keys``.
+    
+    Args:
+        parent_feature_id: Parent Feature work item ID
+        issue: Dict with title, description, tags, idempotency_key and
+            optionally assigned_to
+        existing_keys: Result of get_existing_idempotency_keys; None when the
+            lookup failed, in which case create_issue_workitem runs its own check
+        cfg: Optional config snapshot (default: config.get_config())
+    
+    Returns:
+        {"idempotency_key", "title", "status", "id"} - see create_issue_workitems_batch
+    """
+    result = {"idempotency_key": issue["idempotency_key"], "title": issue["title"], "status": "failed", "id": None}
+    if existing_keys is not None and issue["idempotency_key"] in existing_keys:
+        result.update(status="exists", id=existing_keys[issue["idempotency_key"]])
+        return result
+    
+    try:
+        created = create_issue_workitem(
+            parent_feature_id=parent_feature_id,
+            title=issue["title"],
+            description=issue["description"],
+            tags=issue.get("tags", ""),
+            idempotency_key=issue["idempotency_key"],
+            assigned_to=issue.get("assigned_to"),
+            skip_idempotency_check=existing_keys is not None,
+            cfg=cfg
+        )
+    except Exception as e:
+        logger.error("issue_create_failed", {"work_item_id": parent_feature_id, "idempotency_key": issue["idempotency_key"], "error": str(e)})
+        return result
+    
+    if created:
+        result.update(status="created", id=created.get("id"))
+    elif existing_keys is None:
+        # create_issue_workitem returns None for duplicates and errors alike
+        result["status"] = "skipped"
+    return result
+
+
+def create_issue_workitems_batch(
+    parent_feature_id: int,
+    issues: List[dict],
+    max_workers: Optional[int] = None,
+    cfg: Optional[Config] = None
+) -> List[dict]:
+    """
+    Create several clarification Issues under a Feature.
+    
+    Existing Issues are found with a single get_existing_idempotency_keys lookup
+    and diffed locally; only the missing ones are created, through a bounded
+    thread pool (per-Issue WIQL checks are skipped).
+    
+    Args:
+        parent_feature_id: Parent Feature work item ID
+        issues: Dicts with title, description, tags, idempotency_key and
+            optionally assigned_to
+        max_workers: Max concurrent creates (default: ADO_ISSUE_CREATE_CONCURRENCY
+            or ISSUE_CREATE_MAX_WORKERS)
+        cfg: Optional config snapshot (default: config.get_config()), shared by
+            the key lookup and every create
+    
+    Returns:
+        One result per input, in input order:
+        {"idempotency_key", "title", "status", "id"} where status is "created",
+        "exists", "failed", or "skipped" (duplicate or error, only when the key
+        lookup failed and each create ran its own check)
+    """
+    if max_workers is None:
+        max_workers = int(os.getenv("ADO_ISSUE_CREATE_CONCURRENCY", constants.ISSUE_CREATE_MAX_WORKERS))
+    
+    cfg = cfg or get_config()
+    existing = get_existing_idempotency_keys(parent_feature_id, cfg)
+    
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(issues) or 1)), thread_name_prefix="ado-create") as executor:
+        results = list(executor.map(metrics.bind(lambda issue: create_issue_if_missing(parent_feature_id, issue, existing, cfg)), issues))
+    
+    logger.info("issue_batch_created", {
+        "work_item_id": parent_feature_id,
+        "created": sum(r['status'] == 'created' for r in results),
+        "existing": sum(r['status'] == 'exists' for r in results),
+        "not_created": sum(r['status'] not in ('created', 'exists') for r in results)
+    })
+    return results
+
+
+def get_child_issues(parent_feature_id: int, cfg: Optional[Config] = None) -> List[dict]:
     """
     Fetch closed child Issues for a Feature using WIQL query.
     
     Args:
         parent_feature_id: Parent Feature work item ID
+        cfg: Optional config snapshot (default: config.get_config())
     
     Returns:
-        List of work items with id, title, and description
+        List of work items with id, title, description, rev and changed_date
         Empty list on error or if no closed Issues found
     
-    Uses environment variables:
+    Uses settings (config snapshot, read once per instance):
         - ADO_ORG_URL: Azure DevOps organization URL
         - ADO_PROJECT: Project name
         - ADO_WORK_ITEM_PAT: Personal Access Token (Work Items: Read)
     """
-    org_url = os.getenv("ADO_ORG_URL")
-    project = os.getenv("ADO_PROJECT")
-    pat = os.getenv("ADO_WORK_ITEM_PAT")
-    
-    if not all([org_url, project, pat]):
-        logger.error("Missing required ADO environment variables for get_child_issues")
+    cfg = cfg or get_config()
+    if not cfg.ado_configured:
+        logger.error("ado_config_error", {"error": cfg.keyvault_error("ADO_WORK_ITEM_PAT") or "Missing required ADO environment variables for get_child_issues"})
         return []
     
-    auth_header = base64.b64encode(f":{pat}".encode()).decode()
-    headers = {
-        "Authorization": f"Basic {auth_header}",
-        "Content-Type": "application/json"
-    }
+    headers = cfg.ado_headers
     
     # WIQL query to find closed child Issues
-    wiql_url = f"{org_url}/{project}/_apis/wit/wiql?api-version=7.0"
+    wiql_url = f"{cfg.ado_base_url}/wiql?api-version=7.0"
     wiql_query = {
         "query": f"""
             SELECT [System.Id], [System.Title], [System.Description]
@@ -364,31 +598,31 @@ def get_child_issues(parent_feature_id: int) -> List[dict]:
     }
     
     try:
-        response = requests.post(wiql_url, json=wiql_query, headers=headers, timeout=15)
+        response = http_session.post(wiql_url, json=wiql_query, headers=headers, timeout=15)
         
         if response.status_code != 200:
-            logger.error(f"WIQL query failed for parent {parent_feature_id}: HTTP {response.status_code} - {response.text[:500]}")
+            logger.error("ado_request_failed", {"operation": "get_child_issues", "step": "wiql", "work_item_id": parent_feature_id, "status": response.status_code, "error": response.text[:500]})
             return []
         
         query_result = response.json()
         work_items_refs = query_result.get("workItems", [])
         
         if not work_items_refs:
-            logger.info(f"No closed Issues found for Feature {parent_feature_id}")
+            logger.debug("closed_issues_found", {"work_item_id": parent_feature_id, "issues": 0})
             return []
         
         # Extract work item IDs
         work_item_ids = [wi["id"] for wi in work_items_refs]
-        logger.info(f"Found {len(work_item_ids)} closed Issues for Feature {parent_feature_id}: {work_item_ids}")
+        logger.debug("closed_issues_found", lambda: {"work_item_id": parent_feature_id, "issues": len(work_item_ids), "ids": work_item_ids})
         
         # Batch fetch work item details
         ids_param = ",".join(str(wi_id) for wi_id in work_item_ids)
-        batch_url = f"{org_url}/{project}/_apis/wit/workitems?ids={ids_param}&fields=System.Id,System.Title,System.Description&api-version=7.0"
+        batch_url = f"{cfg.ado_base_url}/workitems?ids={ids_param}&fields=System.Id,System.Title,System.Description,System.Rev,System.ChangedDate&api-version=7.0"
         
-        batch_response = requests.get(batch_url, headers=headers, timeout=15)
+        batch_response = http_session.get(batch_url, headers=headers, timeout=15)
         
         if batch_response.status_code != 200:
-            logger.error(f"Batch fetch failed for Issues: HTTP {batch_response.status_code} - {batch_response.text[:500]}")
+            logger.error("ado_request_failed", {"operation": "get_child_issues", "step": "batch", "work_item_id": parent_feature_id, "status": batch_response.status_code, "error": batch_response.text[:500]})
             return []
         
         batch_result = batch_response.json()
@@ -399,57 +633,59 @@ def get_child_issues(parent_feature_id: int) -> List[dict]:
             work_items.append({
                 "id": wi.get("id"),
                 "title": fields.get("System.Title", ""),
-                "description": fields.get("System.Description", "")
+                "description": fields.get("System.Description", ""),
+                "rev": wi.get("rev", fields.get("System.Rev")),
+                "changed_date": fields.get("System.ChangedDate")
             })
         
         return work_items
         
     except requests.exceptions.Timeout:
-        logger.error(f"Timeout fetching child Issues for Feature {parent_feature_id}")
+        logger.error("ado_request_failed", {"operation": "get_child_issues", "work_item_id": parent_feature_id, "error": "timeout"})
         return []
     except requests.exceptions.RequestException as e:
-        logger.error(f"Error fetching child Issues for Feature {parent_feature_id}: {str(e)}")
+        logger.error("ado_request_failed", {"operation": "get_child_issues", "work_item_id": parent_feature_id, "error": str(e)})
         return []
 
 
-def get_work_item_comments(work_item_id: int) -> List[str]:
+def get_work_item_comments(work_item_id: int, raise_on_error: bool = False, cfg: Optional[Config] = None) -> List[str]:
     """
     Fetch comments for a work item from Azure DevOps Comments API.
     
     Args:
         work_item_id: Work item ID to fetch comments for
+        raise_on_error: Raise instead of returning [] when the fetch fails, so
+            callers that cache results can tell "no comments" from "unknown"
+        cfg: Optional config snapshot (default: config.get_config())
     
     Returns:
         List of comment text strings (newest first)
         Empty list on error or if no comments found
     
-    Uses environment variables:
+    Uses settings (config snapshot, read once per instance):
         - ADO_ORG_URL: Azure DevOps organization URL
         - ADO_PROJECT: Project name
         - ADO_WORK_ITEM_PAT: Personal Access Token (Work Items: Read)
     """
-    org_url = os.getenv("ADO_ORG_URL")
-    project = os.getenv("ADO_PROJECT")
-    pat = os.getenv("ADO_WORK_ITEM_PAT")
-    
-    if not all([org_url, project, pat]):
-        logger.error("Missing required ADO environment variables for get_work_item_comments")
+    cfg = cfg or get_config()
+    if not cfg.ado_configured:
+        logger.error("ado_config_error", {"error": cfg.keyvault_error("ADO_WORK_ITEM_PAT") or "Missing required ADO environment variables for get_work_item_comments"})
+        if raise_on_error:
+            raise RuntimeError(cfg.keyvault_error("ADO_WORK_ITEM_PAT") or "Missing required ADO environment variables for get_work_item_comments")
         return []
     
-    auth_header = base64.b64encode(f":{pat}".encode()).decode()
-    headers = {
-        "Authorization": f"Basic {auth_header}",
-        "Content-Type": "application/json"
-    }
+    headers = cfg.ado_headers
     
     # Comments API endpoint
-    comments_url = f"{org_url}/{project}/_apis/wit/workitems/{work_item_id}/comments?api-version=7.0-preview.3"
+    comments_url = f"{cfg.ado_base_url}/workitems/{work_item_id}/comments?api-version=7.0-preview.3"
     
     try:
-        response = requests.get(comments_url, headers=headers, timeout=15)
+        response = http_session.get(comments_url, headers=headers, timeout=15)
         
         if response.status_code != 200:
-            logger.error(f"Failed to fetch comments for work item {work_item_id}: HTTP {response.status_code} - {response.text[:500]}")
+            logger.error("ado_request_failed", {"operation": "get_work_item_comments", "work_item_id": work_item_id, "status": response.status_code, "error": response.text[:500]})
+            if raise_on_error:
+                raise requests.exceptions.HTTPError(f"HTTP {response.status_code}", response=response)
             return []
         
         result = response.json()
@@ -468,12 +704,77 @@ def get_work_item_comments(work_item_id: int) -> List[str]:
             if text:
                 comments.append(text)
         
-        logger.info(f"Fetched {len(comments)} comments for work item {work_item_id}")
+        logger.debug("comments_fetched", lambda: {"work_item_id": work_item_id, "comments": len(comments)})
         return comments
         
     except requests.exceptions.Timeout:
-        logger.error(f"Timeout fetching comments for work item {work_item_id}")
+        logger.error("ado_request_failed", {"operation": "get_work_item_comments", "work_item_id": work_item_id, "error": "timeout"})
+        if raise_on_error:
+            raise
         return []
     except requests.exceptions.RequestException as e:
-        logger.error(f"Error fetching comments for work item {work_item_id}: {str(e)}")
+        logger.error("ado_request_failed", {"operation": "get_work_item_comments", "work_item_id": work_item_id, "error": str(e)})
+        if raise_on_error:
+            raise
         return []
+
+
+def get_work_item_comments_batch(
+    work_item_ids: Iterable[int],
+    max_workers: Optional[int] = None,
+    deadline_seconds: Optional[float] = None,
+    include_failures: bool = False
+) -> Dict[int, Optional[List[str]]]:
+    """
+    Fetch comments for several work items concurrently.
+    
+    Args:
+        work_item_ids: Work item IDs to fetch comments for
+        max_workers: Max concurrent requests (default: ADO_COMMENT_FETCH_CONCURRENCY
+            or COMMENT_FETCH_MAX_WORKERS)
+        deadline_seconds: Overall time budget for the fan-out (default:
+            ADO_COMMENT_FETCH_DEADLINE_SECONDS or COMMENT_FETCH_DEADLINE_SECONDS)
+        include_failures: Map failed/missed items to None instead of []
+    
+    Returns:
+        Dict of work item ID -> list of comment strings, ordered exactly like
+        ``work_item_ids``. Items that failed or missed the deadline map to []
+        (None with include_failures=True).
+    """
+    ids = list(dict.fromkeys(work_item_ids))  # Dedupe, keep order
+    if not ids:
+        return {}
+    
+    if max_workers is None:
+        max_workers = int(os.getenv("ADO_COMMENT_FETCH_CONCURRENCY", constants.COMMENT_FETCH_MAX_WORKERS))
+    if deadline_seconds is None:
+        deadline_seconds = float(os.getenv("ADO_COMMENT_FETCH_DEADLINE_SECONDS", constants.COMMENT_FETCH_DEADLINE_SECONDS))
+    
+    results: Dict[int, Optional[List[str]]] = {wi_id: None if include_failures else [] for wi_id in ids}
+    executor = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(ids))), thread_name_prefix="ado-comments")
+    try:
+        # bind: count the workers' calls against the current request's metrics
+        fetch = metrics.bind(get_work_item_comments)
+        if include_failures:
+            futures = {executor.submit(fetch, wi_id, raise_on_error=True): wi_id for wi_id in ids}
+        else:
+            futures = {executor.submit(fetch, wi_id): wi_id for wi_id in ids}
+        done, not_done = wait(futures, timeout=deadline_seconds)
+        
+        for future in done:
+            wi_id = futures[future]
+            try:
+                results[wi_id] = future.result()
+            except Exception as e:
+                logger.error("ado_request_failed", {"operation": "get_work_item_comments", "work_item_id": wi_id, "error": str(e)})
+        
+        if not_done:
+            missed = sorted(futures[f] for f in not_done)
+            logger.warning("comment_fetch_deadline_exceeded", {"deadline_seconds": deadline_seconds, "work_item_ids": missed})
+            for future in not_done:
+                future.cancel()
+    finally:
+        # Don't block on stragglers past the deadline; their own request timeout bounds them
+        executor.shutdown(wait=False, cancel_futures=True)
+    
+    return results
@@ -1,58 +1,267 @@
 """
 Structured logging abstraction for Azure Function.
+
+StructuredLogger is the logging surface of the hook path: every line is a named
+event with structured fields, emitted as one JSON object. It keeps logging cost
+and telemetry volume flat as hook volume grows:
+
+- Sampling: LOG_SAMPLE_RATES (``event=rate,...``) keeps a fraction of
+  high-volume INFO/DEBUG events; kept events carry ``sample_rate`` so counts can
+  be re-weighted. WARNING and above are never sampled.
+- Lazy formatting: the level and sampling checks run before anything is built,
+  ``data`` may be a callable producing the fields, and JSON encoding happens
+  only when a handler formats the record.
+- Handlers: configure_logging() leaves the Functions host's root handlers in
+  place (they ship to Application Insights asynchronously and need the emitting
+  thread for invocation correlation) and adds a SamplingFilter so
+  LOG_SAMPLE_RATES also applies to stdlib loggers by name. Only the fallback
+  console StreamHandler (no host) runs behind a QueueHandler / QueueListener;
+  its queue is bounded (LOG_QUEUE_SIZE) and records are dropped and counted
+  when it is full, never blocking a request.
+- Per-request summary: metrics.track_request emits one fixed ``request_summary``
+  event per hook or job (status, timings, call counts, annotated fields), so
+  per-step detail can be sampled or left at DEBUG.
+
+The correlation_id bound by metrics.track_request is added to every event.
 """
+import atexit
 import json
 import logging
 import os
-from typing import Any, Dict
+import queue
+import random
+import threading
+from contextvars import ContextVar, Token
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Callable, Dict, Optional, Union
+
+try:
+    from . import constants
+except ImportError:
+    import constants
+
+LOG_FORMAT = "%(asctime)s [%(levelname)s] %(name)s: %(message)s"
+
+_correlation_id: ContextVar[Optional[str]] = ContextVar("correlation_id", default=None)
+
+
+def bind_correlation_id(correlation_id: Optional[str]) -> Token:
+    """Tag events logged in this context with correlation_id; pass the token to unbind_correlation_id."""
+    return _correlation_id.set(correlation_id)
+
+
+def unbind_correlation_id(token: Token) -> None:
+    _correlation_id.reset(token)
+
+
+def parse_sample_rates(raw: str) -> Dict[str, float]:
+    """Parse ``event=rate,...`` (rates clamped to 0..1); malformed entries are ignored."""
+    rates = {}
+    for item in (raw or "").split(","):
+        event, sep, value = item.partition("=")
+        if not sep or not event.strip():
+            continue
+        try:
+            rates[event.strip()] = min(1.0, max(0.0, float(value)))
+        except ValueError:
+            continue
+    return rates
+
+
+_sample_rates: Optional[Dict[str, float]] = None
+
+
+def get_sample_rates() -> Dict[str, float]:
+    """Process-wide per-event sample rates, read once from LOG_SAMPLE_RATES."""
+    global _sample_rates
+    if _sample_rates is None:
+        _sample_rates = parse_sample_rates(os.getenv("LOG_SAMPLE_RATES", constants.DEFAULT_LOG_SAMPLE_RATES))
+    return _sample_rates
+
+
+def reset_sample_rates() -> None:
+    """Re-read LOG_SAMPLE_RATES on next use (used by tests)."""
+    global _sample_rates
+    _sample_rates = None
+
+
+class _JsonMessage:
+    """Log message that is JSON-encoded only when a handler formats it."""
+
+    __slots__ = ("entry",)
+
+    def __init__(self, entry: Dict[str, Any]):
+        self.entry = entry
+
+    def __str__(self) -> str:
+        return json.dumps(self.entry, default=str)
 
 
 class StructuredLogger:
     """
     Logger that outputs structured JSON logs.
-    
+
     Usage:
         logger = StructuredLogger(__name__)
         logger.info("event_name", {"key": "value", "latency_ms": 123})
+        logger.debug("context_preview", lambda: {"preview": expensive()})  # built only if emitted
     """
-    
-    def __init__(self, name: str):
+
+    def __init__(self, name: str, sample_rates: Optional[Dict[str, float]] = None):
         self.logger = logging.getLogger(name)
         self.log_level = os.getenv("LOG_LEVEL", "INFO")
         self.logger.setLevel(getattr(logging, self.log_level))
-    
-    def _log(self, level: str, event: str, data: Dict[str, Any]):
+        self._sample_rates = sample_rates  # None = LOG_SAMPLE_RATES
+
+    def _log(self, level: int, event: str, data: Union[Dict[str, Any], Callable[[], Dict[str, Any]], None], exc_info=False):
         """
         Internal log method that formats as JSON.
-        
+
         Args:
-            level: Log level (INFO, WARNING, ERROR, DEBUG)
+            level: Log level (logging.INFO, logging.WARNING, ...)
             event: Event name or type
-            data: Additional structured data
+            data: Additional structured data, or a callable returning it
+            exc_info: Attach the current exception's traceback
         """
-        log_entry = {
-            "event": event,
-            **data
-        }
-        
-        # TODO (T054): Add log sampling strategy for high-volume events
-        # Future: If event in SAMPLE_EVENTS and random() > sample_rate: return
-        
-        log_method = getattr(self.logger, level.lower())
-        log_method(json.dumps(log_entry))
-    
+        if not self.logger.isEnabledFor(level):
+            return
+
+        rate = None
+        if level < logging.WARNING:
+            rates = self._sample_rates if self._sample_rates is not None else get_sample_rates()
+            rate = rates.get(event)
+            if rate is not None and random.random() >= rate:
+                return
+
+        log_entry = {"event": event}
+        correlation_id = _correlation_id.get()
+        if correlation_id:
+            log_entry["correlation_id"] = correlation_id
+        if callable(data):
+            data = data()
+        if data:
+            log_entry.update(data)
+        if rate is not None:
+            log_entry["sample_rate"] = rate
+
+        self.logger.log(level, _JsonMessage(log_entry), exc_info=exc_info, stacklevel=3)
+
     def info(self, event: str, data: Dict[str, Any] = None):
         """Log INFO level message."""
-        self._log("INFO", event, data or {})
-    
+        self._log(logging.INFO, event, data)
+
     def warning(self, event: str, data: Dict[str, Any] = None):
         """Log WARNING level message."""
-        self._log("WARNING", event, data or {})
-    
+        self._log(logging.WARNING, event, data)
+
     def error(self, event: str, data: Dict[str, Any] = None):
         """Log ERROR level message."""
-        self._log("ERROR", event, data or {})
-    
+        self._log(logging.ERROR, event, data)
+
+    def exception(self, event: str, data: Dict[str, Any] = None):
+        """Log ERROR level message with the current exception's traceback."""
+        self._log(logging.ERROR, event, data, exc_info=True)
+
     def debug(self, event: str, data: Dict[str, Any] = None):
         """Log DEBUG level message."""
-        self._log("DEBUG", event, data or {})
+        self._log(logging.DEBUG, event, data)
+
+
+class BoundedQueueHandler(QueueHandler):
+    """QueueHandler that drops (and counts) records instead of blocking when the queue is full."""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Same-process queue: leave formatting to the writer thread
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Apply LOG_SAMPLE_RATES to INFO/DEBUG records from plain stdlib loggers.
+
+    Rates are looked up by logger name (e.g. ``ado_client=0.1``); records from
+    StructuredLogger were already sampled by event name and pass through.
+    """
+
+    def __init__(self, sample_rates: Optional[Dict[str, float]] = None):
+        super().__init__()
+        self._sample_rates = sample_rates
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or isinstance(record.msg, _JsonMessage):
+            return True
+        rates = self._sample_rates if self._sample_rates is not None else get_sample_rates()
+        rate = rates.get(record.name)
+        return rate is None or random.random() < rate
+
+
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional[BoundedQueueHandler] = None
+_sampling_filter = SamplingFilter()
+_configure_lock = threading.Lock()
+
+
+def configure_logging(level: Optional[str] = None) -> None:
+    """
+    Set the root level and attach sampling to the root handlers.
+
+    Handlers already on the root logger (the Functions host's) stay where they
+    are and receive records on the emitting thread - the host reads the
+    invocation id per thread and already ships logs asynchronously. Only when
+    there are none (local runs, scripts) is a console StreamHandler added,
+    behind a bounded queue drained by a QueueListener. Idempotent.
+    """
+    global _listener, _queue_handler
+    root = logging.getLogger()
+    root.setLevel(level or os.getenv("LOG_LEVEL", constants.DEFAULT_LOG_LEVEL))
+
+    with _configure_lock:
+        if root.handlers:
+            for handler in root.handlers:
+                if _sampling_filter not in handler.filters:
+                    handler.addFilter(_sampling_filter)
+            return
+        if _listener is not None:
+            return
+
+        console = logging.StreamHandler()
+        console.setFormatter(logging.Formatter(LOG_FORMAT))
+        console.addFilter(_sampling_filter)
+        log_queue = queue.Queue(maxsize=int(os.getenv("LOG_QUEUE_SIZE", constants.LOG_QUEUE_SIZE)))
+        _queue_handler = BoundedQueueHandler(log_queue)
+        _listener = QueueListener(log_queue, console, respect_handler_level=True)
+        root.addHandler(_queue_handler)
+        _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging() -> None:
+    """Remove the sampling filter from the root handlers and flush and detach the fallback console queue."""
+    global _listener, _queue_handler
+    with _configure_lock:
+        root = logging.getLogger()
+        for handler in root.handlers:
+            handler.removeFilter(_sampling_filter)
+        if _listener is None:
+            return
+        root.removeHandler(_queue_handler)
+        _listener.stop()
+        _listener = _queue_handler = None
+
+
+def get_logging_stats() -> Dict[str, int]:
+    """Records waiting for the fallback console writer and records dropped on a full queue."""
+    handler = _queue_handler
+    if handler is None:
+        return {"queued": 0, "dropped": 0}
+    return {"queued": handler.queue.qsize(), "dropped": handler.dropped}
@@ -0,0 +1,201 @@
+"""
+Content-addressed store for large feature contexts.
+
+When the enriched feature_description outgrows ARTIFACT_INLINE_MAX_BYTES
+(or had to be cut to the dispatch budget), the full text is stored under its
+sha256 digest and the workflow is dispatched with ``context_sha256`` plus a
+short inline summary. The workflow downloads the blob and verifies the digest.
+
+Identical contexts hash to the same name, so a re-dispatch of an unchanged
+Feature reuses the existing blob instead of uploading it again.
+
+Backends (ARTIFACT_STORE_BACKEND):
+    - none: disabled, the budgeted text is dispatched inline (default)
+    - azure: blob container ARTIFACT_STORE_CONTAINER in the AzureWebJobsStorage
+      account (or ARTIFACT_STORE_ACCOUNT_URL)
+    - local: files under ARTIFACT_STORE_PATH, for tests and `func start`
+"""
+import hashlib
+import os
+import threading
+from typing import Optional, Union
+
+try:
+    from . import constants
+    from .app_logging import StructuredLogger
+    from .cache import TTLCache
+except ImportError:
+    import constants
+    from app_logging import StructuredLogger
+    from cache import TTLCache
+
+logger = StructuredLogger(__name__)
+
+
+def content_digest(content: Union[str, bytes]) -> str:
+    """Return the hex sha256 of content (str is UTF-8 encoded)."""
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    return hashlib.sha256(content).hexdigest()
+
+
+class ArtifactStore:
+    """Base class for content-addressed artifact stores."""
+
+    backend = "base"
+
+    def __init__(self):
+        # Digests this instance has already stored - skips the existence check on warm reuse
+        self._known = TTLCache(maxsize=constants.ARTIFACT_KNOWN_DIGESTS_MAXSIZE)
+
+    def put(self, content: Union[str, bytes]) -> str:
+        """
+        Store content under its sha256 digest (no-op if already present).
+
+        Returns:
+            Hex sha256 digest
+        """
+        data = content.encode("utf-8") if isinstance(content, str) else content
+        digest = content_digest(data)
+        if digest in self._known:
+            return digest
+        if self.exists(digest):
+            logger.debug("artifact_reused", {"digest": digest, "backend": self.backend})
+        else:
+            self._write(digest, data)
+            logger.debug("artifact_written", {"digest": digest, "bytes": len(data), "backend": self.backend})
+        self._known.set(digest, True)
+        return digest
+
+    def get(self, digest: str) -> Optional[bytes]:
+        """Return stored content, or None if missing."""
+        raise NotImplementedError
+
+    def exists(self, digest: str) -> bool:
+        raise NotImplementedError
+
+    def _write(self, digest: str, data: bytes) -> None:
+        raise NotImplementedError
+
+
+class LocalArtifactStore(ArtifactStore):
+    """Files under ``root/<first two hex chars>/<digest>``."""
+
+    backend = "local"
+
+    def __init__(self, root: str):
+        super().__init__()
+        self.root = root
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.root, digest[:2], digest)
+
+    def exists(self, digest: str) -> bool:
+        return os.path.exists(self._path(digest))
+
+    def get(self, digest: str) -> Optional[bytes]:
+        try:
+            with open(self._path(digest), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def _write(self, digest: str, data: bytes) -> None:
+        path = self._path(digest)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write-then-rename so a concurrent reader never sees a partial file
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+
+class AzureBlobArtifactStore(ArtifactStore):
+    """
+    Blob container addressed by digest (blob name == sha256 hex).
+
+    Uses AzureWebJobsStorage (connection string) or the Function App's managed
+    identity against ARTIFACT_STORE_ACCOUNT_URL / AzureWebJobsStorage__accountName.
+    """
+
+    backend = "azure"
+
+    def __init__(self, container_name: str):
+        super().__init__()
+        try:
+            from azure.core.exceptions import ResourceExistsError
+            from azure.storage.blob import ContainerClient, ContentSettings
+        except ImportError as e:
+            raise RuntimeError("azure-storage-blob is required for ARTIFACT_STORE_BACKEND=azure") from e
+
+        self._exists_error = ResourceExistsError
+        self._content_settings = ContentSettings(content_type="text/plain; charset=utf-8")
+
+        account_url = os.getenv("ARTIFACT_STORE_ACCOUNT_URL")
+        connection_string = os.getenv("AzureWebJobsStorage")
+        if not account_url and connection_string:
+            self._client = ContainerClient.from_connection_string(connection_string, container_name)
+        else:
+            if not account_url:
+                account_name = os.getenv("AzureWebJobsStorage__accountName")
+                if not account_name:
+                    raise RuntimeError("ARTIFACT_STORE_ACCOUNT_URL, AzureWebJobsStorage or AzureWebJobsStorage__accountName must be set for ARTIFACT_STORE_BACKEND=azure")
+                account_url = f"https://{account_name}.blob.core.windows.net"
+            from azure.identity import DefaultAzureCredential
+            self._client = ContainerClient(account_url, container_name, credential=DefaultAzureCredential())
+
+        try:
+            self._client.create_container()
+        except ResourceExistsError:
+            pass
+
+    def exists(self, digest: str) -> bool:
+        return self._client.get_blob_client(digest).exists()
+
+    def get(self, digest: str) -> Optional[bytes]:
+        blob = self._client.get_blob_client(digest)
+        if not blob.exists():
+            return None
+        return blob.download_blob().readall()
+
+    def _write(self, digest: str, data: bytes) -> None:
+        try:
+            self._client.upload_blob(digest, data, overwrite=False, content_settings=self._content_settings)
+        except self._exists_error:
+            # Another instance uploaded the same content first - same digest, same bytes
+            pass
+
+
+_store: Optional[ArtifactStore] = None
+_store_initialized = False
+_store_lock = threading.Lock()
+
+
+def get_artifact_store() -> Optional[ArtifactStore]:
+    """Return the process-wide store selected by ARTIFACT_STORE_BACKEND, or None when disabled."""
+    global _store, _store_initialized
+    if _store_initialized:
+        return _store
+
+    with _store_lock:
+        if not _store_initialized:
+            backend = os.getenv("ARTIFACT_STORE_BACKEND", constants.DEFAULT_ARTIFACT_STORE_BACKEND).lower()
+            if backend == "none":
+                _store = None
+            elif backend == "local":
+                _store = LocalArtifactStore(os.getenv("ARTIFACT_STORE_PATH", constants.DEFAULT_ARTIFACT_STORE_PATH))
+            elif backend == "azure":
+                _store = AzureBlobArtifactStore(os.getenv("ARTIFACT_STORE_CONTAINER", constants.ARTIFACT_STORE_CONTAINER))
+            else:
+                raise ValueError(f"Unknown ARTIFACT_STORE_BACKEND: {backend}")
+            _store_initialized = True
+            logger.info("artifact_store_initialized", {"backend": backend})
+        return _store
+
+
+def reset_artifact_store():
+    """Forget the cached store (used by tests)."""
+    global _store, _store_initialized
+    with _store_lock:
+        _store = None
+        _store_initialized = False
@@ -0,0 +1,129 @@
+"""
+Process-local TTL + LRU cache with hit/miss counters.
+
+Lives at module level in the modules that use it so entries survive across
+warm invocations of the same Function App instance.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Thread-safe mapping whose entries expire after ``ttl_seconds`` and are
+    evicted least-recently-used first once ``maxsize`` is reached.
+
+    Usage:
+        cache = TTLCache(maxsize=1024, ttl_seconds=60)
+        if cache.add(key, value):   # True only if key was absent or expired
+            ...
+        cache.get(key)              # counts a hit or a miss
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        ttl_seconds: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Args:
+            maxsize: Maximum number of live entries (LRU eviction beyond this)
+            ttl_seconds: Default lifetime of an entry, None for no expiry
+            clock: Monotonic time source (injectable for tests)
+        """
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._data: "OrderedDict[Hashable, tuple[Optional[float], Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _expires_at(self, ttl_seconds: Optional[float]) -> Optional[float]:
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        return None if ttl is None else self._clock() + ttl
+
+    def _lookup(self, key: Hashable) -> Any:
+        """Return the live value for key (refreshing its LRU position) or _MISSING. Caller holds the lock."""
+        entry = self._data.get(key)
+        if entry is None:
+            return _MISSING
+        expires_at, value = entry
+        if expires_at is not None and expires_at <= self._clock():
+            del self._data[key]
+            return _MISSING
+        self._data.move_to_end(key)
+        return value
+
+    def _store(self, key: Hashable, value: Any, ttl_seconds: Optional[float]) -> None:
+        """Insert or replace key, evicting the least recently used entries. Caller holds the lock."""
+        self._data[key] = (self._expires_at(ttl_seconds), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value, or ``default`` if absent or expired."""
+        with self._lock:
+            value = self._lookup(key)
+            if value is _MISSING:
+                self.misses += 1
+                return default
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        """Store a value, overriding the default TTL when ``ttl_seconds`` is given."""
+        with self._lock:
+            self._store(key, value, ttl_seconds)
+
+    def add(self, key: Hashable, value: Any = True, ttl_seconds: Optional[float] = None) -> bool:
+        """
+        Atomically store ``value`` only if ``key`` is absent or expired.
+
+        Returns:
+            True if the value was stored (a miss), False if a live entry exists (a hit)
+        """
+        with self._lock:
+            if self._lookup(key) is not _MISSING:
+                self.hits += 1
+                return False
+            self.misses += 1
+            self._store(key, value, ttl_seconds)
+            return True
+
+    def delete(self, key: Hashable) -> None:
+        """Remove key if present."""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop all entries and reset counters."""
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return self._lookup(key) is not _MISSING
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss/eviction counters and current size."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._data),
+            }
@@ -0,0 +1,289 @@
+"""
+Record/replay HTTP cassettes beneath ado_client and dispatch.
+
+http_session mounts a CassetteAdapter on every pooled session when
+HTTP_CASSETTE_MODE is set, so ADO and GitHub traffic is captured or served at
+the transport level without touching the callers:
+
+    HTTP_CASSETTE_MODE=record HTTP_CASSETTE=cassettes/wi-615.jsonl python tests/test-615-exact.py
+    HTTP_CASSETTE_MODE=replay HTTP_CASSETTE=cassettes/wi-615.jsonl python tests/test-615-exact.py
+
+Record sends each request through the real pooled adapter and appends the
+interaction (request, response, elapsed time) as one JSON line. Secrets are
+scrubbed before anything is written: credential headers (SCRUBBED_HEADERS),
+token query parameters, and the configured PATs (raw and Basic-encoded)
+wherever they appear in URLs, headers or bodies.
+
+Replay never opens a connection. A request is matched on method, URL (query
+order ignored) and body, then on method and URL alone; interactions with the
+same key are served in recorded order and the last one repeats, so a replayed
+scenario can loop for perf tests. Unmatched requests raise CassetteMiss, a
+ConnectionError, which callers already handle as a network failure.
+HTTP_CASSETTE_TIMING replays the recorded latency: ``none`` (default),
+``original`` or a scale factor such as ``0.1``.
+"""
+import base64
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from io import BytesIO
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3 import HTTPResponse
+
+try:
+    from . import constants
+    from .config import KEYVAULT_SETTINGS
+except ImportError:
+    import constants
+    from config import KEYVAULT_SETTINGS
+
+logger = logging.getLogger(__name__)
+
+MODES = ("off", "record", "replay")
+SCRUBBED = "<scrubbed>"
+SCRUBBED_HEADERS = frozenset({"authorization", "proxy-authorization", "cookie", "set-cookie", "x-api-key", "x-tfs-session"})
+SCRUBBED_QUERY_PARAMS = frozenset({"access_token", "token", "code", "sig", "signature", "client_secret"})
+
+
+class CassetteMiss(requests.exceptions.ConnectionError):
+    """No recorded interaction matches a replayed request."""
+
+
+def _normalize_url(url: str) -> str:
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path, query, ""))
+
+
+def _body_bytes(body) -> bytes:
+    if body is None:
+        return b""
+    return body.encode("utf-8") if isinstance(body, str) else bytes(body)
+
+
+def _encode_body(data: bytes) -> Tuple[str, str]:
+    try:
+        return data.decode("utf-8"), "utf-8"
+    except UnicodeDecodeError:
+        return base64.b64encode(data).decode("ascii"), "base64"
+
+
+def _decode_body(text: str, encoding: str) -> bytes:
+    return base64.b64decode(text) if encoding == "base64" else text.encode("utf-8")
+
+
+def _secret_values() -> List[str]:
+    """Configured PATs and their Basic auth encodings, longest first."""
+    secrets = set()
+    for name in KEYVAULT_SETTINGS:
+        value = os.getenv(name, "")
+        if len(value) >= 8:
+            secrets.add(value)
+            secrets.add(base64.b64encode(f":{value}".encode()).decode())
+    return sorted(secrets, key=len, reverse=True)
+
+
+class Cassette:
+    """
+    Recorded interactions in a JSON Lines file.
+
+    Usage:
+        cassette = Cassette("cassettes/wi-615.jsonl", "replay")
+        interaction = cassette.play("GET", url, body)
+    """
+
+    def __init__(self, path: str, mode: str, timing_scale: float = 0.0, secrets: Optional[List[str]] = None):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Cassette mode must be 'record' or 'replay', got '{mode}'")
+        self.path = path
+        self.mode = mode
+        self.timing_scale = timing_scale
+        self.secrets = _secret_values() if secrets is None else sorted(secrets, key=len, reverse=True)
+        self._lock = threading.Lock()
+        self._by_request: Dict[tuple, List[dict]] = defaultdict(list)
+        self._by_url: Dict[tuple, List[dict]] = defaultdict(list)
+        self._served: Dict[tuple, int] = defaultdict(int)
+
+        if mode == "record":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            open(path, "w", encoding="utf-8").close()  # one recording per run
+        else:
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        self._index(json.loads(line))
+            logger.info(f"Loaded cassette {path} - {sum(len(v) for v in self._by_url.values())} interactions")
+
+    def _keys(self, method: str, url: str, body: bytes) -> Tuple[tuple, tuple]:
+        url_key = (method.upper(), _normalize_url(self.scrub(url)))
+        return url_key + (hashlib.sha256(self.scrub(body)).hexdigest(),), url_key
+
+    def _index(self, interaction: dict):
+        request = interaction["request"]
+        body = _decode_body(request.get("body", ""), request.get("body_encoding", "utf-8"))
+        request_key, url_key = self._keys(request["method"], request["url"], body)
+        self._by_request[request_key].append(interaction)
+        self._by_url[url_key].append(interaction)
+
+    def scrub(self, value):
+        """Replace configured secrets in a str or bytes value."""
+        for secret in self.secrets:
+            if isinstance(value, bytes):
+                value = value.replace(secret.encode(), SCRUBBED.encode())
+            else:
+                value = value.replace(secret, SCRUBBED)
+        return value
+
+    def _scrub_url(self, url: str) -> str:
+        parts = urlsplit(self.scrub(url))
+        query = [(k, SCRUBBED if k.lower() in SCRUBBED_QUERY_PARAMS else v) for k, v in parse_qsl(parts.query, keep_blank_values=True)]
+        return urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(query), parts.fragment))
+
+    def _scrub_headers(self, headers) -> Dict[str, str]:
+        return {k: SCRUBBED if k.lower() in SCRUBBED_HEADERS else self.scrub(str(v)) for k, v in headers.items()}
+
+    def record(self, request: requests.PreparedRequest, response: requests.Response, elapsed_ms: float):
+        """Append one scrubbed interaction to the cassette file."""
+        request_body, request_encoding = _encode_body(self.scrub(_body_bytes(request.body)))
+        response_body, response_encoding = _encode_body(self.scrub(response.content))
+        interaction = {
+            "request": {
+                "method": request.method,
+                "url": self._scrub_url(request.url),
+                "headers": self._scrub_headers(request.headers),
+                "body": request_body,
+                "body_encoding": request_encoding,
+            },
+            "response": {
+                "status": response.status_code,
+                "reason": response.reason,
+                "headers": self._scrub_headers(response.headers),
+                "body": response_body,
+                "body_encoding": response_encoding,
+            },
+            "elapsed_ms": round(elapsed_ms, 2),
+        }
+        line = json.dumps(interaction, ensure_ascii=False)
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+    def play(self, method: str, url: str, body) -> dict:
+        """
+        Return the recorded interaction for a request.
+
+        Raises:
+            CassetteMiss: If nothing recorded matches method and URL
+        """
+        request_key, url_key = self._keys(method, self._scrub_url(url), _body_bytes(body))
+        with self._lock:
+            for key, index in ((request_key, self._by_request), (url_key, self._by_url)):
+                candidates = index.get(key)
+                if candidates:
+                    served = self._served[key]
+                    self._served[key] = served + 1
+                    return candidates[min(served, len(candidates) - 1)]
+        raise CassetteMiss(f"No recorded interaction for {method} {self._scrub_url(url)} in {self.path}")
+
+
+class CassetteAdapter(HTTPAdapter):
+    """Transport adapter that records through, or replays instead of, the pooled adapter."""
+
+    def __init__(self, cassette: Cassette, inner: HTTPAdapter):
+        super().__init__(max_retries=0)
+        self.cassette = cassette
+        self.inner = inner
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        if self.cassette.mode == "record":
+            started = time.perf_counter()
+            response = self.inner.send(request, stream=stream, timeout=timeout, verify=verify, cert=cert, proxies=proxies)
+            self.cassette.record(request, response, (time.perf_counter() - started) * 1000)
+            return response
+
+        interaction = self.cassette.play(request.method, request.url, request.body)
+        recorded = interaction["response"]
+        if self.cassette.timing_scale:
+            time.sleep(interaction.get("elapsed_ms", 0) / 1000 * self.cassette.timing_scale)
+        body = _decode_body(recorded["body"], recorded.get("body_encoding", "utf-8"))
+        # Recorded bodies are already decoded - don't let requests decompress them again
+        headers = {k: v for k, v in recorded["headers"].items() if k.lower() not in ("content-encoding", "content-length", "transfer-encoding")}
+        headers["Content-Length"] = str(len(body))
+        raw = HTTPResponse(
+            body=BytesIO(body),
+            headers=headers,
+            status=recorded["status"],
+            reason=recorded.get("reason"),
+            preload_content=False,
+            decode_content=False,
+        )
+        return self.build_response(request, raw)
+
+    def close(self):
+        self.inner.close()
+
+
+def cassette_mode() -> str:
+    """HTTP_CASSETTE_MODE, or "off" when unset or unknown."""
+    mode = os.getenv("HTTP_CASSETTE_MODE", constants.DEFAULT_CASSETTE_MODE).strip().lower()
+    if mode not in MODES:
+        logger.warning(f"Unknown HTTP_CASSETTE_MODE '{mode}' - cassettes disabled")
+        return "off"
+    return mode
+
+
+def _timing_scale() -> float:
+    raw = os.getenv("HTTP_CASSETTE_TIMING", "none").strip().lower()
+    if raw in ("", "none"):
+        return 0.0
+    if raw == "original":
+        return 1.0
+    try:
+        return max(0.0, float(raw))
+    except ValueError:
+        logger.warning(f"Invalid HTTP_CASSETTE_TIMING '{raw}' - replaying without delays")
+        return 0.0
+
+
+_cassette: Optional[Cassette] = None
+_cassette_lock = threading.Lock()
+
+
+def get_cassette() -> Optional[Cassette]:
+    """
+    Return the process-wide cassette, opened on first use, or None when
+    HTTP_CASSETTE_MODE is off.
+
+    Raises:
+        RuntimeError: If a mode is set without HTTP_CASSETTE
+    """
+    global _cassette
+    mode = cassette_mode()
+    if mode == "off":
+        return None
+    if _cassette is not None:
+        return _cassette
+
+    with _cassette_lock:
+        if _cassette is None:
+            path = os.getenv("HTTP_CASSETTE", "").strip()
+            if not path:
+                raise RuntimeError(f"HTTP_CASSETTE_MODE={mode} requires HTTP_CASSETTE (cassette file path)")
+            _cassette = Cassette(path, mode, timing_scale=_timing_scale())
+            logger.warning(f"HTTP cassette {mode} mode - {path}")
+        return _cassette
+
+
+def reset_cassette():
+    """Forget the open cassette so the next session re-reads the settings (used by tests)."""
+    global _cassette
+    with _cassette_lock:
+        _cassette = None
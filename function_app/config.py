@@ -1,51 +1,203 @@
 """
 Configuration loader for Azure Function environment variables.
+
+get_config() returns one immutable snapshot per instance, built at cold start:
+settings are read once and the GitHub / ADO auth headers and base URLs are
+precomputed, so validation, dispatch and ado_client never touch os.environ or
+re-encode a PAT on the request path.
+
+Reload: the only settings the platform changes under a running instance are
+Key Vault references it resolves later (or a rotated secret). Each call
+compares just those values (KEYVAULT_SETTINGS) with the snapshot and rebuilds
+it when they differ. A setting still holding an unresolved
+``@Microsoft.KeyVault(...)`` reference is recorded in the snapshot, and callers
+fail fast on it instead of sending the reference as a credential.
+
+Other settings are fixed for the instance's lifetime (tests call reset_config()).
 """
+import base64
+import logging
 import os
+import threading
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Mapping, Optional
+
+try:
+    from . import constants
+except ImportError:
+    import constants
+
+logger = logging.getLogger(__name__)
+
+KEYVAULT_REFERENCE_PREFIX = "@Microsoft.KeyVault"
+
+# Secrets that may be Key Vault references - the only values checked for hot reload
+KEYVAULT_SETTINGS = ("GH_WORKFLOW_DISPATCH_PAT", "ADO_WORK_ITEM_PAT")
+
+GITHUB_API_URL = "https://api.github.com"
 
+_EMPTY_HEADERS: Mapping[str, str] = MappingProxyType({})
 
+
+@dataclass(frozen=True, slots=True)
 class Config:
-    """Environment configuration with defaults."""
-    
-    def __init__(self):
-        # GitHub configuration
-        self.github_owner = os.getenv("GITHUB_OWNER", "")
-        self.github_repo = os.getenv("GITHUB_REPO", "")
-        self.github_workflow_filename = os.getenv("GITHUB_WORKFLOW_FILENAME", "spec-kit-specify.yml")
-        self.gh_workflow_dispatch_pat = os.getenv("GH_WORKFLOW_DISPATCH_PAT", "")
-        
-        # Azure DevOps configuration
-        self.ado_org_url = os.getenv("ADO_ORG_URL", "")
-        self.ado_project = os.getenv("ADO_PROJECT", "")
-        self.ado_work_item_pat = os.getenv("ADO_WORK_ITEM_PAT", "")
-        self.spec_column_name = os.getenv("SPEC_COLUMN_NAME", "Specification – Doing")
-        self.ai_user_match = os.getenv("AI_USER_MATCH", "AI Teammate")
-        
-        # Application configuration
-        self.log_level = os.getenv("LOG_LEVEL", "INFO")
-        self.function_timeout_seconds = int(os.getenv("FUNCTION_TIMEOUT_SECONDS", "30"))
-    
-    def validate(self) -> tuple[bool, list[str]]:
+    """Immutable environment configuration snapshot with precomputed headers and URLs."""
+    # GitHub configuration
+    github_owner: str = ""
+    github_repo: str = ""
+    github_workflow_filename: str = constants.DEFAULT_WORKFLOW_FILENAME
+    github_workflow_ref: str = "main"
+    gh_workflow_dispatch_pat: str = ""
+    github_api_url: str = GITHUB_API_URL
+    context_handoff_workflows: frozenset = frozenset({constants.DEFAULT_CONTEXT_HANDOFF_WORKFLOWS})
+
+    # Azure DevOps configuration
+    ado_org_url: str = ""
+    ado_project: str = ""
+    ado_work_item_pat: str = ""
+    spec_column_name: str = constants.DEFAULT_SPEC_COLUMN_NAME
+    ai_user_match: str = constants.DEFAULT_AI_USER_MATCH
+    validation_rules: str = ""
+
+    # Application configuration
+    log_level: str = constants.DEFAULT_LOG_LEVEL
+    function_timeout_seconds: int = constants.FUNCTION_MAX_EXECUTION_TIME
+
+    # Precomputed from the above
+    github_headers: Mapping[str, str] = field(default_factory=lambda: _EMPTY_HEADERS, hash=False)
+    ado_headers: Mapping[str, str] = field(default_factory=lambda: _EMPTY_HEADERS, hash=False)
+    ado_patch_headers: Mapping[str, str] = field(default_factory=lambda: _EMPTY_HEADERS, hash=False)
+    ado_base_url: str = ""  # {org_url}/{project}/_apis/wit
+    keyvault_unresolved: tuple = field(default_factory=tuple)  # setting names still holding a reference
+
+    @classmethod
+    def from_env(cls) -> "Config":
+        """Read the environment once and precompute auth headers and base URLs."""
+        github_pat = os.getenv("GH_WORKFLOW_DISPATCH_PAT", "")
+        ado_pat = os.getenv("ADO_WORK_ITEM_PAT", "")
+        ado_org_url = os.getenv("ADO_ORG_URL", "").rstrip("/")
+        ado_project = os.getenv("ADO_PROJECT", "")
+        unresolved = tuple(name for name, value in zip(KEYVAULT_SETTINGS, (github_pat, ado_pat))
+                           if value.startswith(KEYVAULT_REFERENCE_PREFIX))
+
+        github_headers = _EMPTY_HEADERS
+        if github_pat and "GH_WORKFLOW_DISPATCH_PAT" not in unresolved:
+            github_headers = MappingProxyType({
+                "Authorization": f"Bearer {github_pat}",
+                "Accept": "application/vnd.github+json",
+                "X-GitHub-Api-Version": "2022-11-28"
+            })
+
+        ado_headers = ado_patch_headers = _EMPTY_HEADERS
+        if ado_pat and "ADO_WORK_ITEM_PAT" not in unresolved:
+            basic = f"Basic {base64.b64encode(f':{ado_pat}'.encode()).decode()}"
+            ado_headers = MappingProxyType({"Authorization": basic, "Content-Type": "application/json"})
+            ado_patch_headers = MappingProxyType({"Authorization": basic, "Content-Type": "application/json-patch+json"})
+
+        return cls(
+            github_owner=os.getenv("GITHUB_OWNER", ""),
+            github_repo=os.getenv("GITHUB_REPO", ""),
+            github_workflow_filename=os.getenv("GITHUB_WORKFLOW_FILENAME", constants.DEFAULT_WORKFLOW_FILENAME),
+            github_workflow_ref=os.getenv("GITHUB_WORKFLOW_REF", "main"),
+            gh_workflow_dispatch_pat=github_pat,
+            github_api_url=os.getenv("GITHUB_API_URL", GITHUB_API_URL).rstrip("/"),
+            context_handoff_workflows=frozenset(
+                name.strip().lower()
+                for name in os.getenv("CONTEXT_HANDOFF_WORKFLOWS", constants.DEFAULT_CONTEXT_HANDOFF_WORKFLOWS).split(",")
+                if name.strip()
+            ),
+            ado_org_url=ado_org_url,
+            ado_project=ado_project,
+            ado_work_item_pat=ado_pat,
+            spec_column_name=os.getenv("SPEC_COLUMN_NAME", constants.DEFAULT_SPEC_COLUMN_NAME),
+            ai_user_match=os.getenv("AI_USER_MATCH", constants.DEFAULT_AI_USER_MATCH),
+            validation_rules=os.getenv("VALIDATION_RULES", "").strip(),
+            log_level=os.getenv("LOG_LEVEL", constants.DEFAULT_LOG_LEVEL),
+            function_timeout_seconds=int(os.getenv("FUNCTION_TIMEOUT_SECONDS", constants.FUNCTION_MAX_EXECUTION_TIME)),
+            github_headers=github_headers,
+            ado_headers=ado_headers,
+            ado_patch_headers=ado_patch_headers,
+            ado_base_url=f"{ado_org_url}/{ado_project}/_apis/wit" if ado_org_url and ado_project else "",
+            keyvault_unresolved=unresolved
+        )
+
+    @property
+    def ado_configured(self) -> bool:
+        """ADO_ORG_URL, ADO_PROJECT and a usable ADO_WORK_ITEM_PAT are all set."""
+        return bool(self.ado_base_url and self.ado_headers)
+
+    def keyvault_error(self, setting: str) -> Optional[str]:
+        """Fail-fast message when ``setting`` is an unresolved Key Vault reference, else None."""
+        if setting not in self.keyvault_unresolved:
+            return None
+        return (
+            f"Key Vault secret not accessible - {setting} reference unresolved. Check function managed identity "
+            "has 'Key Vault Secrets User' role and Key Vault network ACLs allow access."
+        )
+
+    def github_dispatch_url(self, owner: str, repo: str, workflow_filename: str) -> str:
+        return f"{self.github_api_url}/repos/{owner}/{repo}/actions/workflows/{workflow_filename}/dispatches"
+
+    def validate(self, require_default_target: bool = True) -> tuple[bool, list[str]]:
         """
         Validate required configuration is present.
-        
+
+        Args:
+            require_default_target: Require GITHUB_OWNER / GITHUB_REPO (not needed
+                when a routing table supplies the targets)
+
         Returns:
             Tuple of (is_valid, missing_vars)
         """
         missing = []
-        required_vars = [
-            ("GITHUB_OWNER", self.github_owner),
-            ("GITHUB_REPO", self.github_repo),
-            ("GH_WORKFLOW_DISPATCH_PAT", self.gh_workflow_dispatch_pat),
-        ]
-        
+        required_vars = [("GH_WORKFLOW_DISPATCH_PAT", self.gh_workflow_dispatch_pat)]
+        if require_default_target:
+            required_vars[:0] = [("GITHUB_OWNER", self.github_owner), ("GITHUB_REPO", self.github_repo)]
+
         for var_name, var_value in required_vars:
             if not var_value:
                 missing.append(var_name)
-        
+
         return len(missing) == 0, missing
 
 
+_config: Optional[Config] = None
+_config_lock = threading.Lock()
+
+
+def _keyvault_values_changed(cfg: Config) -> bool:
+    environ = os.environ
+    return (environ.get("GH_WORKFLOW_DISPATCH_PAT", "") != cfg.gh_workflow_dispatch_pat
+            or environ.get("ADO_WORK_ITEM_PAT", "") != cfg.ado_work_item_pat)
+
+
 def get_config() -> Config:
-    """Get configuration instance."""
-    return Config()
+    """
+    Get the instance's configuration snapshot.
+
+    Built on first use and rebuilt only when a Key Vault-backed setting changed.
+    """
+    global _config
+    cfg = _config
+    if cfg is not None and not _keyvault_values_changed(cfg):
+        return cfg
+
+    with _config_lock:
+        if _config is None or _keyvault_values_changed(_config):
+            reloaded = _config is not None
+            _config = Config.from_env()
+            pat = _config.gh_workflow_dispatch_pat
+            logger.info(
+                f"Config snapshot {'reloaded (Key Vault setting changed)' if reloaded else 'built'} - "
+                f"github_pat_length={len(pat)}, github_pat_fine_grained={pat.startswith('github_pat_')}, "
+                f"ado_configured={_config.ado_configured}, keyvault_unresolved={list(_config.keyvault_unresolved)}"
+            )
+        return _config
+
+
+def reset_config():
+    """Drop the snapshot so the next get_config() re-reads every setting (used by tests)."""
+    global _config
+    with _config_lock:
+        _config = None
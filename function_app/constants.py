@@ -10,9 +10,73 @@ FUNCTION_MAX_EXECUTION_TIME = 30
 # Retry configuration
 MAX_RETRY_ATTEMPTS = 3
 RETRY_BACKOFF_DELAYS = [2, 6, 14]  # Exponential backoff in seconds
+RETRY_JITTER_RATIO = 0.2  # Each delay is scaled by a random factor in [1 - ratio, 1 + ratio]
+RETRY_MAX_DELAY_SECONDS = 60  # Longest in-process wait; longer server-requested waits are deferred or fail fast
+DEFAULT_DISPATCH_RETRY_MODE = "inline"  # "inline" sleeps in-process, "deferred" re-enqueues on the job queue
 
 # Default configuration
 DEFAULT_LOG_LEVEL = "INFO"
 DEFAULT_SPEC_COLUMN_NAME = "Specification – Doing"
 DEFAULT_AI_USER_MATCH = "AI Teammate"
 DEFAULT_WORKFLOW_FILENAME = "spec-kit-specify.yml"
+
+# Logging volume (app_logging.StructuredLogger)
+DEFAULT_LOG_SAMPLE_RATES = "validation_filtered=0.1,work_item_resolved=0.25,context_enriched=0.25"  # event=rate, INFO/DEBUG only
+LOG_QUEUE_SIZE = 10000  # Records buffered for the background writer; more are dropped, not blocked on
+
+# HTTP connection pooling (shared sessions reused across warm invocations)
+HTTP_POOL_CONNECTIONS = 4  # Distinct host pools cached per session
+HTTP_POOL_MAXSIZE = 10  # Max pooled connections kept per host
+HTTP_POOL_BLOCK = False  # Block instead of opening overflow connections when pool is exhausted
+HTTP_KEEP_ALIVE = True
+DEFAULT_CASSETTE_MODE = "off"  # "record" / "replay" outbound HTTP through cassette.CassetteAdapter
+
+# Concurrent comment fetches for closed child Issues
+COMMENT_FETCH_MAX_WORKERS = 8  # Keep <= HTTP_POOL_MAXSIZE so workers share pooled connections
+COMMENT_FETCH_DEADLINE_SECONDS = 20  # Overall budget for the whole fan-out
+
+# Async accept-and-queue mode (DISPATCH_MODE=async)
+DEFAULT_DISPATCH_MODE = "sync"
+DEFAULT_JOB_QUEUE_BACKEND = "azure"
+JOB_QUEUE_NAME = "spec-dispatch-jobs"  # Must match the spec_dispatch_worker queue trigger binding
+JOB_MAX_MESSAGE_BYTES = 45 * 1024  # Azure Storage queue messages cap at 64 KB after base64 (+33%)
+JOB_RESOURCE_FIELDS = ["System.Title", "System.Description", "System.ChangedBy", "System.WorkItemType"]
+
+# Webhook deduplication / burst coalescing in front of dispatch
+DEFAULT_DEDUP_BACKEND = "memory"  # "table" shares state across instances via Azure Table storage
+DEDUP_TABLE_NAME = "specdispatchdedup"
+DEDUP_CACHE_MAXSIZE = 4096  # Entries kept by the in-memory backend (LRU beyond this)
+DEDUP_REVISION_TTL_SECONDS = 24 * 3600  # Same (workItemId, rev) never dispatches twice within this window
+DEDUP_COOLDOWN_SECONDS = 60  # At most one dispatch per work item per window
+DEDUP_COALESCE_SECONDS = 10  # Async mode: queue delay so a burst collapses into its latest revision
+
+# Closed child Issue enrichment cache (comments keyed by Issue id + System.Rev/System.ChangedDate)
+ENRICHMENT_CACHE_MAXSIZE = 2048  # Issues kept (LRU beyond this)
+ENRICHMENT_CACHE_TTL_SECONDS = 24 * 3600  # Upper bound on staleness if a version ever fails to move
+
+# Enriched feature_description budget (GitHub caps a workflow_dispatch payload at 65,535 characters)
+CONTEXT_MAX_BYTES = 48 * 1024  # Leaves room for the other inputs and JSON escaping
+CONTEXT_MAX_TOKENS = 12000  # Estimated at CONTEXT_CHARS_PER_TOKEN characters per token
+CONTEXT_CHARS_PER_TOKEN = 4
+CONTEXT_MAX_COMMENT_CHARS = 2000  # Per-comment cap in the dispatched text
+
+# Large-context handoff via content-addressed artifact store
+DEFAULT_ARTIFACT_STORE_BACKEND = "none"  # "azure" (blob container) or "local" (filesystem)
+DEFAULT_ARTIFACT_STORE_PATH = ".artifacts"
+ARTIFACT_STORE_CONTAINER = "spec-contexts"
+ARTIFACT_INLINE_MAX_BYTES = 16 * 1024  # Contexts above this are dispatched as context_sha256 + summary
+ARTIFACT_SUMMARY_MAX_BYTES = 2048  # Inline summary dispatched alongside context_sha256
+ARTIFACT_KNOWN_DIGESTS_MAXSIZE = 1024  # Digests remembered per instance to skip existence checks
+DEFAULT_CONTEXT_HANDOFF_WORKFLOWS = "spec-kit-specify.yml"  # Workflows declaring the context_sha256 input
+
+# Batch creation of clarification Issues
+WORK_ITEM_BATCH_SIZE = 200  # ADO's max IDs per workitems?ids= batch fetch
+ISSUE_CREATE_MAX_WORKERS = 4  # Concurrent Issue creates (ADO_ISSUE_CREATE_CONCURRENCY)
+
+# Per-request stage metrics (in-process histograms)
+METRICS_WINDOW = 1024  # Most recent samples per series used for p50/p95/p99
+
+# Early-reject fast path before the Service Hook body is parsed
+PREFILTER_SCAN_BYTES = 64 * 1024  # Raw body window scanned for eventType / work item type / column
+HOOK_SUBSCRIPTION_HEADER = "X-ADO-Subscription"  # Custom header set on the hook, checked against HOOK_SUBSCRIPTION_IDS
+DEFAULT_JSON_BACKEND = "auto"  # "orjson" when installed, else the json module
@@ -0,0 +1,251 @@
+"""
+Bounded assembly of the enriched feature_description.
+
+GitHub rejects workflow_dispatch payloads above 65,535 characters, and the
+text ends up in an LLM prompt, so the closed Issue context is assembled in
+one pass against a byte and token budget:
+
+    - Issue descriptions and comment bodies are converted from ADO's HTML to Markdown
+    - Issues are ranked most recently changed first (newest answers win)
+    - Each comment is capped at CONTEXT_MAX_COMMENT_CHARS
+    - An Issue that no longer fits is cut at a line boundary; the rest are
+      omitted with a marker line
+
+The full, unbudgeted text is built alongside for storage outside the
+dispatch payload.
+"""
+import io
+import os
+from dataclasses import dataclass
+from html import unescape
+from typing import Iterable, List, Optional
+
+try:
+    from . import constants
+    from .html_markdown import html_to_markdown
+except ImportError:
+    import constants
+    from html_markdown import html_to_markdown
+
+CLARIFICATIONS_HEADER = "=== Previously Answered Clarifications ==="
+TRUNCATION_MARKER = "… [truncated]"
+
+
+def strip_html(text: Optional[str]) -> str:
+    """
+    Reduce an ADO HTML field (comment body, Description) to Markdown text.
+
+    Uses the shared html_markdown converter (lists, links, tables and emphasis
+    survive as Markdown); plain text passes through unchanged apart from
+    entity unescaping.
+    """
+    if not text:
+        return ""
+    if "<" not in text:
+        return unescape(text).strip()
+    return html_to_markdown(text)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (CONTEXT_CHARS_PER_TOKEN characters per token)."""
+    return -(-len(text) // constants.CONTEXT_CHARS_PER_TOKEN)
+
+
+@dataclass
+class FeatureContext:
+    """
+    Result of build_feature_context.
+
+    ``text`` fits the budget and goes into the dispatch payload; ``full_text``
+    is everything, for storage elsewhere.
+    """
+    text: str
+    full_text: str
+    included_issues: int = 0
+    truncated_issues: int = 0
+    omitted_issues: int = 0
+
+    @property
+    def truncated(self) -> bool:
+        return self.text != self.full_text
+
+    @property
+    def size_bytes(self) -> int:
+        return len(self.text.encode("utf-8"))
+
+
+class _BudgetedWriter:
+    """StringIO wrapper that tracks bytes and estimated tokens as text is written."""
+
+    def __init__(self, max_bytes: int, max_tokens: int):
+        self.buffer = io.StringIO()
+        self.max_bytes = max_bytes
+        self.max_chars_for_tokens = max_tokens * constants.CONTEXT_CHARS_PER_TOKEN
+        self.bytes = 0
+        self.chars = 0
+
+    def fits(self, text: str) -> bool:
+        return (
+            self.bytes + len(text.encode("utf-8")) <= self.max_bytes
+            and self.chars + len(text) <= self.max_chars_for_tokens
+        )
+
+    def write(self, text: str) -> None:
+        self.buffer.write(text)
+        self.bytes += len(text.encode("utf-8"))
+        self.chars += len(text)
+
+    def write_truncated(self, text: str, reserve: int = 0) -> bool:
+        """
+        Write as much of text as fits, cut at a line break when one is close,
+        followed by TRUNCATION_MARKER. ``reserve`` bytes are left free.
+
+        Returns:
+            True if anything was written
+        """
+        marker = f"\n{TRUNCATION_MARKER}"
+        room_chars = min(self.max_chars_for_tokens - self.chars, self.max_bytes - self.bytes) - len(marker) - reserve
+        if room_chars <= 0:
+            return False
+        cut = text[:room_chars]
+        overflow = self.bytes + len((cut + marker).encode("utf-8")) + reserve - self.max_bytes
+        if overflow > 0:
+            # Multi-byte characters - trim the encoded tail without splitting a character
+            encoded = cut.encode("utf-8")
+            cut = encoded[:max(0, len(encoded) - overflow)].decode("utf-8", "ignore")
+        newline = cut.rfind("\n")
+        if newline > len(cut) // 2:
+            cut = cut[:newline]
+        cut = cut.rstrip()
+        if not cut:
+            return False
+        self.write(cut + marker)
+        return True
+
+    def getvalue(self) -> str:
+        return self.buffer.getvalue()
+
+
+def _format_issue(issue: dict, max_comment_chars: int) -> str:
+    """Render one closed Issue section (header, stripped description, stripped comments)."""
+    parts = [f"--- Closed Issue #{issue['id']}: {strip_html(issue.get('title', ''))} ---"]
+
+    description = strip_html(issue.get("description", ""))
+    if description:
+        parts.append(f"Description: {description}")
+
+    comments = [strip_html(comment) for comment in issue.get("comments") or []]
+    comments = [comment for comment in comments if comment]
+    if comments:
+        parts.append("Comments:")
+        for comment in comments:
+            if max_comment_chars and len(comment) > max_comment_chars:
+                comment = comment[:max_comment_chars].rstrip() + f" {TRUNCATION_MARKER}"
+            parts.append(f"- {comment}")
+
+    return "\n".join(parts)
+
+
+def rank_issues(issues: Iterable[dict]) -> List[dict]:
+    """Most recently changed Issues first; Issues without a ChangedDate keep WIQL order at the end."""
+    issues = list(issues)
+    dated = sorted((i for i in issues if i.get("changed_date")), key=lambda i: i["changed_date"], reverse=True)
+    undated = [i for i in issues if not i.get("changed_date")]
+    return dated + undated
+
+
+def build_feature_context(
+    base_description: str,
+    issues: Iterable[dict],
+    max_bytes: Optional[int] = None,
+    max_tokens: Optional[int] = None,
+    max_comment_chars: Optional[int] = None
+) -> FeatureContext:
+    """
+    Assemble base description + closed Issue context within a budget.
+
+    Args:
+        base_description: Feature description (or title) - always kept, cut only
+            if it alone exceeds the budget
+        issues: Closed Issues with id, title, description, comments and
+            optionally changed_date (from enrichment.get_closed_issues_with_comments)
+        max_bytes: UTF-8 byte budget (default: CONTEXT_MAX_BYTES env/constant)
+        max_tokens: Estimated token budget (default: CONTEXT_MAX_TOKENS env/constant)
+        max_comment_chars: Per-comment cap applied in the budgeted text
+            (default: CONTEXT_MAX_COMMENT_CHARS env/constant)
+
+    Returns:
+        FeatureContext with the budgeted ``text`` and the complete ``full_text``
+    """
+    if max_bytes is None:
+        max_bytes = int(os.getenv("CONTEXT_MAX_BYTES", constants.CONTEXT_MAX_BYTES))
+    if max_tokens is None:
+        max_tokens = int(os.getenv("CONTEXT_MAX_TOKENS", constants.CONTEXT_MAX_TOKENS))
+    if max_comment_chars is None:
+        max_comment_chars = int(os.getenv("CONTEXT_MAX_COMMENT_CHARS", constants.CONTEXT_MAX_COMMENT_CHARS))
+
+    ranked = rank_issues(issues)
+    budgeted = _BudgetedWriter(max_bytes, max_tokens)
+    full = io.StringIO()
+
+    base_description = base_description or ""
+    full.write(base_description)
+    if budgeted.fits(base_description):
+        budgeted.write(base_description)
+    else:
+        budgeted.write_truncated(base_description)
+
+    result = FeatureContext(text="", full_text="")
+    if ranked:
+        header = f"\n\n{CLARIFICATIONS_HEADER}\n\n"
+        full.write(header)
+        header_written = budgeted.fits(header)
+        if header_written:
+            budgeted.write(header)
+
+        for index, issue in enumerate(ranked):
+            separator = "\n\n" if index else ""
+            full.write(separator + _format_issue(issue, max_comment_chars=0))
+
+            if not header_written:
+                result.omitted_issues += 1
+                continue
+            section = separator + _format_issue(issue, max_comment_chars)
+            remaining = len(ranked) - index - 1
+            omitted_note = f"\n\n[{remaining} more closed Issues omitted]" if remaining else ""
+            if budgeted.fits(section + omitted_note):
+                budgeted.write(section)
+                result.included_issues += 1
+            elif result.truncated_issues == 0 and budgeted.write_truncated(section, reserve=len(omitted_note) + 40):
+                result.truncated_issues += 1
+            else:
+                result.omitted_issues += 1
+
+        if result.omitted_issues and header_written:
+            note = f"\n\n[{result.omitted_issues} more closed Issues omitted]"
+            if budgeted.fits(note):
+                budgeted.write(note)
+
+    result.text = budgeted.getvalue()
+    result.full_text = full.getvalue()
+    return result
+
+
+def build_summary(base_description: str, context: FeatureContext, max_bytes: Optional[int] = None) -> str:
+    """
+    Short inline stand-in for a context handed off via the artifact store.
+
+    Keeps the start of the base description (used by the workflow for the
+    branch name) and notes how much context the workflow will fetch.
+    """
+    if max_bytes is None:
+        max_bytes = constants.ARTIFACT_SUMMARY_MAX_BYTES
+    issue_count = context.included_issues + context.truncated_issues + context.omitted_issues
+    note = f"\n\n[Full context: {len(context.full_text.encode('utf-8'))} bytes, {issue_count} closed Issues - fetched by the workflow via context_sha256]"
+
+    writer = _BudgetedWriter(max_bytes - len(note.encode("utf-8")), max_tokens=max_bytes)
+    if writer.fits(base_description or ""):
+        writer.write(base_description or "")
+    else:
+        writer.write_truncated(base_description or "")
+    return writer.getvalue() + note
@@ -0,0 +1,346 @@
+"""
+Webhook deduplication and burst coalescing in front of dispatch_workflow.
+
+ADO fires several workitem.updated hooks for one board drag (column change,
+then a field change), and redelivers hooks it thinks failed. Each of them
+would otherwise start a full spec-kit-specify.yml run.
+
+Three checks, all keyed by work item:
+    - revision: the same (workItemId, rev) is dispatched at most once
+      within DEDUP_REVISION_TTL_SECONDS
+    - cooldown: at most one dispatch per work item per DEDUP_COOLDOWN_SECONDS;
+      in sync mode the first revision of a burst wins
+    - superseded: in async mode jobs wait DEDUP_COALESCE_SECONDS on the queue;
+      a job whose rev is older than the newest rev seen for the work item is
+      dropped so the burst collapses into one dispatch of the latest revision
+
+Backends (DEDUP_BACKEND):
+    - memory: per-instance TTL/LRU cache (default)
+    - table: Azure Table shared by all instances, in the AzureWebJobsStorage account
+"""
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+try:
+    from . import constants
+    from .app_logging import StructuredLogger
+    from .cache import TTLCache
+except ImportError:
+    import constants
+    from app_logging import StructuredLogger
+    from cache import TTLCache
+
+logger = StructuredLogger(__name__)
+
+SKIPPED = "skipped"
+
+
+class DedupStore:
+    """Base class for dedup key stores. Values are short strings."""
+
+    backend = "base"
+
+    def add(self, key: str, value: str, ttl_seconds: float) -> bool:
+        """Store value only if key is absent or expired. Returns True if stored."""
+        raise NotImplementedError
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the live value for key, or None."""
+        raise NotImplementedError
+
+    def set(self, key: str, value: str, ttl_seconds: float) -> None:
+        """Store value unconditionally."""
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        """Remove key if present."""
+        raise NotImplementedError
+
+
+class InMemoryDedupStore(DedupStore):
+    """Per-instance store; bursts usually land on the same warm instance."""
+
+    backend = "memory"
+
+    def __init__(self, maxsize: int = constants.DEDUP_CACHE_MAXSIZE):
+        self.cache = TTLCache(maxsize=maxsize)
+
+    def add(self, key: str, value: str, ttl_seconds: float) -> bool:
+        return self.cache.add(key, value, ttl_seconds=ttl_seconds)
+
+    def get(self, key: str) -> Optional[str]:
+        return self.cache.get(key)
+
+    def set(self, key: str, value: str, ttl_seconds: float) -> None:
+        self.cache.set(key, value, ttl_seconds=ttl_seconds)
+
+    def delete(self, key: str) -> None:
+        self.cache.delete(key)
+
+
+class AzureTableDedupStore(DedupStore):
+    """
+    Azure Table store shared across scaled-out instances.
+
+    Claims use insert-if-absent (create_entity) and, for expired rows, an
+    ETag-conditioned replace, so two instances never both win the same key.
+    """
+
+    backend = "table"
+    _PARTITION = "dedup"
+
+    def __init__(self, table_name: str):
+        try:
+            from azure.core import MatchConditions
+            from azure.core.exceptions import (
+                HttpResponseError,
+                ResourceExistsError,
+                ResourceNotFoundError,
+            )
+            from azure.data.tables import TableClient, UpdateMode
+        except ImportError as e:
+            raise RuntimeError("azure-data-tables is required for DEDUP_BACKEND=table") from e
+
+        self._match_conditions = MatchConditions
+        self._http_error = HttpResponseError
+        self._exists_error = ResourceExistsError
+        self._not_found_error = ResourceNotFoundError
+        self._update_mode = UpdateMode
+
+        connection_string = os.getenv("AzureWebJobsStorage")
+        if connection_string:
+            self._client = TableClient.from_connection_string(connection_string, table_name)
+        else:
+            account_name = os.getenv("AzureWebJobsStorage__accountName")
+            if not account_name:
+                raise RuntimeError("AzureWebJobsStorage or AzureWebJobsStorage__accountName must be set for DEDUP_BACKEND=table")
+            from azure.identity import DefaultAzureCredential
+            self._client = TableClient(
+                f"https://{account_name}.table.core.windows.net",
+                table_name,
+                credential=DefaultAzureCredential()
+            )
+
+        try:
+            self._client.create_table()
+        except ResourceExistsError:
+            pass
+
+    def _entity(self, key: str, value: str, ttl_seconds: float) -> dict:
+        return {
+            "PartitionKey": self._PARTITION,
+            "RowKey": key,
+            "Value": value,
+            "ExpiresAt": time.time() + ttl_seconds,
+        }
+
+    def add(self, key: str, value: str, ttl_seconds: float) -> bool:
+        try:
+            self._client.create_entity(self._entity(key, value, ttl_seconds))
+            return True
+        except self._exists_error:
+            pass
+
+        try:
+            existing = self._client.get_entity(self._PARTITION, key)
+        except self._not_found_error:
+            # Released between the insert and the read - try the insert once more
+            try:
+                self._client.create_entity(self._entity(key, value, ttl_seconds))
+                return True
+            except self._exists_error:
+                return False
+        if existing.get("ExpiresAt", 0) > time.time():
+            return False
+
+        try:
+            self._client.update_entity(
+                self._entity(key, value, ttl_seconds),
+                mode=self._update_mode.REPLACE,
+                etag=existing.metadata["etag"],
+                match_condition=self._match_conditions.IfNotModified
+            )
+            return True
+        except self._http_error:
+            # Another instance reclaimed the expired row first
+            return False
+
+    def get(self, key: str) -> Optional[str]:
+        try:
+            entity = self._client.get_entity(self._PARTITION, key)
+        except self._not_found_error:
+            return None
+        if entity.get("ExpiresAt", 0) <= time.time():
+            return None
+        return entity.get("Value")
+
+    def set(self, key: str, value: str, ttl_seconds: float) -> None:
+        self._client.upsert_entity(self._entity(key, value, ttl_seconds), mode=self._update_mode.REPLACE)
+
+    def delete(self, key: str) -> None:
+        self._client.delete_entity(self._PARTITION, key)
+
+
+def revision_of(resource: Optional[dict]) -> Optional[int]:
+    """Return the revision number carried by a hook ``resource`` (or compact job resource)."""
+    resource = resource or {}
+    revision = resource.get("revision") or {}
+    return revision.get("rev") or resource.get("rev")
+
+
+class Deduplicator:
+    """
+    Decides whether a validated hook should reach dispatch_workflow.
+
+    Usage:
+        dedup = get_deduplicator()
+        should_dispatch, reason = dedup.check(work_item_id, rev)
+        ...
+        if dispatch failed:
+            dedup.release(work_item_id, rev)  # let ADO's redelivery through
+    """
+
+    def __init__(
+        self,
+        store: DedupStore,
+        revision_ttl_seconds: float = constants.DEDUP_REVISION_TTL_SECONDS,
+        cooldown_seconds: float = constants.DEDUP_COOLDOWN_SECONDS
+    ):
+        self.store = store
+        self.revision_ttl_seconds = revision_ttl_seconds
+        self.cooldown_seconds = cooldown_seconds
+        self._lock = threading.Lock()
+        self._counters = {
+            "checked": 0,
+            "dispatched": 0,
+            "duplicate_revision": 0,
+            "cooldown": 0,
+            "superseded": 0,
+        }
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+
+    def note_revision(self, work_item_id: int, rev: Optional[int]) -> None:
+        """Record rev as the newest seen for the work item (used to detect superseded jobs)."""
+        if rev is None:
+            return
+        key = f"latest-{work_item_id}"
+        latest = self.store.get(key)
+        if latest is None or int(latest) < rev:
+            self.store.set(key, str(rev), self.revision_ttl_seconds)
+
+    def is_superseded(self, work_item_id: int, rev: Optional[int]) -> bool:
+        """True if a newer revision of the work item has been seen since this one."""
+        if rev is None:
+            return False
+        latest = self.store.get(f"latest-{work_item_id}")
+        if latest is not None and int(latest) > rev:
+            self._count("superseded")
+            return True
+        return False
+
+    def check(self, work_item_id: int, rev: Optional[int]) -> tuple[bool, str]:
+        """
+        Claim the (work item, rev) pair and the work item's cooldown window.
+
+        The revision claim is kept only when the hook is let through. Within a
+        cooldown the first revision wins: in sync mode a newer revision of the
+        same burst is suppressed (async mode dispatches the newest one via
+        is_superseded instead).
+
+        Args:
+            work_item_id: Azure DevOps work item ID
+            rev: Revision number from the hook payload (None skips the revision check)
+
+        Returns:
+            Tuple of (should_dispatch, reason)
+        """
+        self._count("checked")
+        self.note_revision(work_item_id, rev)
+
+        if rev is not None and not self.store.add(f"rev-{work_item_id}-{rev}", "1", self.revision_ttl_seconds):
+            self._count("duplicate_revision")
+            return False, f"duplicate revision {rev}"
+
+        if self.cooldown_seconds > 0 and not self.store.add(f"cooldown-{work_item_id}", str(rev), self.cooldown_seconds):
+            # Nothing was dispatched for this rev - don't hold its claim, so a
+            # redelivery after the cooldown can still dispatch it
+            if rev is not None:
+                self.store.delete(f"rev-{work_item_id}-{rev}")
+            self._count("cooldown")
+            return False, f"work item dispatched within the last {self.cooldown_seconds:g}s"
+
+        self._count("dispatched")
+        return True, "new revision"
+
+    def release(self, work_item_id: int, rev: Optional[int]) -> None:
+        """Forget the claims made by check() so a redelivered hook can dispatch again."""
+        try:
+            if rev is not None:
+                self.store.delete(f"rev-{work_item_id}-{rev}")
+            if self.cooldown_seconds > 0:
+                self.store.delete(f"cooldown-{work_item_id}")
+        except Exception as e:
+            logger.warning("dedup_release_failed", {"work_item_id": work_item_id, "rev": rev, "error": str(e)})
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Return dedup counters.
+
+        ``hits`` are hooks suppressed (duplicate revision, cooldown or
+        superseded); ``misses`` are hooks let through to dispatch.
+        """
+        with self._lock:
+            counters = dict(self._counters)
+        counters["hits"] = counters["duplicate_revision"] + counters["cooldown"] + counters["superseded"]
+        counters["misses"] = counters["dispatched"]
+        return counters
+
+
+_deduplicator: Optional[Deduplicator] = None
+_deduplicator_lock = threading.Lock()
+
+
+def dedup_enabled() -> bool:
+    """DEDUP_ENABLED=false turns the whole layer off."""
+    return os.getenv("DEDUP_ENABLED", "true").lower() not in ("0", "false", "no")
+
+
+def coalesce_delay() -> float:
+    """Seconds async jobs wait on the queue so a burst collapses into its latest revision."""
+    return float(os.getenv("DEDUP_COALESCE_SECONDS", constants.DEDUP_COALESCE_SECONDS)) if dedup_enabled() else 0
+
+
+def get_deduplicator() -> Deduplicator:
+    """Return the process-wide Deduplicator selected by DEDUP_BACKEND."""
+    global _deduplicator
+    if _deduplicator is not None:
+        return _deduplicator
+
+    with _deduplicator_lock:
+        if _deduplicator is None:
+            backend = os.getenv("DEDUP_BACKEND", constants.DEFAULT_DEDUP_BACKEND).lower()
+            if backend == "memory":
+                store = InMemoryDedupStore()
+            elif backend == "table":
+                store = AzureTableDedupStore(constants.DEDUP_TABLE_NAME)
+            else:
+                raise ValueError(f"Unknown DEDUP_BACKEND: {backend}")
+            _deduplicator = Deduplicator(
+                store,
+                revision_ttl_seconds=float(os.getenv("DEDUP_REVISION_TTL_SECONDS", constants.DEDUP_REVISION_TTL_SECONDS)),
+                cooldown_seconds=float(os.getenv("DEDUP_COOLDOWN_SECONDS", constants.DEDUP_COOLDOWN_SECONDS))
+            )
+            logger.info("deduplicator_initialized", {"backend": store.backend, "cooldown_seconds": _deduplicator.cooldown_seconds})
+        return _deduplicator
+
+
+def reset_deduplicator():
+    """Forget the cached deduplicator (used by tests)."""
+    global _deduplicator
+    with _deduplicator_lock:
+        _deduplicator = None
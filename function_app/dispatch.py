@@ -1,20 +1,41 @@
 """
 GitHub workflow_dispatch client for triggering spec generation.
 """
-import logging
-import os
 import time
-from typing import Optional
+from typing import Callable, Optional
 
 import requests
 
-logger = logging.getLogger(__name__)
+try:
+    from . import http_session, metrics
+    from .app_logging import StructuredLogger
+    from .config import Config, get_config
+    from .retry import RetryPolicy, is_rate_limited
+    from .routing import Route
+except ImportError:
+    import http_session
+    import metrics
+    from app_logging import StructuredLogger
+    from config import Config, get_config
+    from retry import RetryPolicy, is_rate_limited
+    from routing import Route
+
+logger = StructuredLogger(__name__)
+
+# Message prefix returned when a retry was handed to a deferred scheduler
+RETRY_SCHEDULED = "retry_scheduled"
 
 
 def dispatch_workflow(
     work_item_id: int,
     description_placeholder: str = "",
-    changed_by_user_id: Optional[str] = None
+    changed_by_user_id: Optional[str] = None,
+    retry_scheduler: Optional[Callable[[float, int], None]] = None,
+    attempt: int = 0,
+    retry_policy: Optional[RetryPolicy] = None,
+    context_sha256: Optional[str] = None,
+    route: Optional[Route] = None,
+    cfg: Optional[Config] = None
 ) -> tuple[bool, str]:
     """
     Trigger GitHub Actions workflow via workflow_dispatch API with retry logic.
@@ -23,40 +44,41 @@ def dispatch_workflow(
         work_item_id: Azure DevOps work item ID
         description_placeholder: Optional description text
         changed_by_user_id: Optional Azure DevOps user ID who last changed the work item
+        retry_scheduler: Optional callable(delay_seconds, next_attempt). When given,
+            a retryable failure is handed to it instead of sleeping in-process
+        attempt: Zero-based attempt number (non-zero when resuming a deferred retry)
+        retry_policy: Optional RetryPolicy (default: constants.MAX_RETRY_ATTEMPTS /
+            RETRY_BACKOFF_DELAYS with jitter)
+        context_sha256: Optional artifact store digest of the full feature context;
+            the workflow fetches it and description_placeholder is only a summary
+        route: Optional routing.Route (rendered) selecting repo/workflow/ref and
+            extra inputs; fields it leaves unset use the GITHUB_* environment
+        cfg: Optional config snapshot (default: config.get_config())
     
     Returns:
         Tuple of (success, message)
         - (True, "dispatched") on HTTP 204
+        - (False, "retry_scheduled: ...") when a retry was handed to retry_scheduler
         - (False, error_message) on failure
     
     Retry Strategy:
-        - 3 attempts with exponential backoff (2s, 6s, 14s)
-        - Only retries on network/transport errors, not validation failures
+        - MAX_RETRY_ATTEMPTS attempts with jittered backoff from RETRY_BACKOFF_DELAYS
+        - Retry-After / X-RateLimit-Reset from GitHub override the backoff
+        - Retries on network/transport errors, 5xx and rate limiting (403/429),
+          not on validation failures
     """
-    try:
-        github_owner = os.getenv("GITHUB_OWNER")
-        github_repo = os.getenv("GITHUB_REPO")
-        workflow_filename = os.getenv("GITHUB_WORKFLOW_FILENAME", "spec-kit-specify.yml")
-        workflow_ref = os.getenv("GITHUB_WORKFLOW_REF", "main")  # Branch/tag to dispatch on
-        pat = os.getenv("GH_WORKFLOW_DISPATCH_PAT")
-    except Exception as env_err:
-        logger.exception(f"Failed to read environment variables: {env_err}")
-        return False, f"Configuration error: Failed to read environment variables - {str(env_err)}"
-    
-    # Check if PAT is a Key Vault reference that wasn't resolved
-    if pat and pat.startswith("@Microsoft.KeyVault"):
-        logger.error(f"Key Vault reference not resolved: GH_WORKFLOW_DISPATCH_PAT appears to be unresolved Key Vault reference")
-        return False, "Key Vault secret not accessible - GH_WORKFLOW_DISPATCH_PAT reference unresolved. Check function managed identity has 'Key Vault Secrets User' role and Key Vault network ACLs allow access."
+    cfg = cfg or get_config()
+    github_owner = (route and route.owner) or cfg.github_owner
+    github_repo = (route and route.repo) or cfg.github_repo
+    workflow_filename = (route and route.workflow) or cfg.github_workflow_filename
+    workflow_ref = (route and route.ref) or cfg.github_workflow_ref  # Branch/tag to dispatch on
+    pat = cfg.gh_workflow_dispatch_pat
     
-    # Log PAT status (without exposing the actual value)
-    if pat:
-        pat_prefix = pat[:10] if len(pat) > 10 else pat[:len(pat)]
-        pat_length = len(pat)
-        logger.info(f"PAT retrieved - length={pat_length}, prefix={pat_prefix}...")
-        print(f"STDOUT: PAT retrieved - length={pat_length}, starts_with_ghp={pat.startswith('ghp_')}, starts_with_github_pat={pat.startswith('github_pat_')}")
-    else:
-        logger.error("PAT is None or empty")
-        print("STDOUT: PAT is None or empty")
+    # Unresolved Key Vault reference - detected once when the snapshot was built
+    keyvault_error = cfg.keyvault_error("GH_WORKFLOW_DISPATCH_PAT")
+    if keyvault_error:
+        logger.error("dispatch_config_error", {"error": "GH_WORKFLOW_DISPATCH_PAT Key Vault reference unresolved"})
+        return False, keyvault_error
     
     if not all([github_owner, github_repo, pat]):
         missing = []
@@ -66,73 +88,74 @@ def dispatch_workflow(
             missing.append("GITHUB_REPO")
         if not pat:
             missing.append("GH_WORKFLOW_DISPATCH_PAT")
+        logger.error("dispatch_config_error", {"missing": missing})
         return False, f"Missing required environment variables: {', '.join(missing)}"
     
-    url = f"https://api.github.com/repos/{github_owner}/{github_repo}/actions/workflows/{workflow_filename}/dispatches"
-    headers = {
-        "Authorization": f"Bearer {pat}",
-        "Accept": "application/vnd.github+json",
-        "X-GitHub-Api-Version": "2022-11-28"
-    }
-    inputs = {
+    url = cfg.github_dispatch_url(github_owner, github_repo, workflow_filename)
+    headers = cfg.github_headers
+    # Route inputs first (names checked against routing.RESERVED_INPUTS when the
+    # table loaded); the target workflow must declare each of them
+    inputs = dict(route.inputs) if route else {}
+    inputs.update({
         "feature_description": description_placeholder or f"ADO Work Item #{work_item_id}",
         "create_branch": "true",
         "work_item_id": str(work_item_id)
-    }
+    })
     
     # Add changed_by_user_id if provided
     if changed_by_user_id:
         inputs["ado_changed_by_user_id"] = str(changed_by_user_id)
-        logger.info(f"Added ado_changed_by_user_id to workflow inputs: {changed_by_user_id}")
     else:
-        logger.warning("changed_by_user_id is None or empty - workflow will skip assignment step")
+        logger.warning("changed_by_user_missing", {"work_item_id": work_item_id, "effect": "workflow skips assignment step"})
+    
+    if context_sha256:
+        inputs["context_sha256"] = context_sha256
+        logger.debug("context_handoff", {"context_sha256": context_sha256, "inline_chars": len(inputs["feature_description"])})
     
     payload = {
         "ref": workflow_ref,  # Use configured branch
         "inputs": inputs
     }
     
-    max_attempts = 3
-    backoff_delays = [2, 6, 14]  # seconds (exponential: 2, 4+2, 8+6)
+    policy = retry_policy or RetryPolicy()
     
-    for attempt in range(max_attempts):
+    while True:
+        metrics.count("github_dispatch_attempts")
+        response_headers = None
         try:
-            response = requests.post(url, json=payload, headers=headers, timeout=15)
+            response = http_session.post(url, json=payload, headers=headers, timeout=15)
             
             if response.status_code == 204:
-                logger.info(f"Successfully dispatched workflow for work item {work_item_id} (attempt {attempt + 1})")
+                logger.info("dispatch_succeeded", {"work_item_id": work_item_id, "attempt": attempt + 1})
                 return True, "dispatched"
-            elif response.status_code in [401, 403, 404, 422]:
-                # Client errors - don't retry
-                error_msg = f"HTTP {response.status_code}: {response.text[:200]}"
-                logger.error(f"Dispatch failed (client error, no retry): {error_msg}")
+            
+            error_msg = f"HTTP {response.status_code}: {response.text[:200]}"
+            response_headers = response.headers
+            if response.status_code in [401, 403, 404, 422] and not is_rate_limited(response.status_code, response_headers):
+                # Client errors - don't retry (403/429 throttling falls through to retry)
+                logger.error("dispatch_rejected", {"work_item_id": work_item_id, "attempt": attempt + 1, "error": error_msg})
                 return False, error_msg
-            else:
-                # Server error - retry
-                error_msg = f"HTTP {response.status_code}: {response.text[:200]}"
-                if attempt < max_attempts - 1:
-                    delay = backoff_delays[attempt]
-                    logger.warning(f"Dispatch failed (attempt {attempt + 1}), retrying in {delay}s: {error_msg}")
-                    time.sleep(delay)
-                else:
-                    logger.error(f"Dispatch failed after {max_attempts} attempts: {error_msg}")
-                    return False, error_msg
-                    
         except requests.exceptions.Timeout:
-            if attempt < max_attempts - 1:
-                delay = backoff_delays[attempt]
-                logger.warning(f"Timeout (attempt {attempt + 1}), retrying in {delay}s")
-                time.sleep(delay)
-            else:
-                return False, "GitHub API timeout after 3 attempts"
+            error_msg = "GitHub API timeout"
         except requests.exceptions.RequestException as e:
-            if attempt < max_attempts - 1:
-                delay = backoff_delays[attempt]
-                logger.warning(f"Request error (attempt {attempt + 1}), retrying in {delay}s: {str(e)}")
-                time.sleep(delay)
-            else:
-                return False, f"Request error after 3 attempts: {str(e)}"
-    
-    return False, "Max retry attempts exceeded"
-
-
+            error_msg = f"Request error: {str(e)}"
+        
+        if not policy.can_retry(attempt):
+            logger.error("dispatch_retries_exhausted", {"work_item_id": work_item_id, "attempts": attempt + 1, "error": error_msg})
+            return False, f"{error_msg} after {attempt + 1} attempts"
+        
+        delay = policy.delay_for(attempt, response_headers)
+        
+        if retry_scheduler is not None:
+            # Hand the retry to a deferred/durable schedule instead of holding the worker
+            retry_scheduler(delay, attempt + 1)
+            logger.warning("dispatch_retry_scheduled", {"work_item_id": work_item_id, "attempt": attempt + 1, "delay_s": round(delay, 1), "error": error_msg})
+            return False, f"{RETRY_SCHEDULED}: attempt {attempt + 2}/{policy.max_attempts} in {delay:.1f}s - {error_msg}"
+        
+        if delay > policy.max_delay:
+            logger.error("dispatch_rate_limited", {"work_item_id": work_item_id, "attempt": attempt + 1, "retry_after_s": round(delay), "max_delay_s": policy.max_delay, "error": error_msg})
+            return False, f"{error_msg} (rate limited - retry after {delay:.0f}s)"
+        
+        logger.warning("dispatch_retry", {"work_item_id": work_item_id, "attempt": attempt + 1, "delay_s": round(delay, 1), "error": error_msg})
+        time.sleep(delay)
+        attempt += 1
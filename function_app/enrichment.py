@@ -0,0 +1,121 @@
+"""
+Closed child Issue enrichment with a per-Issue comment cache.
+
+Closed Issues rarely change, so re-dispatching the same Feature should not
+re-fetch every Issue's comments. Comments are cached per Issue id together
+with the Issue's System.Rev / System.ChangedDate (adding a comment bumps
+both); on the next run only Issues whose version moved are fetched again.
+
+ADO calls per run: WIQL + one batch work item fetch + one comments call per
+new or changed Issue.
+"""
+import os
+from typing import Dict, List, Optional
+
+try:
+    from . import ado_client, constants, metrics
+    from .app_logging import StructuredLogger
+    from .cache import TTLCache
+except ImportError:
+    import ado_client
+    import constants
+    import metrics
+    from app_logging import StructuredLogger
+    from cache import TTLCache
+
+logger = StructuredLogger(__name__)
+
+# (Issue id, version) -> comments; superseded versions age out via LRU/TTL.
+# Module level so it survives warm invocations.
+_comment_cache = TTLCache(
+    maxsize=int(os.getenv("ENRICHMENT_CACHE_MAXSIZE", constants.ENRICHMENT_CACHE_MAXSIZE)),
+    ttl_seconds=float(os.getenv("ENRICHMENT_CACHE_TTL_SECONDS", constants.ENRICHMENT_CACHE_TTL_SECONDS))
+)
+
+
+def issue_version(issue: dict) -> Optional[tuple]:
+    """
+    Cache version for an Issue from get_child_issues.
+
+    Returns:
+        (rev, changed_date), or None when ADO returned neither (never cached)
+    """
+    rev = issue.get("rev")
+    changed_date = issue.get("changed_date")
+    if rev is None and changed_date is None:
+        return None
+    return (rev, changed_date)
+
+
+def get_closed_issues_with_comments(parent_feature_id: int, correlation_id: str = "") -> List[dict]:
+    """
+    Fetch closed child Issues and attach their comments, reusing cached comments
+    for Issues whose revision has not moved since the last run.
+
+    Args:
+        parent_feature_id: Parent Feature work item ID
+        correlation_id: Request correlation ID for log lines
+
+    Returns:
+        get_child_issues() dicts (Issues without an id dropped), each with a
+        ``comments`` list, in WIQL order
+    """
+    issues = []
+    with metrics.stage("ado_child_issues"):
+        child_issues = ado_client.get_child_issues(parent_feature_id)
+    for issue in child_issues:
+        if not issue.get("id"):
+            logger.warning("issue_without_id_skipped", {"work_item_id": parent_feature_id, "issue": str(issue)[:200]})
+            continue
+        issues.append(issue)
+
+    if not issues:
+        return []
+
+    comments_by_issue: Dict[int, List[str]] = {}
+    cache_keys = {}
+    stale_ids = []
+    for issue in issues:
+        version = issue_version(issue)
+        cache_key = (issue["id"], version) if version is not None else None
+        cached = _comment_cache.get(cache_key) if cache_key else None
+        if cached is not None:
+            comments_by_issue[issue["id"]] = cached
+        else:
+            cache_keys[issue["id"]] = cache_key
+            stale_ids.append(issue["id"])
+
+    if stale_ids:
+        with metrics.stage("ado_comments"):
+            fetched = ado_client.get_work_item_comments_batch(stale_ids, include_failures=True)
+        for issue_id in stale_ids:
+            comments = fetched.get(issue_id)
+            if comments is None:
+                # Failed or missed the deadline - use nothing this run and retry next run
+                comments_by_issue[issue_id] = []
+                continue
+            comments_by_issue[issue_id] = comments
+            if cache_keys[issue_id]:
+                _comment_cache.set(cache_keys[issue_id], comments)
+
+    metrics.annotate(comments_cached=len(issues) - len(stale_ids), comments_fetched=len(stale_ids))
+    logger.debug("closed_issue_comments", lambda: {
+        "work_item_id": parent_feature_id,
+        "cached": len(issues) - len(stale_ids),
+        "fetched": len(stale_ids),
+        "cache": _comment_cache.stats()
+    })
+
+    for issue in issues:
+        issue["comments"] = comments_by_issue.get(issue["id"], [])
+    return issues
+
+
+def get_cache_stats() -> Dict[str, int]:
+    """Return hit/miss/eviction counters for the comment cache."""
+    return _comment_cache.stats()
+
+
+def clear_cache() -> None:
+    """Drop all cached comments (used by tests)."""
+    _comment_cache.clear()
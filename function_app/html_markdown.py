@@ -0,0 +1,267 @@
+"""
+Single-pass HTML to Markdown conversion for ADO rich-text fields.
+
+ADO stores work item descriptions and comments as HTML. This converter walks
+the markup once with html.parser and writes Markdown as it goes, so the
+function app (closed Issue enrichment) and the clarification scripts produce
+the same text without depending on html2text.
+
+Supported: paragraphs/divs/line breaks, h1-h6, bold/italic/code, pre blocks,
+blockquotes, nested ordered and unordered lists, links, images, tables (as
+GFM pipe tables), horizontal rules and all HTML entities. Unknown tags are
+dropped and their text kept; script/style content is discarded.
+
+Usage:
+    from html_markdown import html_to_markdown   # scripts (function_app on sys.path)
+    from .html_markdown import html_to_markdown  # inside function_app
+"""
+from html.parser import HTMLParser
+from typing import List, Optional
+
+_INLINE_MARKERS = {"strong": "**", "b": "**", "em": "*", "i": "*", "code": "`", "s": "~~", "strike": "~~", "del": "~~"}
+_HEADINGS = {"h1": 1, "h2": 2, "h3": 3, "h4": 4, "h5": 5, "h6": 6}
+_SKIP_TAGS = {"script", "style", "head", "title"}
+
+
+class _Buffer:
+    """Markdown output with deferred whitespace, so no trailing spaces or blank-line runs are ever written."""
+
+    def __init__(self, preformatted: bool = False):
+        self.parts: List[str] = []
+        self.preformatted = preformatted
+        self.pending_newlines = 0
+        self.pending_space = False
+        self.at_line_start = True
+        self.has_text = False
+        self.hold = False  # just wrote a list/heading marker - its content follows on the same line
+
+    def block(self, newlines: int) -> None:
+        """Request a line break (1) or blank line (2) before the next text."""
+        if self.hold:
+            return
+        if self.has_text:
+            self.pending_newlines = max(self.pending_newlines, newlines)
+        self.pending_space = False
+
+    def line_break(self) -> None:
+        """<br>: each one adds a newline, up to one blank line."""
+        if self.has_text:
+            self.pending_newlines = min(2, self.pending_newlines + 1)
+        self.pending_space = False
+
+    def _flush(self) -> None:
+        if self.pending_newlines:
+            self.parts.append("\n" * self.pending_newlines)
+            self.pending_newlines = 0
+            self.at_line_start = True
+            self.pending_space = False
+        elif self.pending_space:
+            self.parts.append(" ")
+        self.pending_space = False
+
+    def raw(self, text: str) -> None:
+        """Write markup (list markers, emphasis) verbatim."""
+        if not text:
+            return
+        self._flush()
+        self.parts.append(text)
+        self.at_line_start = text.endswith("\n")
+        self.has_text = True
+        self.hold = False
+
+    def marker(self, text: str) -> None:
+        """Write a line prefix ("- ", "1. ", "## ") that its content must follow."""
+        self.raw(text)
+        self.hold = True
+
+    def text(self, data: str) -> None:
+        """Write character data, collapsing whitespace unless preformatted."""
+        if self.preformatted:
+            self.raw(data)
+            return
+        if not data:
+            return
+        leading = data[0].isspace()
+        trailing = data[-1].isspace()
+        words = data.split()
+        if not words:
+            if not self.at_line_start and self.has_text:
+                self.pending_space = True
+            return
+        if leading and not self.at_line_start and self.has_text:
+            self.pending_space = True
+        self.raw(" ".join(words))
+        if trailing:
+            self.pending_space = True
+
+    def value(self) -> str:
+        return "".join(self.parts)
+
+
+class _MarkdownConverter(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self._buffers: List[_Buffer] = [_Buffer()]
+        self._lists: List[list] = []  # [ordered, next number]
+        self._links: List[Optional[str]] = []
+        self._tables: List[dict] = []
+        self._skip_depth = 0
+
+    @property
+    def _out(self) -> _Buffer:
+        return self._buffers[-1]
+
+    def _push(self, preformatted: bool = False) -> None:
+        self._buffers.append(_Buffer(preformatted=preformatted))
+
+    def _pop(self) -> str:
+        return self._buffers.pop().value()
+
+    def handle_starttag(self, tag, attrs):
+        if tag in _SKIP_TAGS:
+            self._skip_depth += 1
+            return
+        if self._skip_depth:
+            return
+        attrs = dict(attrs)
+        out = self._out
+
+        if tag in ("p", "blockquote", "pre", "table") or tag in _HEADINGS:
+            out.block(2)
+            if tag in _HEADINGS:
+                out.marker("#" * _HEADINGS[tag] + " ")
+            elif tag == "blockquote":
+                self._push()
+            elif tag == "pre":
+                self._push(preformatted=True)
+            elif tag == "table":
+                self._tables.append({"rows": [], "row": None})
+        elif tag in ("div", "tr"):
+            out.block(1)
+            if tag == "tr" and self._tables:
+                table = self._tables[-1]
+                table["row"] = []
+                table["rows"].append(table["row"])
+        elif tag == "br":
+            out.line_break()
+        elif tag == "hr":
+            out.block(2)
+            out.raw("---")
+            out.block(2)
+        elif tag in ("ul", "ol"):
+            out.block(1 if self._lists else 2)
+            self._lists.append([tag == "ol", int(attrs.get("start") or 1) if tag == "ol" else 0])
+        elif tag == "li":
+            out.block(1)
+            indent = "   " * max(0, len(self._lists) - 1)
+            if self._lists and self._lists[-1][0]:
+                marker = f"{self._lists[-1][1]}. "
+                self._lists[-1][1] += 1
+            else:
+                marker = "- "
+            out.marker(indent + marker)
+        elif tag in ("td", "th"):
+            self._push()
+        elif tag == "a":
+            self._links.append(attrs.get("href"))
+            self._push()
+        elif tag == "img":
+            src = attrs.get("src")
+            if src:
+                out.raw(f"![{attrs.get('alt') or ''}]({src})")
+        elif tag in _INLINE_MARKERS and not out.preformatted:
+            out.raw(_INLINE_MARKERS[tag])
+
+    def handle_startendtag(self, tag, attrs):
+        # <br/>, <img/>, <hr/> - no matching end tag follows
+        self.handle_starttag(tag, attrs)
+        if tag not in ("br", "img", "hr"):
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if tag in _SKIP_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+            return
+        if self._skip_depth:
+            return
+
+        if tag in ("p", "div", "table") or tag in _HEADINGS:
+            if tag == "table" and self._tables:
+                self._write_table(self._tables.pop())
+            self._out.hold = False
+            self._out.block(2 if tag != "div" else 1)
+        elif tag == "li":
+            self._out.hold = False
+            self._out.block(1)
+        elif tag == "blockquote" and len(self._buffers) > 1:
+            quoted = self._pop().strip("\n")
+            out = self._out
+            out.block(2)
+            out.raw("\n".join(f"> {line}" if line else ">" for line in quoted.split("\n")))
+            out.block(2)
+        elif tag == "pre" and len(self._buffers) > 1:
+            code = self._pop().strip("\n")
+            out = self._out
+            out.block(2)
+            out.raw(f"```\n{code}\n```")
+            out.block(2)
+        elif tag in ("ul", "ol"):
+            if self._lists:
+                self._lists.pop()
+            self._out.block(1 if self._lists else 2)
+        elif tag in ("td", "th") and len(self._buffers) > 1:
+            cell = " ".join(self._pop().split()).replace("|", "\\|")
+            if self._tables and self._tables[-1]["row"] is not None:
+                self._tables[-1]["row"].append(cell)
+        elif tag == "a" and self._links and len(self._buffers) > 1:
+            text = self._pop()
+            href = self._links.pop()
+            if href and href != text and not href.startswith("javascript:"):
+                self._out.raw(f"[{text or href}]({href})")
+            else:
+                self._out.text(text)
+        elif tag in _INLINE_MARKERS and not self._out.preformatted:
+            self._out.raw(_INLINE_MARKERS[tag])
+
+    def handle_data(self, data):
+        if self._skip_depth:
+            return
+        self._out.text(data.replace("\xa0", " "))
+
+    def _write_table(self, table: dict) -> None:
+        rows = [row for row in table["rows"] if row]
+        if not rows:
+            return
+        width = max(len(row) for row in rows)
+        rows = [row + [""] * (width - len(row)) for row in rows]
+        lines = [f"| {' | '.join(rows[0])} |", f"|{'---|' * width}"]
+        lines.extend(f"| {' | '.join(row)} |" for row in rows[1:])
+        out = self._out
+        out.block(2)
+        out.raw("\n".join(lines))
+        out.block(2)
+
+    def result(self) -> str:
+        # Unclosed links / cells / quotes: fold their text back into the document
+        while len(self._buffers) > 1:
+            text = self._pop()
+            self._out.text(text)
+        return self._out.value().strip()
+
+
+def html_to_markdown(html: Optional[str]) -> str:
+    """
+    Convert an ADO HTML field to Markdown in one pass.
+
+    Args:
+        html: HTML (or plain text, which passes through with entities unescaped)
+
+    Returns:
+        Markdown text without trailing whitespace or runs of blank lines
+    """
+    if not html:
+        return ""
+    converter = _MarkdownConverter()
+    converter.feed(html)
+    converter.close()
+    return converter.result()
@@ -0,0 +1,265 @@
+"""
+Connection-pooled HTTP sessions shared by ado_client and dispatch.
+
+Sessions are created once per host and kept at module level, so warm
+Azure Functions invocations reuse TLS connections to dev.azure.com and
+api.github.com instead of paying a handshake on every call.
+"""
+import logging
+import os
+import socket
+import threading
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+try:
+    from . import cassette, constants, metrics
+except ImportError:
+    import cassette
+    import constants
+    import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class _ConnectionStats:
+    """Thread-safe per-host counters for requests and newly opened connections."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hosts: Dict[str, Dict[str, int]] = {}
+
+    def _host(self, host: str) -> Dict[str, int]:
+        return self._hosts.setdefault(host, {"requests": 0, "new_connections": 0})
+
+    def record_request(self, host: str):
+        with self._lock:
+            self._host(host)["requests"] += 1
+
+    def record_new_connection(self, host: str):
+        with self._lock:
+            self._host(host)["new_connections"] += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            result = {}
+            for host, counts in self._hosts.items():
+                result[host] = {
+                    "requests": counts["requests"],
+                    "new_connections": counts["new_connections"],
+                    "reused_connections": max(0, counts["requests"] - counts["new_connections"]),
+                }
+            return result
+
+    def reset(self):
+        with self._lock:
+            self._hosts.clear()
+
+
+_stats = _ConnectionStats()
+
+
+# Count at connect() rather than pool._new_conn(): urllib3 reconnects a
+# dropped pooled connection object in place, which is still a new handshake.
+class _CountingHTTPConnection(HTTPConnection):
+    def connect(self):
+        _stats.record_new_connection(self.host)
+        return super().connect()
+
+
+class _CountingHTTPSConnection(HTTPSConnection):
+    def connect(self):
+        _stats.record_new_connection(self.host)
+        return super().connect()
+
+
+class _CountingHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _CountingHTTPConnection
+
+
+class _CountingHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _CountingHTTPSConnection
+
+
+def _keepalive_socket_options() -> list:
+    """
+    TCP keep-alive probes so idle pooled connections survive Azure SNAT/load
+    balancer idle timeouts (~4 minutes) between hook bursts.
+    """
+    options = list(HTTPConnection.default_socket_options)
+    options.append((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1))
+    if hasattr(socket, "TCP_KEEPIDLE"):
+        options.append((socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, 60))
+    if hasattr(socket, "TCP_KEEPINTVL"):
+        options.append((socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, 30))
+    return options
+
+
+class PooledAdapter(HTTPAdapter):
+    """HTTPAdapter that records connection reuse and enables TCP keep-alive."""
+
+    def __init__(self, keep_alive: bool = True, **kwargs):
+        self._keep_alive = keep_alive
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        if self._keep_alive:
+            kwargs.setdefault("socket_options", _keepalive_socket_options())
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _CountingHTTPConnectionPool,
+            "https": _CountingHTTPSConnectionPool,
+        }
+
+    def send(self, request, *args, **kwargs):
+        _stats.record_request(urlsplit(request.url).hostname or "")
+        return super().send(request, *args, **kwargs)
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None or value == "":
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        logger.warning(f"Invalid integer for {name}, using default {default}")
+        return default
+
+
+def _host_pool_limits() -> Dict[str, int]:
+    """
+    Parse per-host pool size overrides.
+
+    Format: HTTP_POOL_HOST_LIMITS="dev.azure.com=16,api.github.com=4"
+    """
+    limits = {}
+    raw = os.getenv("HTTP_POOL_HOST_LIMITS", "")
+    for entry in raw.split(","):
+        if "=" not in entry:
+            continue
+        host, _, size = entry.partition("=")
+        try:
+            limits[host.strip().lower()] = int(size)
+        except ValueError:
+            logger.warning(f"Ignoring invalid HTTP_POOL_HOST_LIMITS entry: {entry!r}")
+    return limits
+
+
+_sessions: Dict[str, requests.Session] = {}
+_sessions_lock = threading.Lock()
+
+
+def _build_session(scheme: str, host: str) -> requests.Session:
+    keep_alive = _env_bool("HTTP_KEEP_ALIVE", constants.HTTP_KEEP_ALIVE)
+    pool_maxsize = _host_pool_limits().get(
+        host, _env_int("HTTP_POOL_MAXSIZE", constants.HTTP_POOL_MAXSIZE)
+    )
+    adapter = PooledAdapter(
+        keep_alive=keep_alive,
+        pool_connections=_env_int("HTTP_POOL_CONNECTIONS", constants.HTTP_POOL_CONNECTIONS),
+        pool_maxsize=pool_maxsize,
+        pool_block=_env_bool("HTTP_POOL_BLOCK", constants.HTTP_POOL_BLOCK),
+        max_retries=0,  # Callers own their retry policy
+    )
+
+    # HTTP_CASSETTE_MODE=record|replay: capture or serve traffic beneath the pool
+    recording = cassette.get_cassette()
+    if recording is not None:
+        adapter = cassette.CassetteAdapter(recording, adapter)
+
+    session = requests.Session()
+    session.mount(f"{scheme}://", adapter)
+    if not keep_alive:
+        session.headers["Connection"] = "close"
+
+    logger.debug(f"Created pooled session for {scheme}://{host} - pool_maxsize={pool_maxsize}, keep_alive={keep_alive}")
+    return session
+
+
+def get_session(url: str) -> requests.Session:
+    """
+    Return the shared session for the host of ``url``, creating it on first use.
+
+    Args:
+        url: Any URL on the target host
+
+    Returns:
+        Module-level requests.Session with a pooled adapter for that host
+    """
+    parts = urlsplit(url)
+    scheme = parts.scheme or "https"
+    host = (parts.hostname or "").lower()
+    key = f"{scheme}://{parts.netloc.lower()}"
+
+    session = _sessions.get(key)
+    if session is not None:
+        return session
+
+    with _sessions_lock:
+        session = _sessions.get(key)
+        if session is None:
+            session = _build_session(scheme, host)
+            _sessions[key] = session
+        return session
+
+
+def request(method: str, url: str, **kwargs) -> requests.Response:
+    """Send a request through the pooled session for the URL's host."""
+    session = get_session(url)
+    # Per-request outbound call count and time by host (no-op outside a tracked request)
+    host = urlsplit(url).hostname or ""
+    metrics.count(f"http.{host}")
+    with metrics.stage(f"http.{host}"):
+        return session.request(method, url, **kwargs)
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    """Pooled equivalent of requests.get."""
+    return request("GET", url, **kwargs)
+
+
+def post(url: str, **kwargs) -> requests.Response:
+    """Pooled equivalent of requests.post."""
+    return request("POST", url, **kwargs)
+
+
+def patch(url: str, **kwargs) -> requests.Response:
+    """Pooled equivalent of requests.patch."""
+    return request("PATCH", url, **kwargs)
+
+
+def get_connection_stats(host: Optional[str] = None) -> dict:
+    """
+    Return connection reuse counters.
+
+    Args:
+        host: Optional hostname to filter on (e.g. "dev.azure.com")
+
+    Returns:
+        Dict of host -> {requests, new_connections, reused_connections},
+        or the counters for a single host when ``host`` is given
+    """
+    snapshot = _stats.snapshot()
+    if host is not None:
+        return snapshot.get(host.lower(), {"requests": 0, "new_connections": 0, "reused_connections": 0})
+    return snapshot
+
+
+def reset_sessions():
+    """Close all pooled sessions and clear counters (used by tests and config reloads)."""
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+    _stats.reset()
+    cassette.reset_cassette()
@@ -0,0 +1,280 @@
+"""
+Job queue for async accept-and-queue mode (DISPATCH_MODE=async).
+
+The HTTP trigger validates the hook, enqueues a compact DispatchJob and
+returns 202; a queue-triggered function does enrichment and dispatch.
+
+Backends (JOB_QUEUE_BACKEND):
+    - azure: Azure Storage queue consumed by the spec_dispatch_worker trigger
+    - sqlite: file-backed stand-in for local testing (JOB_QUEUE_SQLITE_PATH)
+    - memory: in-process stand-in for local testing and unit tests
+"""
+import heapq
+import itertools
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Optional
+
+try:
+    from . import constants
+    from .app_logging import StructuredLogger
+    from .models import DispatchJob
+    from .routing import Route
+except ImportError:
+    import constants
+    from app_logging import StructuredLogger
+    from models import DispatchJob
+    from routing import Route
+
+logger = StructuredLogger(__name__)
+
+
+class JobQueue:
+    """Base class for dispatch job queues."""
+
+    backend = "base"
+
+    def enqueue(self, job: DispatchJob, delay_seconds: float = 0) -> None:
+        """
+        Add a job to the queue.
+
+        Args:
+            job: Job to enqueue
+            delay_seconds: Keep the job invisible for this long (used for deferred retries)
+        """
+        raise NotImplementedError
+
+    def dequeue(self) -> Optional[DispatchJob]:
+        """Remove and return the next visible job, or None when nothing is due."""
+        raise NotImplementedError
+
+    def drain(self, handler: Callable[[DispatchJob], None], max_jobs: Optional[int] = None) -> int:
+        """
+        Process visible jobs until the queue is empty.
+
+        Args:
+            handler: Called once per job
+            max_jobs: Optional cap on jobs processed in this call
+
+        Returns:
+            Number of jobs processed
+        """
+        processed = 0
+        while max_jobs is None or processed < max_jobs:
+            job = self.dequeue()
+            if job is None:
+                break
+            try:
+                handler(job)
+            except Exception as e:
+                logger.exception("job_handler_failed", {"correlation_id": job.correlation_id, "work_item_id": job.work_item_id, "error": str(e)})
+            processed += 1
+        return processed
+
+
+class InMemoryJobQueue(JobQueue):
+    """Process-local queue ordered by visibility time."""
+
+    backend = "memory"
+
+    def __init__(self):
+        self._heap = []
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def enqueue(self, job: DispatchJob, delay_seconds: float = 0) -> None:
+        with self._lock:
+            heapq.heappush(self._heap, (time.monotonic() + max(0, delay_seconds), next(self._counter), job.to_json()))
+
+    def dequeue(self) -> Optional[DispatchJob]:
+        with self._lock:
+            if not self._heap or self._heap[0][0] > time.monotonic():
+                return None
+            _, _, raw = heapq.heappop(self._heap)
+        return DispatchJob.from_json(raw)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._heap)
+
+
+class SqliteJobQueue(JobQueue):
+    """File-backed queue so jobs survive `func start` restarts during local testing."""
+
+    backend = "sqlite"
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                "visible_at REAL NOT NULL, "
+                "body TEXT NOT NULL)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=10)
+
+    def enqueue(self, job: DispatchJob, delay_seconds: float = 0) -> None:
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (visible_at, body) VALUES (?, ?)",
+                (time.time() + max(0, delay_seconds), job.to_json())
+            )
+
+    def dequeue(self) -> Optional[DispatchJob]:
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                "SELECT id, body FROM jobs WHERE visible_at <= ? ORDER BY visible_at, id LIMIT 1",
+                (time.time(),)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute("DELETE FROM jobs WHERE id = ?", (row[0],))
+        return DispatchJob.from_json(row[1])
+
+    def __len__(self) -> int:
+        with self._lock, self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+
+
+class AzureStorageJobQueue(JobQueue):
+    """
+    Azure Storage queue. Messages are base64-encoded to match the Functions
+    queue trigger's default messageEncoding.
+
+    Uses AzureWebJobsStorage (connection string, e.g. Azurite's
+    "UseDevelopmentStorage=true") or AzureWebJobsStorage__accountName with
+    the Function App's managed identity.
+    """
+
+    backend = "azure"
+
+    def __init__(self, queue_name: str):
+        try:
+            from azure.core.exceptions import ResourceExistsError
+            from azure.storage.queue import QueueClient, TextBase64EncodePolicy
+        except ImportError as e:
+            raise RuntimeError("azure-storage-queue is required for JOB_QUEUE_BACKEND=azure") from e
+
+        connection_string = os.getenv("AzureWebJobsStorage")
+        if connection_string:
+            self._client = QueueClient.from_connection_string(
+                connection_string, queue_name, message_encode_policy=TextBase64EncodePolicy()
+            )
+        else:
+            account_name = os.getenv("AzureWebJobsStorage__accountName")
+            if not account_name:
+                raise RuntimeError("AzureWebJobsStorage or AzureWebJobsStorage__accountName must be set for JOB_QUEUE_BACKEND=azure")
+            from azure.identity import DefaultAzureCredential
+            self._client = QueueClient(
+                f"https://{account_name}.queue.core.windows.net",
+                queue_name,
+                credential=DefaultAzureCredential(),
+                message_encode_policy=TextBase64EncodePolicy()
+            )
+
+        try:
+            self._client.create_queue()
+        except ResourceExistsError:
+            pass
+
+    def enqueue(self, job: DispatchJob, delay_seconds: float = 0) -> None:
+        self._client.send_message(job.to_json(), visibility_timeout=int(delay_seconds) or None)
+
+    def dequeue(self) -> Optional[DispatchJob]:
+        raise NotImplementedError("Azure Storage jobs are consumed by the spec_dispatch_worker queue trigger")
+
+
+def build_job(work_item_id: int, resource: dict, correlation_id: str, route: Optional[Route] = None) -> DispatchJob:
+    """
+    Build a compact DispatchJob from a validated hook payload's ``resource``.
+
+    Only the revision fields the pipeline needs are kept. If they still exceed
+    JOB_MAX_MESSAGE_BYTES (huge HTML descriptions), the revision is dropped and the
+    worker resolves it from ADO by revision number instead.
+    """
+    resource = resource or {}
+    revision = resource.get("revision") or {}
+    rev = revision.get("rev") or resource.get("rev")
+
+    compact = {"rev": rev}
+    revised_by = resource.get("revisedBy")
+    if isinstance(revised_by, dict) and revised_by.get("uniqueName"):
+        compact["revisedBy"] = {"uniqueName": revised_by["uniqueName"]}
+
+    fields = revision.get("fields") or {}
+    if fields:
+        compact["revision"] = {
+            "rev": rev,
+            "fields": {name: fields[name] for name in constants.JOB_RESOURCE_FIELDS if name in fields}
+        }
+
+    job = DispatchJob(
+        work_item_id=work_item_id,
+        correlation_id=correlation_id,
+        rev=rev,
+        resource=compact,
+        route=route.to_dict() if route else None
+    )
+    if len(job.to_json().encode()) > constants.JOB_MAX_MESSAGE_BYTES:
+        logger.info("job_payload_compacted", {"correlation_id": correlation_id, "work_item_id": work_item_id, "rev": rev, "effect": "worker fetches revision from ADO"})
+        compact.pop("revision", None)
+    return job
+
+
+_queue: Optional[JobQueue] = None
+_queue_lock = threading.Lock()
+
+
+def get_job_queue() -> JobQueue:
+    """Return the process-wide job queue selected by JOB_QUEUE_BACKEND."""
+    global _queue
+    if _queue is not None:
+        return _queue
+
+    with _queue_lock:
+        if _queue is None:
+            backend = os.getenv("JOB_QUEUE_BACKEND", constants.DEFAULT_JOB_QUEUE_BACKEND).lower()
+            if backend == "memory":
+                _queue = InMemoryJobQueue()
+            elif backend == "sqlite":
+                _queue = SqliteJobQueue(os.getenv("JOB_QUEUE_SQLITE_PATH", "spec-dispatch-jobs.sqlite3"))
+            elif backend == "azure":
+                _queue = AzureStorageJobQueue(constants.JOB_QUEUE_NAME)
+            else:
+                raise ValueError(f"Unknown JOB_QUEUE_BACKEND: {backend}")
+            logger.info("job_queue_initialized", {"backend": _queue.backend})
+        return _queue
+
+
+def reset_job_queue():
+    """Forget the cached queue (used by tests)."""
+    global _queue
+    with _queue_lock:
+        _queue = None
+
+
+def start_local_worker(
+    queue: JobQueue,
+    handler: Callable[[DispatchJob], None],
+    poll_interval: float = 0.5
+) -> threading.Thread:
+    """
+    Start a daemon thread that drains a local (memory/sqlite) queue.
+
+    Stands in for the Azure queue trigger when running under `func start`
+    without Azure Storage.
+    """
+    def _run():
+        while True:
+            if queue.drain(handler) == 0:
+                time.sleep(poll_interval)
+
+    thread = threading.Thread(target=_run, name=f"job-queue-{queue.backend}", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,221 @@
+"""
+Per-request stage timers, outbound-call counters and in-process latency histograms.
+
+Each request (spec_dispatch hook or queued job) gets a RequestMetrics held in
+a contextvar. Code on the hot path marks its stages and outbound calls:
+
+    with metrics.stage("ado_resolve"):
+        details = ado_client.resolve_work_item_details(...)
+
+    metrics.count("github_dispatch_attempts")
+
+Stages use the monotonic clock (time.perf_counter) and accumulate, so a stage
+entered several times (retries) reports its total. Outside a request all of
+these are no-ops. When the request finishes, one fixed ``request_summary``
+event is logged with the correlation_id, status, total and per-stage
+milliseconds, call counts and any fields added with annotate() (work item id,
+route, outcome), and every timing and count is added to the histograms
+(recent METRICS_WINDOW samples per series) that snapshot() - and the
+``metrics`` HTTP endpoint - summarise as p50/p95/p99.
+
+Thread pools don't inherit contextvars; submit work with
+``executor.submit(metrics.bind(fn), ...)`` to count its calls against the request.
+"""
+import contextvars
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional
+
+try:
+    from . import app_logging, constants
+    from .app_logging import StructuredLogger
+except ImportError:
+    import app_logging
+    import constants
+    from app_logging import StructuredLogger
+
+logger = StructuredLogger(__name__)
+
+
+class RequestMetrics:
+    """Stage durations (ms) and call counters for one request."""
+
+    __slots__ = ("name", "correlation_id", "status", "started", "stages", "counters", "fields", "_lock")
+
+    def __init__(self, name: str, correlation_id: str):
+        self.name = name
+        self.correlation_id = correlation_id
+        self.status = None
+        self.started = time.perf_counter()
+        self.stages: Dict[str, float] = {}
+        self.counters: Dict[str, int] = {}
+        self.fields: Dict[str, object] = {}
+        self._lock = threading.Lock()  # pool threads bound to the request add concurrently
+
+    def add_stage(self, name: str, elapsed_ms: float) -> None:
+        with self._lock:
+            self.stages[name] = self.stages.get(name, 0.0) + elapsed_ms
+
+    def add_count(self, name: str, value: int = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def annotate(self, **fields) -> None:
+        with self._lock:
+            self.fields.update(fields)
+
+    def elapsed_ms(self) -> int:
+        return int((time.perf_counter() - self.started) * 1000)
+
+    def record(self) -> dict:
+        with self._lock:
+            return {
+                "request": self.name,
+                "correlation_id": self.correlation_id,
+                "status": self.status,
+                "total_ms": round((time.perf_counter() - self.started) * 1000, 2),
+                "stages_ms": {name: round(ms, 2) for name, ms in self.stages.items()},
+                "calls": dict(self.counters),
+                **self.fields,
+            }
+
+
+class Histogram:
+    """Latency samples over a sliding window, with lifetime count and sum."""
+
+    def __init__(self, window: int):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value: float) -> None:
+        with self._lock:
+            self._samples.append(value)
+            self.count += 1
+            self.total += value
+
+    def summary(self) -> dict:
+        with self._lock:
+            samples = sorted(self._samples)
+            count, total = self.count, self.total
+        if not samples:
+            return {"count": count}
+
+        def percentile(p: float) -> float:
+            # Nearest-rank over the window
+            return round(samples[min(len(samples) - 1, max(0, int(round(p / 100 * len(samples))) - 1))], 2)
+
+        return {
+            "count": count,
+            "mean": round(total / count, 2),
+            "p50": percentile(50),
+            "p95": percentile(95),
+            "p99": percentile(99),
+            "max": round(samples[-1], 2),
+        }
+
+
+_current: contextvars.ContextVar[Optional[RequestMetrics]] = contextvars.ContextVar("request_metrics", default=None)
+_histograms: Dict[str, Histogram] = {}
+_histograms_lock = threading.Lock()
+
+
+def _histogram(name: str) -> Histogram:
+    histogram = _histograms.get(name)
+    if histogram is None:
+        with _histograms_lock:
+            histogram = _histograms.setdefault(name, Histogram(constants.METRICS_WINDOW))
+    return histogram
+
+
+def current() -> Optional[RequestMetrics]:
+    """The RequestMetrics of the request running in this context, if any."""
+    return _current.get()
+
+
+@contextmanager
+def track_request(name: str, correlation_id: str):
+    """
+    Measure one request; emits its request_summary and feeds the histograms on exit.
+
+    Also binds correlation_id to every StructuredLogger event logged inside.
+
+    Usage:
+        with metrics.track_request("spec_dispatch", correlation_id) as request_metrics:
+            response = handle(req)
+            request_metrics.status = response.status_code
+    """
+    request_metrics = RequestMetrics(name, correlation_id)
+    token = _current.set(request_metrics)
+    log_token = app_logging.bind_correlation_id(correlation_id)
+    try:
+        yield request_metrics
+    except BaseException:
+        request_metrics.status = "exception"
+        raise
+    finally:
+        _current.reset(token)
+        app_logging.unbind_correlation_id(log_token)
+        record = request_metrics.record()
+        _histogram(f"{name}.total_ms").observe(record["total_ms"])
+        for stage_name, elapsed_ms in record["stages_ms"].items():
+            _histogram(f"{name}.stage.{stage_name}_ms").observe(elapsed_ms)
+        for counter_name, value in record["calls"].items():
+            _histogram(f"{name}.calls.{counter_name}").observe(value)
+        logger.info("request_summary", record)
+
+
+@contextmanager
+def stage(name: str):
+    """Time a block of the current request on the monotonic clock."""
+    request_metrics = _current.get()
+    if request_metrics is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        request_metrics.add_stage(name, (time.perf_counter() - started) * 1000)
+
+
+def count(name: str, value: int = 1) -> None:
+    """Add to a call counter of the current request."""
+    request_metrics = _current.get()
+    if request_metrics is not None:
+        request_metrics.add_count(name, value)
+
+
+def annotate(**fields) -> None:
+    """Add fields to the current request's summary event."""
+    request_metrics = _current.get()
+    if request_metrics is not None:
+        request_metrics.annotate(**fields)
+
+
+def bind(fn: Callable) -> Callable:
+    """Wrap fn to run in a copy of the caller's context (for thread pool workers)."""
+    context = contextvars.copy_context()
+    if context.get(_current) is None:
+        return fn
+
+    def run(*args, **kwargs):
+        # One copy per call - a Context can't be entered by two threads at once
+        return context.copy().run(fn, *args, **kwargs)
+    return run
+
+
+def snapshot() -> Dict[str, dict]:
+    """p50/p95/p99 summaries of every series recorded in this process."""
+    with _histograms_lock:
+        histograms = dict(_histograms)
+    return {name: histogram.summary() for name, histogram in sorted(histograms.items())}
+
+
+def reset_metrics() -> None:
+    """Drop all histograms (used by tests)."""
+    with _histograms_lock:
+        _histograms.clear()
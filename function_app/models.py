@@ -1,7 +1,9 @@
 """
 Data models for function payloads.
 """
-from dataclasses import dataclass
+import json
+import time
+from dataclasses import asdict, dataclass, field
 from typing import Optional
 
 
@@ -49,3 +51,52 @@ class WorkItemEvent:
             board_column=fields.get("System.BoardColumn"),
             title=fields.get("System.Title")
         )
+
+
+@dataclass
+class WorkItemDetails:
+    """
+    Work item fields needed for dispatch, resolved from the hook payload or ADO.
+    
+    ``source`` records which place answered the request:
+        - "payload": resource.revision in the Service Hook payload
+        - "ado_revision": one ADO call for the revision number from the payload
+        - "ado_work_item": one ADO call for the current work item
+        - "defaults": nothing available, title falls back to "Work Item #<id>"
+    """
+    work_item_id: int
+    title: str
+    description: str = ""
+    changed_by: Optional[str] = None
+    rev: Optional[int] = None
+    source: str = "defaults"
+
+
+@dataclass
+class DispatchJob:
+    """
+    Compact job enqueued by the HTTP trigger in async mode.
+    
+    ``route`` is the rendered routing.Route (as a dict) chosen by the HTTP trigger,
+    or None for the GITHUB_* defaults.
+    
+    ``resource`` is a trimmed copy of the payload's ``resource`` (rev, revisedBy
+    and the revision fields needed for dispatch) so the worker can usually skip
+    the ADO fetch. It is dropped when it would push the message past the queue's
+    size limit, in which case the worker resolves the revision from ADO by ``rev``.
+    """
+    work_item_id: int
+    correlation_id: str
+    rev: Optional[int] = None
+    resource: dict = field(default_factory=dict)
+    attempt: int = 0
+    route: Optional[dict] = None
+    enqueued_at: float = field(default_factory=time.time)
+    
+    def to_json(self) -> str:
+        return json.dumps(asdict(self), separators=(",", ":"))
+    
+    @classmethod
+    def from_json(cls, raw: str) -> "DispatchJob":
+        data = json.loads(raw)
+        return cls(**{k: v for k, v in data.items() if k in cls.__dataclass_fields__})
@@ -0,0 +1,242 @@
+"""
+Enrichment and dispatch pipeline shared by the HTTP and queue triggers.
+"""
+import os
+import time
+from typing import Optional
+
+try:
+    from . import ado_client, artifact_store, constants, context_builder, dedup, dispatch, enrichment, job_queue, metrics, routing
+    from .app_logging import StructuredLogger
+    from .models import DispatchJob, WorkItemDetails
+except ImportError:
+    import ado_client
+    import artifact_store
+    import constants
+    import context_builder
+    import dedup
+    import dispatch
+    import enrichment
+    import job_queue
+    import metrics
+    import routing
+    from app_logging import StructuredLogger
+    from models import DispatchJob, WorkItemDetails
+
+logger = StructuredLogger(__name__)
+
+
+def _queue_retry_scheduler(work_item_id: int, resource: dict, correlation_id: str, route: Optional[routing.Route] = None):
+    """Build a dispatch retry_scheduler that re-enqueues the work item with a visibility delay."""
+    def schedule(delay_seconds: float, next_attempt: int):
+        job = job_queue.build_job(work_item_id, resource, correlation_id, route=route)
+        job.attempt = next_attempt
+        job_queue.get_job_queue().enqueue(job, delay_seconds=delay_seconds)
+    return schedule
+
+
+def _handoff_context(context: context_builder.FeatureContext, correlation_id: str) -> Optional[str]:
+    """
+    Store the full context in the artifact store when it is too big to dispatch inline.
+
+    Returns:
+        sha256 digest to dispatch as ``context_sha256``, or None to dispatch the
+        budgeted text inline (store disabled, context small, or upload failed)
+    """
+    full_bytes = len(context.full_text.encode("utf-8"))
+    inline_max = int(os.getenv("ARTIFACT_INLINE_MAX_BYTES", constants.ARTIFACT_INLINE_MAX_BYTES))
+    if not context.truncated and full_bytes <= inline_max:
+        return None
+
+    try:
+        store = artifact_store.get_artifact_store()
+        if store is None:
+            return None
+        digest = store.put(context.full_text)
+    except Exception as e:
+        logger.warning("artifact_upload_failed", {"error": str(e), "fallback": "inline"})
+        return None
+
+    logger.info("artifact_stored", {"digest": digest, "bytes": full_bytes})
+    return digest
+
+
+def process_work_item(
+    work_item_id: int,
+    resource: dict,
+    correlation_id: str,
+    attempt: int = 0,
+    defer_retries: Optional[bool] = None,
+    route: Optional[routing.Route] = None
+) -> tuple[bool, str]:
+    """
+    Resolve work item details, enrich with closed Issue context and dispatch the workflow.
+    
+    Args:
+        work_item_id: Azure DevOps work item ID (already validated)
+        resource: ``resource`` object from the Service Hook payload, or the
+            compact subset carried by a queued DispatchJob
+        correlation_id: Request correlation ID for log lines
+        attempt: Zero-based dispatch attempt (non-zero for deferred retries)
+        defer_retries: Re-enqueue retryable dispatch failures on the job queue
+            instead of sleeping (default: DISPATCH_RETRY_MODE == "deferred")
+        route: Rendered routing.Route from routing.resolve_route (None = GITHUB_* defaults)
+    
+    Returns:
+        Tuple of (success, message) from dispatch.dispatch_workflow; duplicate
+        hooks return (True, "skipped: <reason>") without dispatching
+    """
+    if defer_retries is None:
+        defer_retries = os.getenv("DISPATCH_RETRY_MODE", constants.DEFAULT_DISPATCH_RETRY_MODE).lower() == "deferred"
+    
+    # Drop duplicate deliveries and burst follow-ups before any ADO/GitHub calls.
+    # Deferred retries (attempt > 0) already hold the claim from their first attempt.
+    rev = dedup.revision_of(resource)
+    deduplicator = dedup.get_deduplicator() if dedup.dedup_enabled() and attempt == 0 else None
+    if deduplicator:
+        with metrics.stage("dedup"):
+            should_dispatch, reason = deduplicator.check(work_item_id, rev)
+        if not should_dispatch:
+            logger.info("dispatch_deduplicated", lambda: {"work_item_id": work_item_id, "rev": rev, "reason": reason, "stats": deduplicator.stats()})
+            return True, f"{dedup.SKIPPED}: {reason}"
+    
+    try:
+        success, message = _resolve_and_dispatch(work_item_id, resource, correlation_id, attempt, defer_retries, route)
+    except Exception:
+        # Unexpected failure (e.g. the deferred retry enqueue) - don't hold the
+        # claim for the whole TTL, or ADO's redeliveries would be dropped
+        _release_claim(deduplicator, work_item_id, rev, attempt)
+        raise
+    
+    if not success and not message.startswith(dispatch.RETRY_SCHEDULED):
+        # Let ADO's redelivery of this hook dispatch again
+        _release_claim(deduplicator, work_item_id, rev, attempt)
+    
+    return success, message
+
+
+def _release_claim(deduplicator: Optional[dedup.Deduplicator], work_item_id: int, rev: Optional[int], attempt: int) -> None:
+    """Release the dedup claim for a failed dispatch; a deferred retry releases the claim its first attempt made."""
+    if deduplicator is None and attempt > 0 and dedup.dedup_enabled():
+        deduplicator = dedup.get_deduplicator()
+    if deduplicator:
+        deduplicator.release(work_item_id, rev)
+
+
+def _resolve_and_dispatch(
+    work_item_id: int,
+    resource: dict,
+    correlation_id: str,
+    attempt: int,
+    defer_retries: bool,
+    route: Optional[routing.Route]
+) -> tuple[bool, str]:
+    """Resolve, enrich and dispatch once the dedup claim is held (see process_work_item)."""
+    # Resolve title/description/ChangedBy from the payload when authoritative,
+    # otherwise with a single ADO call (revision-aware when the payload has rev)
+    try:
+        with metrics.stage("ado_resolve"):
+            details = ado_client.resolve_work_item_details(work_item_id, resource)
+    except Exception as e:
+        # ADO fetch failed (likely expired PAT or network issue) - log but continue with defaults
+        logger.warning("work_item_resolution_failed", {"work_item_id": work_item_id, "error": str(e), "fallback": "defaults"})
+        details = WorkItemDetails(work_item_id=work_item_id, title=f"Work Item #{work_item_id}")
+
+    description = details.description
+    title = details.title
+    changed_by_user_id = details.changed_by
+    metrics.annotate(rev=details.rev, details_source=details.source)
+    logger.info("work_item_resolved", lambda: {
+        "work_item_id": work_item_id,
+        "source": details.source,
+        "rev": details.rev,
+        "has_description": bool(description),
+        "title": title[:50],
+        "changed_by_user_id": changed_by_user_id
+    })
+
+    # Use Description if available, fallback to Title
+    feature_description = description if description else title
+
+    # Fetch closed child Issues and their comments to enrich context
+    # (comments are cached per Issue revision - only new/changed Issues hit ADO)
+    closed_issues = []
+    try:
+        with metrics.stage("enrichment"):
+            closed_issues = enrichment.get_closed_issues_with_comments(work_item_id, correlation_id)
+    except Exception as e:
+        # Graceful fallback: if fetching Issues/comments fails, continue with base context
+        logger.warning("closed_issues_fetch_failed", {"work_item_id": work_item_id, "error": str(e), "fallback": "base_description"})
+    metrics.annotate(closed_issues=len(closed_issues))
+
+    # Assemble description + closed Issue context within the dispatch input budget
+    with metrics.stage("context_build"):
+        context = context_builder.build_feature_context(feature_description, closed_issues)
+    feature_description = context.text
+    if closed_issues:
+        logger.info("context_enriched", {
+            "included_issues": context.included_issues,
+            "truncated_issues": context.truncated_issues,
+            "omitted_issues": context.omitted_issues,
+            "bytes": context.size_bytes
+        })
+        # Preview of the enriched description for debugging (built only at DEBUG)
+        logger.debug("context_preview", lambda: {"preview": feature_description[:500]})
+    # Too big to dispatch inline - hand the full text off by digest and dispatch a summary
+    # (only to workflows that declare context_sha256 - GitHub rejects undeclared inputs)
+    context_sha256 = None
+    if routing.accepts_context_handoff(route):
+        with metrics.stage("artifact_handoff"):
+            context_sha256 = _handoff_context(context, correlation_id)
+    if context_sha256:
+        feature_description = context_builder.build_summary(description if description else title, context)
+    elif context.truncated:
+        logger.warning("context_truncated", lambda: {"bytes": context.size_bytes, "full_bytes": len(context.full_text.encode("utf-8"))})
+
+    # Dispatch workflow to the routed target (GITHUB_* environment for whatever the route leaves unset)
+    metrics.annotate(target=routing.describe(route))
+    with metrics.stage("github_dispatch"):
+        success, message = dispatch.dispatch_workflow(
+            work_item_id=work_item_id,
+            description_placeholder=feature_description,
+            changed_by_user_id=changed_by_user_id,
+            retry_scheduler=_queue_retry_scheduler(work_item_id, resource, correlation_id, route) if defer_retries else None,
+            attempt=attempt,
+            context_sha256=context_sha256,
+            route=route
+        )
+    return success, message
+
+
+def process_job(job: DispatchJob) -> tuple[bool, str]:
+    """
+    Run the pipeline for a job dequeued in async mode.
+    
+    Args:
+        job: DispatchJob built by job_queue.build_job
+    
+    Returns:
+        Tuple of (success, message)
+    """
+    queued_ms = int((time.time() - job.enqueued_at) * 1000)
+    metrics.annotate(work_item_id=job.work_item_id, rev=job.rev, attempt=job.attempt, queued_ms=queued_ms)
+    
+    # A newer revision arrived while this job waited out the coalescing delay - its job dispatches instead
+    if job.attempt == 0 and dedup.dedup_enabled() and dedup.get_deduplicator().is_superseded(job.work_item_id, job.rev):
+        metrics.annotate(outcome="superseded")
+        return True, f"{dedup.SKIPPED}: superseded by a newer revision"
+    
+    # Workers never sleep between attempts - retries go back on the queue with a delay
+    success, message = process_work_item(
+        job.work_item_id, job.resource, job.correlation_id, attempt=job.attempt, defer_retries=True,
+        route=routing.Route.from_dict(job.route) if job.route else None
+    )
+    
+    if success:
+        metrics.annotate(outcome="skipped" if message.startswith(dedup.SKIPPED) else "dispatched", reason=message)
+    elif message.startswith(dispatch.RETRY_SCHEDULED):
+        metrics.annotate(outcome="retry_scheduled", reason=message)
+    else:
+        metrics.annotate(outcome="failed", reason=message)
+        logger.error("job_failed", {"work_item_id": job.work_item_id, "error": message})
+    return success, message
@@ -0,0 +1,144 @@
+"""
+Early-reject fast path for Service Hook deliveries, run before the body is parsed.
+
+Most deliveries are noise - other work item types, other columns, cards
+moved to Done. A full json parse of each one allocates the whole revision,
+HTML description included, only for validation to throw it away. quick_reject
+looks at the request headers and a bounded window of the raw body instead:
+
+    - subscription: HOOK_SUBSCRIPTION_IDS allow-list, checked against the
+      HOOK_SUBSCRIPTION_HEADER header (a custom header set on the ADO hook) or
+      the top-level "subscriptionId"
+    - eventType, "System.WorkItemType", "System.BoardColumn" and
+      "System.BoardColumnDone" values, checked against the union of the
+      compiled validation rules
+
+A check only rejects on a definite mismatch. Keys missing from the scanned
+window, escaped string values and anything ambiguous fall through to the full
+parse and validate_event, so a delivery that passes here is validated exactly
+as before. Unquoted patterns can't match inside JSON strings (their quotes are
+escaped), and changed-field entries in resource.fields are objects
+({"oldValue", "newValue"}), so only the revision's current values are read.
+
+JSON_BACKEND selects the parser for deliveries that do get parsed:
+    - auto: orjson when installed, else the json module (default)
+    - orjson: require orjson
+    - json: standard library only
+"""
+import json
+import os
+import re
+from typing import Callable, Mapping, Optional
+
+try:
+    from . import constants, validation
+    from .app_logging import StructuredLogger
+except ImportError:
+    import constants
+    import validation
+    from app_logging import StructuredLogger
+
+logger = StructuredLogger(__name__)
+
+_EVENT_TYPE_RE = re.compile(rb'"eventType"\s*:\s*"([^"\\]*)"')
+_SUBSCRIPTION_RE = re.compile(rb'"subscriptionId"\s*:\s*"([^"\\]*)"')
+_WORK_ITEM_TYPE_RE = re.compile(rb'"System\.WorkItemType"\s*:\s*"([^"\\]*)"')
+_BOARD_COLUMN_RE = re.compile(rb'"System\.BoardColumn"\s*:\s*"([^"\\]*)"')
+_BOARD_COLUMN_DONE_RE = re.compile(rb'"System\.BoardColumnDone"\s*:\s*(true|false)')
+
+_loads: Optional[Callable] = None
+_backend: Optional[str] = None
+
+
+def _scan_values(pattern: re.Pattern, raw: bytes, endpos: int) -> list[str]:
+    return [value.decode("utf-8", "replace") for value in pattern.findall(raw, 0, endpos)]
+
+
+def _allowed_subscriptions() -> frozenset:
+    return frozenset(part.strip().lower() for part in os.getenv("HOOK_SUBSCRIPTION_IDS", "").split(",") if part.strip())
+
+
+def quick_reject(raw: bytes, headers: Optional[Mapping[str, str]] = None) -> Optional[str]:
+    """
+    Decide from headers and a bounded scan of the raw body whether a delivery can be dropped.
+
+    Args:
+        raw: Request body bytes
+        headers: Request headers (case-insensitive mapping, as on func.HttpRequest)
+
+    Returns:
+        Rejection reason, or None if the delivery needs the full parse
+    """
+    if not raw:
+        return None
+    endpos = min(len(raw), int(os.getenv("PREFILTER_SCAN_BYTES", constants.PREFILTER_SCAN_BYTES)))
+
+    allowed = _allowed_subscriptions()
+    if allowed:
+        header_name = os.getenv("HOOK_SUBSCRIPTION_HEADER", constants.HOOK_SUBSCRIPTION_HEADER)
+        subscription = (headers or {}).get(header_name) if header_name else None
+        if subscription is None:
+            match = _SUBSCRIPTION_RE.search(raw, 0, endpos)
+            subscription = match.group(1).decode("utf-8", "replace") if match else None
+        if subscription is not None and subscription.strip().lower() not in allowed:
+            return f"Unknown subscription: {subscription}"
+
+    match = _EVENT_TYPE_RE.search(raw, 0, endpos)
+    if match and match.group(1) != validation.EVENT_TYPE.encode():
+        return f"Invalid event type: {match.group(1).decode('utf-8', 'replace')}"
+
+    engine = validation.get_rule_engine()
+
+    work_item_types = _scan_values(_WORK_ITEM_TYPE_RE, raw, endpos)
+    if work_item_types and not engine.work_item_types.intersection(work_item_types):
+        return f"Invalid work item type: {work_item_types[0]}"
+
+    columns = _scan_values(_BOARD_COLUMN_RE, raw, endpos)
+    if columns and not engine.columns.intersection(columns):
+        return f"Column mismatch: '{columns[0]}'"
+
+    done_flags = _BOARD_COLUMN_DONE_RE.findall(raw, 0, endpos)
+    if done_flags and all(flag == b"true" for flag in done_flags):
+        return "Column state is 'Done'"
+
+    return None
+
+
+def _resolve_backend() -> tuple[str, Callable]:
+    backend = os.getenv("JSON_BACKEND", constants.DEFAULT_JSON_BACKEND).lower()
+    if backend in ("auto", "orjson"):
+        try:
+            import orjson
+            return "orjson", orjson.loads
+        except ImportError as e:
+            if backend == "orjson":
+                raise RuntimeError("orjson is required for JSON_BACKEND=orjson") from e
+    return "json", json.loads
+
+
+def json_backend() -> str:
+    """Name of the parser loads() uses ("orjson" or "json")."""
+    global _loads, _backend
+    if _loads is None:
+        _backend, _loads = _resolve_backend()
+        logger.info("json_backend_selected", {"backend": _backend})
+    return _backend
+
+
+def loads(raw):
+    """
+    Parse a request body with the configured backend.
+
+    Raises:
+        ValueError: On invalid JSON (orjson.JSONDecodeError is a ValueError too)
+    """
+    if _loads is None:
+        json_backend()
+    return _loads(raw)
+
+
+def reset_json_backend():
+    """Forget the resolved backend so the next call re-reads JSON_BACKEND (used by tests)."""
+    global _loads, _backend
+    _loads = None
+    _backend = None
@@ -0,0 +1,125 @@
+"""
+Retry policy for outbound GitHub calls.
+
+Jittered exponential backoff driven by constants.RETRY_BACKOFF_DELAYS /
+MAX_RETRY_ATTEMPTS, overridden by server hints (Retry-After,
+X-RateLimit-Reset) when the response carries them.
+"""
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Mapping, Optional, Sequence
+
+try:
+    from . import constants
+except ImportError:
+    import constants
+
+
+def retry_after_delay(headers: Optional[Mapping[str, str]], now: Optional[float] = None) -> Optional[float]:
+    """
+    Extract the server-requested wait from response headers.
+
+    Args:
+        headers: Response headers (case-insensitive mapping from requests)
+        now: Current epoch seconds (for tests)
+
+    Returns:
+        Seconds to wait, or None when the response carries no usable hint
+
+    Honors:
+        - Retry-After: delay-seconds or HTTP-date (secondary rate limits, 429/503)
+        - X-RateLimit-Reset: epoch seconds, only when X-RateLimit-Remaining is 0
+    """
+    if not headers or not hasattr(headers, "get"):
+        return None
+    now = time.time() if now is None else now
+
+    retry_after = headers.get("Retry-After")
+    if retry_after:
+        retry_after = str(retry_after).strip()
+        if retry_after.isdigit():
+            return float(retry_after)
+        try:
+            return max(0.0, parsedate_to_datetime(retry_after).timestamp() - now)
+        except (TypeError, ValueError):
+            pass
+
+    if str(headers.get("X-RateLimit-Remaining", "")).strip() == "0":
+        reset = headers.get("X-RateLimit-Reset")
+        try:
+            return max(0.0, float(reset) - now)
+        except (TypeError, ValueError):
+            pass
+
+    return None
+
+
+def is_rate_limited(status_code: int, headers: Optional[Mapping[str, str]]) -> bool:
+    """
+    True when a 403/429 is GitHub throttling rather than a permission error.
+
+    GitHub signals primary limits with X-RateLimit-Remaining: 0 and secondary
+    limits with Retry-After; both are retryable, a plain 403 is not.
+    """
+    if status_code == 429:
+        return True
+    if status_code != 403 or not headers or not hasattr(headers, "get"):
+        return False
+    return bool(headers.get("Retry-After")) or str(headers.get("X-RateLimit-Remaining", "")).strip() == "0"
+
+
+class RetryPolicy:
+    """
+    Jittered backoff with server-hint overrides.
+
+    Usage:
+        policy = RetryPolicy()
+        if policy.can_retry(attempt):
+            delay = policy.delay_for(attempt, response.headers)
+    """
+
+    def __init__(
+        self,
+        max_attempts: Optional[int] = None,
+        backoff_delays: Optional[Sequence[float]] = None,
+        jitter_ratio: Optional[float] = None,
+        max_delay: Optional[float] = None,
+        rng: Optional[random.Random] = None
+    ):
+        self.max_attempts = max_attempts if max_attempts is not None else constants.MAX_RETRY_ATTEMPTS
+        self.backoff_delays = list(backoff_delays if backoff_delays is not None else constants.RETRY_BACKOFF_DELAYS)
+        self.jitter_ratio = jitter_ratio if jitter_ratio is not None else constants.RETRY_JITTER_RATIO
+        self.max_delay = max_delay if max_delay is not None else constants.RETRY_MAX_DELAY_SECONDS
+        self._rng = rng or random.Random()
+
+    def can_retry(self, attempt: int) -> bool:
+        """True if another attempt is allowed after zero-based ``attempt``."""
+        return attempt + 1 < self.max_attempts
+
+    def backoff_delay(self, attempt: int) -> float:
+        """
+        Jittered backoff for zero-based ``attempt``.
+
+        Uses RETRY_BACKOFF_DELAYS[attempt]; past the end of the table the last
+        delay keeps doubling. Capped at max_delay.
+        """
+        if not self.backoff_delays:
+            return 0.0
+        if attempt < len(self.backoff_delays):
+            base = float(self.backoff_delays[attempt])
+        else:
+            base = float(self.backoff_delays[-1]) * (2 ** (attempt - len(self.backoff_delays) + 1))
+
+        jitter = self._rng.uniform(1 - self.jitter_ratio, 1 + self.jitter_ratio) if self.jitter_ratio else 1.0
+        return min(base * jitter, self.max_delay)
+
+    def delay_for(self, attempt: int, headers: Optional[Mapping[str, str]] = None) -> float:
+        """
+        Delay before the next attempt: the server hint when present (never
+        shorter than asked, not capped), otherwise jittered backoff.
+        """
+        server_delay = retry_after_delay(headers)
+        if server_delay is not None:
+            return server_delay
+        return self.backoff_delay(attempt)
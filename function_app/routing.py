@@ -0,0 +1,280 @@
+"""
+Multi-target routing: map a validated work item event to the GitHub repo and
+workflow that should handle it.
+
+One deployment can serve several ADO projects and boards. ROUTING_TABLE (JSON
+string) or ROUTING_TABLE_PATH (JSON file) lists the routes; it is loaded once
+per instance:
+
+    [
+        {"name": "payments", "match": {"project": "Contoso", "area_path": "Contoso\\\\Payments",
+                                       "work_item_type": "Feature", "column": "Specification"},
+         "repo": "contoso/payments", "workflow": "spec-kit-specify.yml", "ref": "main",
+         "inputs": {"board": "{area_path}"}},
+        {"name": "contoso-default", "match": {"project": "Contoso"}, "repo": "contoso/specs"}
+    ]
+
+Omitted match keys are wildcards. ``area_path`` matches the path and all of its
+children. ``owner`` / ``repo`` / ``workflow`` / ``ref`` left out fall back to
+GITHUB_OWNER / GITHUB_REPO / GITHUB_WORKFLOW_FILENAME / GITHUB_WORKFLOW_REF.
+``inputs`` are extra workflow_dispatch inputs; values may use {work_item_id},
+{project}, {area_path}, {work_item_type}, {column} and {route}. GitHub rejects
+(422) inputs a workflow does not declare, so the target workflow must declare
+every route input as well as ado_changed_by_user_id (and context_sha256 when
+it takes the handoff). Input names are checked when the table loads and may
+not shadow the inputs dispatch sets itself (RESERVED_INPUTS).
+``context_handoff`` (true/false) overrides CONTEXT_HANDOFF_WORKFLOWS, which
+lists the workflows that declare the ``context_sha256`` input; other workflows
+always get the budgeted context inline.
+
+Lookup is a handful of dict probes, independent of the number of routes: the
+table is indexed by (project, work item type, column, area path) with "*" for
+wildcards, and probed from the deepest area path up, most exact keys first.
+Among routes with the same key the first one listed wins.
+
+Without a matching route the validation rule's ``workflow`` (VALIDATION_RULES)
+still selects the workflow on the default repo.
+"""
+import itertools
+import json
+import os
+import re
+import threading
+from dataclasses import asdict, dataclass, field, replace
+from typing import Dict, List, Optional, Tuple
+
+try:
+    from .app_logging import StructuredLogger
+    from .config import get_config
+except ImportError:
+    from app_logging import StructuredLogger
+    from config import get_config
+
+logger = StructuredLogger(__name__)
+
+WILDCARD = "*"
+
+# Inputs set by dispatch.dispatch_workflow - route inputs may not override them
+RESERVED_INPUTS = frozenset({"feature_description", "create_branch", "work_item_id", "ado_changed_by_user_id", "context_sha256"})
+_INPUT_NAME = re.compile(r"^[A-Za-z_][A-Za-z0-9_-]*$")
+_MATCH_KEYS = ("project", "work_item_type", "column")
+
+# (project, work_item_type, column) wildcard combinations, most exact first
+_PROBE_MASKS = sorted(itertools.product((True, False), repeat=len(_MATCH_KEYS)), key=lambda mask: -sum(mask))
+
+
+@dataclass(frozen=True)
+class Route:
+    """Dispatch target; None fields fall back to the GITHUB_* environment defaults."""
+    name: str
+    owner: Optional[str] = None
+    repo: Optional[str] = None
+    workflow: Optional[str] = None
+    ref: Optional[str] = None
+    inputs: Dict[str, str] = field(default_factory=dict)
+    context_handoff: Optional[bool] = None  # None = CONTEXT_HANDOFF_WORKFLOWS decides
+
+    def render(self, work_item_id: int, fields: dict) -> "Route":
+        """Return a copy with the inputs template filled in from the work item fields."""
+        if not self.inputs:
+            return self
+        values = _SafeFormat(
+            work_item_id=work_item_id,
+            project=fields.get("System.TeamProject", ""),
+            area_path=fields.get("System.AreaPath", ""),
+            work_item_type=fields.get("System.WorkItemType", ""),
+            column=fields.get("System.BoardColumn", ""),
+            route=self.name
+        )
+        return replace(self, inputs={key: str(value).format_map(values) for key, value in self.inputs.items()})
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Route":
+        return cls(**{k: v for k, v in data.items() if k in cls.__dataclass_fields__})
+
+
+class _SafeFormat(dict):
+    """format_map values that leave unknown {placeholders} as they are."""
+
+    def __missing__(self, key):
+        return "{" + key + "}"
+
+
+def _norm(value: Optional[str]) -> str:
+    return (value or "").strip().lower()
+
+
+def _column_base(column: str) -> str:
+    return column.split(" – ")[0].strip()
+
+
+def _area_prefixes(area_path: str) -> List[str]:
+    """Lowercased area path and its ancestors, deepest first, then the wildcard."""
+    parts = [part for part in _norm(area_path).split("\\") if part]
+    return ["\\".join(parts[:depth]) for depth in range(len(parts), 0, -1)] + [WILDCARD]
+
+
+def compile_route(spec: dict, index: int = 0) -> Tuple[tuple, Route]:
+    """
+    Build the index key and Route for one ROUTING_TABLE entry.
+
+    Raises:
+        ValueError: If the entry's repo is not "owner/name", or an input name is
+            not a valid workflow_dispatch input or is one of RESERVED_INPUTS
+    """
+    name = spec.get("name") or f"route-{index}"
+    match = spec.get("match") or {}
+    owner, repo = spec.get("owner"), spec.get("repo")
+    if repo and "/" in repo:
+        owner, _, repo = repo.partition("/")
+        if not owner or not repo or "/" in repo:
+            raise ValueError(f"Route '{name}' repo must be 'owner/name', got '{spec.get('repo')}'")
+    inputs = {str(k): str(v) for k, v in (spec.get("inputs") or {}).items()}
+    for input_name in inputs:
+        if not _INPUT_NAME.match(input_name):
+            raise ValueError(f"Route '{name}' input '{input_name}' is not a valid workflow_dispatch input name")
+        if input_name in RESERVED_INPUTS:
+            raise ValueError(f"Route '{name}' input '{input_name}' is set by dispatch and cannot be overridden")
+
+    key = (
+        _norm(match.get("project")) or WILDCARD,
+        _norm(match.get("work_item_type")) or WILDCARD,
+        _norm(_column_base(match.get("column") or "")) or WILDCARD,
+        _area_prefixes(match.get("area_path") or "")[0],
+    )
+    route = Route(
+        name=name,
+        owner=owner,
+        repo=repo,
+        workflow=spec.get("workflow"),
+        ref=spec.get("ref"),
+        inputs=inputs,
+        context_handoff=spec.get("context_handoff")
+    )
+    return key, route
+
+
+class RoutingTable:
+    """
+    Routes indexed by (project, work item type, column, area path).
+
+    Usage:
+        route = get_routing_table().lookup(fields)
+    """
+
+    def __init__(self, entries: Optional[List[dict]] = None):
+        self._index: Dict[tuple, Route] = {}
+        self.routes: List[Route] = []
+        for index, spec in enumerate(entries or []):
+            key, route = compile_route(spec, index)
+            self.routes.append(route)
+            if key in self._index:
+                logger.warning("route_shadowed", {"route": route.name, "shadowed_by": self._index[key].name})
+                continue
+            self._index[key] = route
+
+    def __len__(self) -> int:
+        return len(self.routes)
+
+    def lookup(self, fields: dict) -> Optional[Route]:
+        """Most specific route for the work item's revision fields, or None."""
+        if not self._index:
+            return None
+        values = (
+            _norm(fields.get("System.TeamProject")),
+            _norm(fields.get("System.WorkItemType")),
+            _norm(_column_base(fields.get("System.BoardColumn") or "")),
+        )
+        for area in _area_prefixes(fields.get("System.AreaPath") or ""):
+            for mask in _PROBE_MASKS:
+                key = tuple(value if exact else WILDCARD for value, exact in zip(values, mask)) + (area,)
+                route = self._index.get(key)
+                if route is not None:
+                    return route
+        return None
+
+
+def load_routing_entries() -> List[dict]:
+    """Read ROUTING_TABLE (JSON) or ROUTING_TABLE_PATH (JSON file); empty when neither is set."""
+    raw = os.getenv("ROUTING_TABLE", "").strip()
+    path = os.getenv("ROUTING_TABLE_PATH", "").strip()
+    if not raw and path:
+        with open(path, encoding="utf-8") as f:
+            raw = f.read()
+    if not raw:
+        return []
+    entries = json.loads(raw)
+    return [entries] if isinstance(entries, dict) else entries
+
+
+_table: Optional[RoutingTable] = None
+_table_lock = threading.Lock()
+
+
+def get_routing_table() -> RoutingTable:
+    """Return the process-wide routing table, loaded on first use."""
+    global _table
+    if _table is not None:
+        return _table
+
+    with _table_lock:
+        if _table is None:
+            _table = RoutingTable(load_routing_entries())
+            if _table.routes:
+                logger.info("routing_table_loaded", {"routes": len(_table)})
+        return _table
+
+
+def reset_routing_table():
+    """Forget the loaded table so the next call re-reads config (used by tests)."""
+    global _table
+    with _table_lock:
+        _table = None
+
+
+def default_target_configured() -> bool:
+    """True when GITHUB_OWNER / GITHUB_REPO give unrouted events somewhere to go."""
+    cfg = get_config()
+    return bool(cfg.github_owner and cfg.github_repo)
+
+
+def resolve_route(work_item_id: int, resource: dict, rule=None) -> Optional[Route]:
+    """
+    Pick the dispatch target for a validated event.
+
+    Args:
+        work_item_id: Azure DevOps work item ID
+        resource: ``resource`` object from the Service Hook payload
+        rule: Optional validation.ValidationRule the event matched
+
+    Returns:
+        The matching route with its inputs rendered, a workflow-only route from
+        the rule's ``workflow``, or None for the GITHUB_* defaults
+    """
+    fields = ((resource or {}).get("revision") or {}).get("fields") or {}
+    route = get_routing_table().lookup(fields)
+    if route is None and rule is not None and rule.workflow:
+        route = Route(name=f"rule:{rule.name}", workflow=rule.workflow)
+    return route.render(work_item_id, fields) if route else None
+
+
+def accepts_context_handoff(route: Optional[Route]) -> bool:
+    """True when the target workflow declares ``context_sha256`` (route flag, else CONTEXT_HANDOFF_WORKFLOWS)."""
+    if route is not None and route.context_handoff is not None:
+        return route.context_handoff
+    cfg = get_config()
+    workflow = (route and route.workflow) or cfg.github_workflow_filename
+    return workflow.lower() in cfg.context_handoff_workflows
+
+
+def describe(route: Optional[Route]) -> str:
+    """owner/repo:workflow@ref for log lines, with defaults filled in."""
+    cfg = get_config()
+    owner = (route and route.owner) or cfg.github_owner
+    repo = (route and route.repo) or cfg.github_repo
+    workflow = (route and route.workflow) or cfg.github_workflow_filename
+    ref = (route and route.ref) or cfg.github_workflow_ref
+    return f"{owner}/{repo}:{workflow}@{ref}"
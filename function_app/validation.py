@@ -1,91 +1,233 @@
 """
 Validation logic for Azure DevOps Service Hook events.
 Determines if a work item event should trigger spec generation.
+
+Rules are compiled once (first use per instance) into a predicate table:
+rules are indexed by work item type, and each rule's checks run cheapest
+first - set lookups on the board column before the assignee string is parsed -
+so the common rejections cost a couple of dict lookups.
+
+Rules come from VALIDATION_RULES (JSON list) or, by default, a single rule
+built from AI_USER_MATCH and SPEC_COLUMN_NAME:
+
+    [
+        {"name": "features", "work_item_types": ["Feature"], "columns": ["Specification"],
+         "ai_users": ["AI Teammate"], "workflow": "spec-kit-specify.yml"},
+        {"name": "epics", "work_item_types": ["Epic"], "columns": ["Discovery"],
+         "ai_users": ["AI Architect", "AI Teammate"], "workflow": "spec-kit-epic.yml"}
+    ]
+
+``workflow`` is optional (None = the default GITHUB_WORKFLOW_FILENAME).
 """
-import os
-import logging
+import json
+import threading
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, List, Optional
+
+try:
+    from .app_logging import StructuredLogger
+    from .config import Config, get_config
+except ImportError:
+    from app_logging import StructuredLogger
+    from config import Config, get_config
+
+logger = StructuredLogger(__name__)
+
+EVENT_TYPE = "workitem.updated"
+
+
+@dataclass(frozen=True)
+class ValidationRule:
+    """One compiled trigger rule (names/columns as sets, AI users lowercased)."""
+    name: str
+    work_item_types: FrozenSet[str]
+    columns: FrozenSet[str]
+    ai_users: FrozenSet[str]
+    workflow: Optional[str] = None
+
+    @property
+    def expected_column(self) -> str:
+        return " | ".join(sorted(self.columns))
+
+    @property
+    def expected_user(self) -> str:
+        return " | ".join(sorted(self.ai_users))
+
+
+def _column_base(column: str) -> str:
+    """Strip a " – Doing" / " – Done" suffix (ADO reports BoardColumn without it)."""
+    return column.split(" – ")[0].strip()
+
+
+def _as_list(value) -> List[str]:
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return [part.strip() for part in value.split(",") if part.strip()]
+    return [str(part).strip() for part in value if str(part).strip()]
 
-logger = logging.getLogger(__name__)
+
+def compile_rule(spec: dict, index: int = 0) -> ValidationRule:
+    """
+    Build a ValidationRule from its config dict.
+
+    Raises:
+        ValueError: If a rule has no work item type, column or AI user
+    """
+    name = spec.get("name") or f"rule-{index}"
+    work_item_types = frozenset(_as_list(spec.get("work_item_types") or spec.get("work_item_type")))
+    columns = frozenset(_column_base(column) for column in _as_list(spec.get("columns") or spec.get("column")))
+    ai_users = frozenset(user.lower() for user in _as_list(spec.get("ai_users") or spec.get("ai_user")))
+    if not work_item_types or not columns or not ai_users:
+        raise ValueError(f"Validation rule '{name}' needs work_item_types, columns and ai_users")
+    return ValidationRule(name, work_item_types, columns, ai_users, spec.get("workflow"))
+
+
+def load_rules(cfg: Optional[Config] = None) -> List[ValidationRule]:
+    """Read VALIDATION_RULES, falling back to the AI_USER_MATCH / SPEC_COLUMN_NAME rule."""
+    cfg = cfg or get_config()
+    raw = cfg.validation_rules
+    if raw:
+        specs = json.loads(raw)
+        if isinstance(specs, dict):
+            specs = [specs]
+        return [compile_rule(spec, index) for index, spec in enumerate(specs)]
+
+    return [compile_rule({
+        "name": "default",
+        "work_item_types": ["Feature"],
+        "columns": [cfg.spec_column_name],
+        "ai_users": [cfg.ai_user_match],
+    })]
+
+
+def _assignee_name(assignee_raw) -> str:
+    # AssignedTo can be string "DisplayName <email>" or dict with displayName
+    if isinstance(assignee_raw, dict):
+        return assignee_raw.get("displayName", "") or ""
+    if isinstance(assignee_raw, str):
+        # Extract display name from "DisplayName <email>" format
+        return assignee_raw.split("<")[0].strip()
+    return ""
+
+
+class RuleEngine:
+    """
+    Predicate table over compiled rules.
+
+    Usage:
+        rule, reason = get_rule_engine().match(event)
+    """
+
+    def __init__(self, rules: List[ValidationRule]):
+        self.rules = list(rules)
+        self._by_type: Dict[str, List[ValidationRule]] = {}
+        for rule in self.rules:
+            for work_item_type in rule.work_item_types:
+                self._by_type.setdefault(work_item_type, []).append(rule)
+        self._expected_types = ", ".join(sorted(self._by_type))
+        # Unions over all rules - a value outside them cannot match any rule (used by prefilter)
+        self.work_item_types: FrozenSet[str] = frozenset(self._by_type)
+        self.columns: FrozenSet[str] = frozenset().union(*(rule.columns for rule in self.rules))
+
+    def match(self, event: dict) -> tuple[Optional[ValidationRule], str]:
+        """
+        Find the first rule the event satisfies.
+
+        Returns:
+            (rule, "ok") on a match, otherwise (None, reason) - the reason of
+            the candidate rule that got furthest through its checks
+        """
+        event_type = event.get("eventType", "")
+        if event_type != EVENT_TYPE:
+            return None, f"Invalid event type: {event_type}"
+
+        # Check revision.fields for full work item state
+        fields = ((event.get("resource") or {}).get("revision") or {}).get("fields") or {}
+
+        work_item_type = fields.get("System.WorkItemType", "")
+        candidates = self._by_type.get(work_item_type)
+        if not candidates:
+            return None, f"Invalid work item type: {work_item_type} (expected {self._expected_types})"
+
+        # Note: Azure DevOps reports BoardColumn as "Specification" regardless of Doing/Done state;
+        # BoardColumnDone tells the "Doing" and "Done" sub-columns apart
+        board_column = fields.get("System.BoardColumn", "")
+        board_column_done = fields.get("System.BoardColumnDone", False)
+        assignee_name = None
+
+        best_stage, best_reason = -1, ""
+        for rule in candidates:
+            if board_column not in rule.columns:
+                stage, reason = 0, f"Column mismatch: '{board_column}' (expected '{rule.expected_column}')"
+            elif board_column_done:
+                stage, reason = 1, "Column state is 'Done' (expected 'Doing' - BoardColumnDone should be false)"
+            else:
+                if assignee_name is None:
+                    assignee_name = _assignee_name(fields.get("System.AssignedTo", ""))
+                if assignee_name.lower() not in rule.ai_users:
+                    stage, reason = 2, f"Assignee mismatch: '{assignee_name}' (expected '{rule.expected_user}')"
+                else:
+                    return rule, "ok"
+            if stage > best_stage:
+                best_stage, best_reason = stage, reason
+        return None, best_reason
+
+
+_engine: Optional[RuleEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_rule_engine() -> RuleEngine:
+    """Return the process-wide engine, compiled from config on first use."""
+    global _engine
+    if _engine is not None:
+        return _engine
+
+    with _engine_lock:
+        if _engine is None:
+            _engine = RuleEngine(load_rules())
+            logger.info("validation_rules_compiled", {"rules": [rule.name for rule in _engine.rules]})
+        return _engine
+
+
+def reset_rule_engine():
+    """Forget the compiled rules so the next call re-reads config (used by tests)."""
+    global _engine
+    with _engine_lock:
+        _engine = None
+
+
+def match_event(event: dict) -> tuple[Optional[ValidationRule], str]:
+    """
+    Return the rule an event satisfies (its ``workflow`` selects the target).
+
+    Returns:
+        (rule, "ok") or (None, reason)
+    """
+    rule, reason = get_rule_engine().match(event)
+    logger.debug("validation_matched", lambda: {"rule": rule.name if rule else None, "reason": reason})
+    return rule, reason
 
 
 def validate_event(event: dict) -> tuple[bool, str]:
     """
     Validate if the event should trigger spec generation.
-    
+
     Args:
         event: Raw Service Hook payload (dictionary)
-    
+
     Returns:
         Tuple of (is_valid, reason)
         - (True, "ok") if event passes all validation
         - (False, reason) if validation fails
-    
-    Validation Rules:
+
+    Validation Rules (per compiled rule, see module docstring):
         - eventType must be "workitem.updated"
-        - workItemType must be "Feature"
-        - assignee display name must match AI_USER_MATCH (case-insensitive)
-        - board column must match SPEC_COLUMN_NAME
+        - workItemType must be one of the rule's work item types
+        - board column must be one of the rule's columns
         - board column done state must be false (Doing, not Done)
+        - assignee display name must match one of the rule's AI users (case-insensitive)
     """
-    # Check event type
-    event_type = event.get("eventType", "")
-    logger.info(f"Validating event - eventType={event_type}")
-    
-    if event_type != "workitem.updated":
-        logger.info(f"Rejected: Invalid event type '{event_type}'")
-        return False, f"Invalid event type: {event_type}"
-    
-    # Extract resource fields - check revision.fields for full work item state
-    resource = event.get("resource", {})
-    revision = resource.get("revision", {})
-    fields = revision.get("fields", {})
-    
-    # Validate work item type
-    work_item_type = fields.get("System.WorkItemType", "")
-    logger.info(f"Work item type: {work_item_type}")
-    
-    if work_item_type != "Feature":
-        logger.info(f"Rejected: Invalid work item type '{work_item_type}'")
-        return False, f"Invalid work item type: {work_item_type} (expected Feature)"
-    
-    # Validate assignee
-    ai_user_match = os.getenv("AI_USER_MATCH", "AI Teammate")
-    assignee_raw = fields.get("System.AssignedTo", "")
-    assignee_name = ""
-    
-    # AssignedTo can be string "DisplayName <email>" or dict with displayName
-    if isinstance(assignee_raw, dict):
-        assignee_name = assignee_raw.get("displayName", "")
-    elif isinstance(assignee_raw, str):
-        # Extract display name from "DisplayName <email>" format
-        assignee_name = assignee_raw.split("<")[0].strip()
-    
-    logger.info(f"Assignee check - raw='{assignee_raw}', parsed='{assignee_name}', expected='{ai_user_match}'")
-    
-    if assignee_name.lower() != ai_user_match.lower():
-        logger.info(f"Rejected: Assignee mismatch '{assignee_name}' != '{ai_user_match}'")
-        return False, f"Assignee mismatch: '{assignee_name}' (expected '{ai_user_match}')"
-    
-    # Validate board column and "Doing" state (not Done)
-    # Note: Azure DevOps reports BoardColumn as "Specification" regardless of Doing/Done state
-    # We check BoardColumnDone to ensure it's in the "Doing" sub-column
-    spec_column = os.getenv("SPEC_COLUMN_NAME", "Specification")
-    board_column = fields.get("System.BoardColumn", "")
-    board_column_done = fields.get("System.BoardColumnDone", False)
-    
-    # Strip " – Doing" or " – Done" suffix from expected column name for comparison
-    spec_column_base = spec_column.split(" – ")[0].strip()
-    
-    logger.info(f"Column check - board_column='{board_column}', expected_base='{spec_column_base}', board_column_done={board_column_done}")
-    
-    if board_column != spec_column_base:
-        logger.info(f"Rejected: Column mismatch '{board_column}' != '{spec_column_base}'")
-        return False, f"Column mismatch: '{board_column}' (expected '{spec_column_base}')"
-    
-    if board_column_done:
-        logger.info(f"Rejected: Column is in 'Done' state (BoardColumnDone=True)")
-        return False, f"Column state is 'Done' (expected 'Doing' - BoardColumnDone should be false)"
-    
-    logger.info("Validation passed - all checks OK")
-    return True, "ok"
-
+    rule, reason = match_event(event)
+    return rule is not None, reason
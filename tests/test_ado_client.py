@@ -0,0 +1,251 @@
+"""
+Unit tests for Azure DevOps client helpers.
+"""
+import threading
+import time
+from unittest import mock
+
+from function_app import ado_client
+
+
+@mock.patch("function_app.ado_client.get_work_item_comments")
+def test_comments_batch_preserves_order(mock_comments):
+    """Test results follow input order even when later Issues finish first."""
+    delays = {1: 0.15, 2: 0.05, 3: 0.0}
+
+    def fake_comments(wi_id):
+        time.sleep(delays[wi_id])
+        return [f"comment for {wi_id}"]
+
+    mock_comments.side_effect = fake_comments
+
+    results = ado_client.get_work_item_comments_batch([1, 2, 3], max_workers=3, deadline_seconds=5)
+
+    assert list(results.keys()) == [1, 2, 3]
+    assert results[2] == ["comment for 2"]
+
+
+@mock.patch("function_app.ado_client.get_work_item_comments")
+def test_comments_batch_respects_concurrency_limit(mock_comments):
+    """Test no more than max_workers fetches run at once."""
+    lock = threading.Lock()
+    state = {"active": 0, "peak": 0}
+
+    def fake_comments(wi_id):
+        with lock:
+            state["active"] += 1
+            state["peak"] = max(state["peak"], state["active"])
+        time.sleep(0.02)
+        with lock:
+            state["active"] -= 1
+        return []
+
+    mock_comments.side_effect = fake_comments
+
+    ado_client.get_work_item_comments_batch(range(10), max_workers=2, deadline_seconds=5)
+
+    assert mock_comments.call_count == 10
+    assert state["peak"] <= 2
+
+
+@mock.patch("function_app.ado_client.get_work_item_comments")
+def test_comments_batch_deadline(mock_comments):
+    """Test Issues that miss the overall deadline come back empty."""
+    def fake_comments(wi_id):
+        if wi_id == 2:
+            time.sleep(0.5)
+        return [f"comment for {wi_id}"]
+
+    mock_comments.side_effect = fake_comments
+
+    start = time.monotonic()
+    results = ado_client.get_work_item_comments_batch([1, 2], max_workers=2, deadline_seconds=0.1)
+
+    assert time.monotonic() - start < 0.4
+    assert results == {1: ["comment for 1"], 2: []}
+
+
+def _payload_resource(fields, revised_by=None):
+    return {
+        "workItemId": 615,
+        "rev": 5,
+        "revisedBy": revised_by,
+        "revision": {"id": 615, "rev": 5, "fields": fields},
+    }
+
+
+@mock.patch("function_app.ado_client.get_work_item")
+@mock.patch("function_app.ado_client.get_work_item_revision")
+def test_resolve_details_from_payload(mock_revision, mock_work_item):
+    """Test an authoritative payload resolves with no ADO calls."""
+    resource = _payload_resource({
+        "System.Title": "hockey simulator game",
+        "System.Description": "create a hockey simulator game",
+        "System.ChangedBy": "Rustem Agziamov <rustem@example.com>",
+    })
+
+    details = ado_client.resolve_work_item_details(615, resource)
+
+    assert details.source == "payload"
+    assert details.changed_by == "rustem@example.com"
+    assert details.title == "hockey simulator game"
+    assert details.rev == 5
+    mock_revision.assert_not_called()
+    mock_work_item.assert_not_called()
+
+
+@mock.patch("function_app.ado_client.get_work_item_revision")
+def test_resolve_details_prefers_revised_by(mock_revision):
+    """Test resource.revisedBy wins over System.ChangedBy."""
+    resource = _payload_resource(
+        {"System.Title": "t", "System.ChangedBy": "Other <other@example.com>"},
+        revised_by={"uniqueName": "reviser@example.com"},
+    )
+
+    details = ado_client.resolve_work_item_details(615, resource)
+
+    assert details.changed_by == "reviser@example.com"
+    mock_revision.assert_not_called()
+
+
+@mock.patch("function_app.ado_client.get_work_item")
+@mock.patch("function_app.ado_client.get_work_item_revision")
+def test_resolve_details_fetches_payload_revision(mock_revision, mock_work_item):
+    """Test a payload without ChangedBy makes exactly one revision-aware call."""
+    mock_revision.return_value = {
+        "rev": 5,
+        "fields": {
+            "System.Title": "From ADO",
+            "System.ChangedBy": {"uniqueName": "po@example.com"},
+        },
+    }
+
+    details = ado_client.resolve_work_item_details(615, _payload_resource({"System.Title": "t"}))
+
+    assert details.source == "ado_revision"
+    assert details.changed_by == "po@example.com"
+    assert details.title == "From ADO"
+    mock_revision.assert_called_once_with(615, 5, cfg=None)
+    mock_work_item.assert_not_called()
+
+
+@mock.patch("function_app.ado_client.get_work_item")
+def test_resolve_details_without_payload(mock_work_item):
+    """Test a bare work item ID falls back to one work item fetch."""
+    mock_work_item.return_value = {
+        "rev": 9,
+        "fields": {"System.Title": "Latest", "System.ChangedBy": {"uniqueName": "po@example.com"}},
+    }
+
+    details = ado_client.resolve_work_item_details(615)
+
+    assert details.source == "ado_work_item"
+    assert details.rev == 9
+    mock_work_item.assert_called_once_with(615, cfg=None)
+
+
+@mock.patch("function_app.ado_client.get_work_item")
+def test_explicit_config_is_passed_through(mock_work_item):
+    """Test a caller's config snapshot reaches the underlying fetch."""
+    from function_app.config import Config
+
+    cfg = Config(ado_org_url="https://dev.azure.com/org", ado_project="p")
+    mock_work_item.return_value = {"rev": 9, "fields": {}}
+
+    assert ado_client.get_work_item_latest_revision(615, cfg=cfg)["rev"] == 9
+    ado_client.resolve_work_item_details(615, cfg=cfg)
+
+    assert mock_work_item.call_args_list == [mock.call(615, cfg=cfg)] * 2
+
+
+@mock.patch("function_app.ado_client.get_work_item")
+def test_resolve_details_defaults_on_ado_failure(mock_work_item):
+    """Test ADO failures still return usable defaults."""
+    mock_work_item.return_value = None
+
+    details = ado_client.resolve_work_item_details(615, {})
+
+    assert details.source == "defaults"
+    assert details.title == "Work Item #615"
+    assert details.changed_by is None
+
+
+def _ado_env(monkeypatch):
+    monkeypatch.setenv("ADO_ORG_URL", "https://dev.azure.com/org")
+    monkeypatch.setenv("ADO_PROJECT", "proj")
+    monkeypatch.setenv("ADO_WORK_ITEM_PAT", "pat")
+
+
+def _response(status_code, payload):
+    response = mock.Mock()
+    response.status_code = status_code
+    response.json.return_value = payload
+    response.text = ""
+    return response
+
+
+@mock.patch("function_app.ado_client.http_session.get")
+@mock.patch("function_app.ado_client.http_session.post")
+def test_existing_idempotency_keys_single_query(mock_post, mock_get, monkeypatch):
+    """Test keys come from one WIQL query plus one batch fetch, no CONTAINS scans."""
+    _ado_env(monkeypatch)
+    mock_post.return_value = _response(200, {"workItems": [{"id": 901}, {"id": 902}, {"id": 903}]})
+    mock_get.return_value = _response(200, {"value": [
+        {"id": 901, "fields": {"System.Description": "Q1\n\n<!-- idempotency_key: 615-aaaa1111 -->"}},
+        {"id": 902, "fields": {"System.Description": "<p>Q2</p>&lt;!-- idempotency_key: 615-bbbb2222 --&gt;"}},
+        {"id": 903, "fields": {"System.Description": "manually created Issue"}},
+    ]})
+
+    keys = ado_client.get_existing_idempotency_keys(615)
+
+    assert keys == {"615-aaaa1111": 901, "615-bbbb2222": 902}
+    assert mock_post.call_count == 1
+    assert "CONTAINS" not in mock_post.call_args.kwargs["json"]["query"]
+    assert mock_get.call_count == 1
+
+
+@mock.patch("function_app.ado_client.create_issue_workitem")
+@mock.patch("function_app.ado_client.get_existing_idempotency_keys")
+def test_create_issues_batch_diffs_and_creates_missing(mock_keys, mock_create):
+    """Test existing Issues are skipped locally and only missing ones are created."""
+    mock_keys.return_value = {"615-aaaa1111": 901}
+    mock_create.side_effect = lambda **kwargs: None if kwargs["idempotency_key"] == "615-cccc3333" else {"id": 950}
+    issues = [
+        {"title": "Q1: Auth", "description": "d1", "tags": "t", "idempotency_key": "615-aaaa1111"},
+        {"title": "Q2: Data", "description": "d2", "tags": "t", "idempotency_key": "615-bbbb2222"},
+        {"title": "Q3: Scale", "description": "d3", "tags": "t", "idempotency_key": "615-cccc3333"},
+    ]
+
+    results = ado_client.create_issue_workitems_batch(615, issues, max_workers=2)
+
+    assert [(r["status"], r["id"]) for r in results] == [("exists", 901), ("created", 950), ("failed", None)]
+    assert mock_create.call_count == 2
+    assert all(call.kwargs["skip_idempotency_check"] for call in mock_create.call_args_list)
+
+
+@mock.patch("function_app.ado_client.create_issue_workitem", return_value=None)
+@mock.patch("function_app.ado_client.get_existing_idempotency_keys", return_value=None)
+def test_create_issues_batch_falls_back_to_per_issue_checks(mock_keys, mock_create):
+    """Test a failed key lookup keeps each create's own idempotency check."""
+    results = ado_client.create_issue_workitems_batch(
+        615, [{"title": "Q1", "description": "d", "idempotency_key": "615-aaaa1111"}]
+    )
+
+    assert results[0]["status"] == "skipped"
+    assert mock_create.call_args.kwargs["skip_idempotency_check"] is False
+
+
+@mock.patch("function_app.ado_client.create_issue_workitem", return_value={"id": 950})
+@mock.patch("function_app.ado_client.get_existing_idempotency_keys", return_value={})
+def test_create_issues_batch_threads_config_snapshot(mock_keys, mock_create):
+    """Test the caller's config snapshot reaches the key lookup and every create."""
+    cfg = mock.Mock()
+    issues = [
+        {"title": "Q1", "description": "d1", "idempotency_key": "615-aaaa1111"},
+        {"title": "Q2", "description": "d2", "idempotency_key": "615-bbbb2222"},
+    ]
+
+    ado_client.create_issue_workitems_batch(615, issues, max_workers=2, cfg=cfg)
+
+    mock_keys.assert_called_once_with(615, cfg)
+    assert all(call.kwargs["cfg"] is cfg for call in mock_create.call_args_list)
@@ -0,0 +1,151 @@
+"""
+Unit tests for the sampling StructuredLogger and configure_logging.
+"""
+import json
+import logging
+import queue
+import threading
+
+import pytest
+
+from function_app import app_logging
+from function_app.app_logging import BoundedQueueHandler, StructuredLogger, parse_sample_rates
+
+
+@pytest.fixture
+def records(caplog):
+    caplog.set_level(logging.DEBUG, logger="tests.app_logging")
+    return lambda: [json.loads(r.getMessage()) for r in caplog.records if r.name == "tests.app_logging"]
+
+
+def _logger(**kwargs):
+    logger = StructuredLogger("tests.app_logging", **kwargs)
+    logger.logger.setLevel(logging.DEBUG)
+    return logger
+
+
+def test_parse_sample_rates():
+    """Test event=rate pairs are clamped and malformed entries skipped."""
+    assert parse_sample_rates("a=0.5, b=2,c=x,=1,d") == {"a": 0.5, "b": 1.0}
+    assert parse_sample_rates("") == {}
+
+
+def test_events_are_json_with_bound_correlation_id(records):
+    """Test events carry their fields and the bound correlation_id."""
+    logger = _logger(sample_rates={})
+    token = app_logging.bind_correlation_id("corr-1")
+    try:
+        logger.info("dispatch_succeeded", {"work_item_id": 7})
+    finally:
+        app_logging.unbind_correlation_id(token)
+    logger.info("outside")
+
+    assert records() == [
+        {"event": "dispatch_succeeded", "correlation_id": "corr-1", "work_item_id": 7},
+        {"event": "outside"}
+    ]
+
+
+def test_sampling_drops_info_but_never_warnings(records):
+    """Test sampled events are dropped at rate 0 while warnings always pass."""
+    logger = _logger(sample_rates={"noisy": 0.0, "kept": 1.0})
+    for _ in range(50):
+        logger.info("noisy")
+        logger.warning("noisy")
+    logger.info("kept")
+
+    events = records()
+    assert len(events) == 51
+    assert all(e["event"] == "noisy" for e in events[:50])
+    assert events[-1] == {"event": "kept", "sample_rate": 1.0}
+
+
+def test_lazy_data_is_not_built_when_disabled(records):
+    """Test callable data is skipped below the logger level or when sampled out."""
+    calls = []
+
+    def build():
+        calls.append(1)
+        return {"preview": "x"}
+
+    logger = _logger(sample_rates={"sampled": 0.0})
+    logger.logger.setLevel(logging.INFO)
+    logger.debug("context_preview", build)
+    logger.info("sampled", build)
+    assert calls == []
+
+    logger.info("context_preview", build)
+    assert calls == [1]
+    assert records() == [{"event": "context_preview", "preview": "x"}]
+
+
+def test_bounded_queue_handler_drops_instead_of_blocking():
+    """Test a full queue counts dropped records rather than blocking the caller."""
+    handler = BoundedQueueHandler(queue.Queue(maxsize=2))
+    record = logging.LogRecord("x", logging.INFO, __file__, 1, "msg", None, None)
+    for _ in range(5):
+        handler.emit(record)
+    assert handler.queue.qsize() == 2
+    assert handler.dropped == 3
+
+
+class _Capture(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+@pytest.fixture
+def root_logger():
+    root = logging.getLogger()
+    original_handlers, original_level = root.handlers[:], root.level
+    yield root
+    app_logging.shutdown_logging()
+    root.handlers = original_handlers
+    root.setLevel(original_level)
+
+
+def test_configure_logging_keeps_host_handlers_on_emitting_thread(root_logger):
+    """Test a host-style root handler stays on root and receives records on the emitting thread."""
+    host = _Capture()
+    root_logger.handlers = [host]
+    app_logging.configure_logging("INFO")
+
+    assert root_logger.handlers == [host]
+    _logger(sample_rates={}).info("request_summary", {"status": 204})
+
+    assert [record.getMessage() for record in host.records] == ['{"event": "request_summary", "status": 204}']
+    assert host.records[0].thread == threading.get_ident()
+    assert app_logging.get_logging_stats() == {"queued": 0, "dropped": 0}
+
+
+def test_configure_logging_samples_stdlib_loggers_by_name(root_logger, monkeypatch):
+    """Test the root handler filter applies LOG_SAMPLE_RATES to plain loggers but not to warnings."""
+    monkeypatch.setenv("LOG_SAMPLE_RATES", "tests.noisy=0")
+    app_logging.reset_sample_rates()
+    host = _Capture()
+    root_logger.handlers = [host]
+    try:
+        app_logging.configure_logging("INFO")
+        noisy = logging.getLogger("tests.noisy")
+        noisy.info("dropped")
+        noisy.warning("kept")
+        logging.getLogger("tests.other").info("kept too")
+    finally:
+        app_logging.reset_sample_rates()
+
+    assert [record.getMessage() for record in host.records] == ["kept", "kept too"]
+
+
+def test_configure_logging_queues_fallback_console(root_logger):
+    """Test a console handler behind the bounded queue is installed only when root has no handlers."""
+    root_logger.handlers = []
+    app_logging.configure_logging("INFO")
+
+    assert len(root_logger.handlers) == 1
+    assert isinstance(root_logger.handlers[0], BoundedQueueHandler)
+    app_logging.shutdown_logging()
+    assert root_logger.handlers == []
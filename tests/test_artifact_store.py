@@ -0,0 +1,110 @@
+"""
+Unit tests for the content-addressed artifact store and large-context handoff.
+"""
+import hashlib
+from unittest import mock
+
+from function_app import artifact_store, pipeline
+
+
+def test_local_store_is_content_addressed(tmp_path):
+    """Test identical content maps to one file named by its sha256."""
+    store = artifact_store.LocalArtifactStore(str(tmp_path))
+
+    digest = store.put("full feature context")
+
+    assert digest == hashlib.sha256(b"full feature context").hexdigest()
+    assert store.get(digest) == b"full feature context"
+    assert store.put("full feature context") == digest
+    assert len(list(tmp_path.rglob("*"))) == 2  # one shard directory + one file
+    assert store.get("0" * 64) is None
+
+
+def test_local_store_skips_rewrite_of_existing_digest(tmp_path):
+    """Test a second instance reuses an existing blob instead of re-uploading."""
+    digest = artifact_store.LocalArtifactStore(str(tmp_path)).put(b"context")
+
+    store = artifact_store.LocalArtifactStore(str(tmp_path))
+    with mock.patch.object(store, "_write") as mock_write:
+        assert store.put(b"context") == digest
+    mock_write.assert_not_called()
+
+
+@mock.patch("function_app.dispatch.dispatch_workflow", return_value=(True, "dispatched"))
+@mock.patch("function_app.ado_client.get_work_item_comments")
+@mock.patch("function_app.ado_client.get_child_issues")
+def test_large_context_dispatches_digest_and_summary(mock_children, mock_comments, mock_dispatch, tmp_path, monkeypatch):
+    """Test a context over the inline limit is stored and only its hash + summary dispatched."""
+    from function_app import enrichment
+
+    monkeypatch.setenv("ARTIFACT_STORE_BACKEND", "local")
+    monkeypatch.setenv("ARTIFACT_STORE_PATH", str(tmp_path))
+    monkeypatch.setenv("ARTIFACT_INLINE_MAX_BYTES", "1024")
+    monkeypatch.setenv("DEDUP_ENABLED", "false")
+    artifact_store.reset_artifact_store()
+    enrichment.clear_cache()
+
+    mock_children.return_value = [{"id": 1, "title": "Which league?", "description": "", "rev": 2}]
+    mock_comments.return_value = ["NHL rules " * 500]
+    resource = {"rev": 5, "revision": {"rev": 5, "fields": {"System.Title": "hockey", "System.Description": "create a hockey simulator game"}}}
+
+    pipeline.process_work_item(615, resource, "corr-1")
+
+    kwargs = mock_dispatch.call_args.kwargs
+    digest = kwargs["context_sha256"]
+    full_text = artifact_store.get_artifact_store().get(digest).decode("utf-8")
+    assert "NHL rules" in full_text
+    assert kwargs["description_placeholder"].startswith("create a hockey simulator game")
+    assert len(kwargs["description_placeholder"].encode("utf-8")) <= 2048
+    assert digest == hashlib.sha256(full_text.encode("utf-8")).hexdigest()
+
+    artifact_store.reset_artifact_store()
+    enrichment.clear_cache()
+
+
+@mock.patch("function_app.dispatch.dispatch_workflow", return_value=(True, "dispatched"))
+@mock.patch("function_app.ado_client.get_child_issues", return_value=[])
+def test_small_context_stays_inline(mock_children, mock_dispatch, tmp_path, monkeypatch):
+    """Test small contexts are dispatched inline without touching the store."""
+    monkeypatch.setenv("ARTIFACT_STORE_BACKEND", "local")
+    monkeypatch.setenv("ARTIFACT_STORE_PATH", str(tmp_path))
+    monkeypatch.setenv("DEDUP_ENABLED", "false")
+    artifact_store.reset_artifact_store()
+
+    resource = {"rev": 5, "revision": {"rev": 5, "fields": {"System.Title": "hockey", "System.Description": "short"}}}
+    pipeline.process_work_item(615, resource, "corr-1")
+
+    kwargs = mock_dispatch.call_args.kwargs
+    assert kwargs["context_sha256"] is None
+    assert kwargs["description_placeholder"] == "short"
+    assert list(tmp_path.iterdir()) == []
+    artifact_store.reset_artifact_store()
+
+
+@mock.patch("function_app.dispatch.dispatch_workflow", return_value=(True, "dispatched"))
+@mock.patch("function_app.ado_client.get_work_item_comments", return_value=["NHL rules " * 500])
+@mock.patch("function_app.ado_client.get_child_issues", return_value=[{"id": 1, "title": "Which league?", "description": "", "rev": 2}])
+def test_large_context_stays_inline_for_workflows_without_handoff(mock_children, mock_comments, mock_dispatch, tmp_path, monkeypatch):
+    """Test workflows that don't declare context_sha256 get the budgeted text inline unless the route opts in."""
+    from function_app import enrichment, routing
+
+    monkeypatch.setenv("ARTIFACT_STORE_BACKEND", "local")
+    monkeypatch.setenv("ARTIFACT_STORE_PATH", str(tmp_path))
+    monkeypatch.setenv("ARTIFACT_INLINE_MAX_BYTES", "1024")
+    monkeypatch.setenv("DEDUP_ENABLED", "false")
+    artifact_store.reset_artifact_store()
+    resource = {"rev": 5, "revision": {"rev": 5, "fields": {"System.Title": "hockey", "System.Description": "create a hockey simulator game"}}}
+
+    enrichment.clear_cache()
+    pipeline.process_work_item(615, resource, "corr-1", route=routing.Route(name="plain", workflow="triage.yml"))
+    kwargs = mock_dispatch.call_args.kwargs
+    assert kwargs["context_sha256"] is None
+    assert "NHL rules" in kwargs["description_placeholder"]
+    assert list(tmp_path.iterdir()) == []
+
+    enrichment.clear_cache()
+    pipeline.process_work_item(615, resource, "corr-2", route=routing.Route(name="opted-in", workflow="triage.yml", context_handoff=True))
+    assert mock_dispatch.call_args.kwargs["context_sha256"] is not None
+
+    artifact_store.reset_artifact_store()
+    enrichment.clear_cache()
@@ -0,0 +1,159 @@
+"""
+Unit tests for HTTP cassette record/replay beneath http_session.
+"""
+import base64
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from function_app import cassette, http_session
+
+PAT = "super-secret-ado-pat-value"
+
+
+class _EchoHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    calls = 0
+
+    def _reply(self):
+        type(self).calls += 1
+        length = int(self.headers.get("Content-Length") or 0)
+        received = self.rfile.read(length).decode() if length else ""
+        body = json.dumps({"path": self.path, "received": received, "call": type(self).calls}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Set-Cookie", "session=abc")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = _reply
+    do_POST = _reply
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def echo_server():
+    _EchoHandler.calls = 0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _EchoHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}", server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def cassette_env(monkeypatch, tmp_path):
+    path = tmp_path / "cassettes" / "ado.jsonl"
+    monkeypatch.setenv("HTTP_CASSETTE", str(path))
+    monkeypatch.setenv("ADO_WORK_ITEM_PAT", PAT)
+    monkeypatch.delenv("HTTP_CASSETTE_TIMING", raising=False)
+
+    def use(mode):
+        monkeypatch.setenv("HTTP_CASSETTE_MODE", mode)
+        http_session.reset_sessions()
+
+    yield path, use
+    monkeypatch.delenv("HTTP_CASSETTE_MODE", raising=False)
+    http_session.reset_sessions()
+
+
+def _auth():
+    return {"Authorization": "Basic " + base64.b64encode(f":{PAT}".encode()).decode()}
+
+
+def test_record_scrubs_secrets(echo_server, cassette_env):
+    """Test recorded interactions keep no PAT, auth header or cookie."""
+    url, _ = echo_server
+    path, use = cassette_env
+    use("record")
+
+    response = http_session.post(f"{url}/wiql?api-version=7.0&access_token={PAT}", json={"pat": PAT}, headers=_auth(), timeout=5)
+    assert response.status_code == 200
+
+    text = path.read_text()
+    assert PAT not in text
+    assert base64.b64encode(f":{PAT}".encode()).decode() not in text
+    interaction = json.loads(text)
+    assert interaction["request"]["headers"]["Authorization"] == cassette.SCRUBBED
+    assert interaction["response"]["headers"]["Set-Cookie"] == cassette.SCRUBBED
+    assert "access_token=%3Cscrubbed%3E" in interaction["request"]["url"]
+
+
+def test_replay_serves_recording_without_network(echo_server, cassette_env):
+    """Test replay returns the recorded responses in order once the server is gone."""
+    url, server = echo_server
+    path, use = cassette_env
+    use("record")
+    recorded = [http_session.get(f"{url}/workitems/615?b=2&a=1", headers=_auth(), timeout=5).json() for _ in range(2)]
+    server.shutdown()
+    server.server_close()
+
+    use("replay")
+    # Query order is ignored; the last recording repeats once the others are served
+    replayed = [http_session.get(f"{url}/workitems/615?a=1&b=2", headers=_auth(), timeout=5) for _ in range(3)]
+    assert [r.json() for r in replayed] == recorded + recorded[-1:]
+    assert replayed[0].status_code == 200
+    assert replayed[0].headers["Content-Type"] == "application/json"
+    assert http_session.get_connection_stats("127.0.0.1")["new_connections"] == 0
+
+
+def test_replay_matches_body_before_url(echo_server, cassette_env):
+    """Test requests differing only by body get their own recordings."""
+    url, _ = echo_server
+    path, use = cassette_env
+    use("record")
+    first = http_session.post(f"{url}/wiql", json={"query": "one"}, timeout=5).json()
+    second = http_session.post(f"{url}/wiql", json={"query": "two"}, timeout=5).json()
+
+    use("replay")
+    assert http_session.post(f"{url}/wiql", json={"query": "two"}, timeout=5).json() == second
+    assert http_session.post(f"{url}/wiql", json={"query": "one"}, timeout=5).json() == first
+
+
+def test_replay_miss_raises_connection_error(echo_server, cassette_env):
+    """Test unrecorded requests fail like a network error."""
+    url, _ = echo_server
+    path, use = cassette_env
+    use("record")
+    http_session.get(f"{url}/recorded", timeout=5)
+
+    use("replay")
+    with pytest.raises(cassette.CassetteMiss):
+        http_session.get(f"{url}/not-recorded", timeout=5)
+    assert issubclass(cassette.CassetteMiss, http_session.requests.exceptions.ConnectionError)
+
+
+def test_replay_timing_scale(tmp_path):
+    """Test recorded latency is replayed scaled."""
+    path = tmp_path / "slow.jsonl"
+    path.write_text(json.dumps({
+        "request": {"method": "GET", "url": "https://dev.azure.com/org/p/_apis/wit/workitems/1", "headers": {}, "body": ""},
+        "response": {"status": 200, "reason": "OK", "headers": {"Content-Type": "application/json"}, "body": "{}"},
+        "elapsed_ms": 200
+    }) + "\n")
+    adapter = cassette.CassetteAdapter(cassette.Cassette(str(path), "replay", timing_scale=0.25, secrets=[]), inner=None)
+    request = http_session.requests.Request("GET", "https://dev.azure.com/org/p/_apis/wit/workitems/1").prepare()
+
+    started = time.perf_counter()
+    response = adapter.send(request)
+    assert time.perf_counter() - started >= 0.05
+    assert response.json() == {}
+
+
+def test_cassette_off_by_default(monkeypatch):
+    """Test no cassette is opened unless a mode is set."""
+    monkeypatch.delenv("HTTP_CASSETTE_MODE", raising=False)
+    cassette.reset_cassette()
+    assert cassette.get_cassette() is None
+
+    monkeypatch.setenv("HTTP_CASSETTE_MODE", "replay")
+    monkeypatch.delenv("HTTP_CASSETTE", raising=False)
+    with pytest.raises(RuntimeError):
+        cassette.get_cassette()
+    cassette.reset_cassette()
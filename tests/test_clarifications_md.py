@@ -0,0 +1,86 @@
+"""
+Unit tests for incremental clarifications.md patching.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".github", "scripts"))
+
+from clarifications_md import assign_fingerprints, fingerprint_comment, fingerprint_markers, parse_clarifications, patch_clarifications  # noqa: E402
+
+HEADER = "# Clarifications\n\n**Total Questions**: 2\n\n"
+FOOTER = "## Resolution Notes\n\nAnswer inline.\n"
+
+
+def _block(number, fingerprint, topic, answer="_"):
+    return f"## Question {number}: {topic}\n{fingerprint_comment(fingerprint)}\n\n**Answer**: {answer}\n\n"
+
+
+def test_fingerprints_are_stable_and_distinct():
+    """Test fingerprints depend on section and question, with repeats made distinct."""
+    records = [
+        {"section": "Requirements", "question": "Retention?"},
+        {"section": "Requirements", "question": "Retention?"},
+        {"section": "Scope", "question": "Retention?"},
+    ]
+    fingerprints = fingerprint_markers(records)
+
+    assert fingerprints == fingerprint_markers(records)
+    assert len(set(fingerprints)) == 3
+    assert fingerprints[1] == fingerprints[0] + "1"
+
+
+def test_parse_splits_header_blocks_and_footer():
+    """Test question blocks are split out with their fingerprints."""
+    content = HEADER + _block(1, "aaaa", "Retention") + _block(2, "bbbb", "Tier") + FOOTER
+    doc = parse_clarifications(content)
+
+    assert doc.header == HEADER
+    assert doc.footer == FOOTER
+    assert [fingerprint for fingerprint, _ in doc.blocks] == ["aaaa", "bbbb"]
+    assert doc.fingerprints() == {"aaaa", "bbbb"}
+
+
+def test_patch_keeps_answers_drops_removed_and_renumbers():
+    """Test unchanged blocks are kept verbatim, removed ones dropped and new ones inserted in spec order."""
+    content = HEADER + _block(1, "aaaa", "Retention", answer="30 days") + _block(2, "bbbb", "Tier") + FOOTER
+    doc = parse_clarifications(content)
+
+    patched = patch_clarifications(doc, ["cccc", "aaaa"], {"cccc": [_block(1, "cccc", "Formats")]})
+
+    assert patched == (
+        HEADER
+        + _block(1, "cccc", "Formats")
+        + _block(2, "aaaa", "Retention", answer="30 days")
+        + FOOTER
+    )
+    assert "bbbb" not in patched
+
+
+def test_patch_updates_total_for_multi_question_markers():
+    """Test a marker yielding several questions counts each of them."""
+    doc = parse_clarifications(HEADER + FOOTER)
+
+    patched = patch_clarifications(doc, ["dddd"], {"dddd": [_block(1, "dddd", "A"), _block(1, "dddd", "B")]})
+
+    assert "**Total Questions**: 2" in patched
+    assert "## Question 1: A" in patched
+    assert "## Question 2: B" in patched
+    assert patched.endswith(FOOTER)
+
+
+def test_assign_fingerprints_files_questions_under_closest_marker():
+    """Test questions from a full extraction get the fingerprint of the marker they match."""
+    records = [
+        {"section": "Requirements", "question": "How long should events be kept?", "topic": "How long should events be kept"},
+        {"section": "Requirements", "question": "Hot or cool tier?", "topic": "Hot or cool tier"},
+    ]
+    questions = [
+        {"topic": "Storage tier", "question": "Should exports use the hot or cool tier?"},
+        {"topic": "Retention", "question": "How long should audit events be kept?"},
+    ]
+
+    assigned = assign_fingerprints(questions, records, ["aaaa", "bbbb"])
+
+    assert [q["fingerprint"] for q in assigned] == ["bbbb", "aaaa"]
+    assert "fingerprint" not in questions[0]
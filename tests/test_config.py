@@ -0,0 +1,80 @@
+"""
+Unit tests for the cached configuration snapshot.
+"""
+import dataclasses
+from unittest import mock
+
+import pytest
+
+from function_app import ado_client, config
+from function_app.dispatch import dispatch_workflow
+
+KEYVAULT_REFERENCE = "@Microsoft.KeyVault(SecretUri=https://vault.vault.azure.net/secrets/pat/)"
+
+
+@pytest.fixture(autouse=True)
+def config_env(monkeypatch):
+    monkeypatch.setenv("GITHUB_OWNER", "test-owner")
+    monkeypatch.setenv("GITHUB_REPO", "test-repo")
+    monkeypatch.setenv("GH_WORKFLOW_DISPATCH_PAT", "test-pat")
+    monkeypatch.setenv("ADO_ORG_URL", "https://dev.azure.com/org/")
+    monkeypatch.setenv("ADO_PROJECT", "proj")
+    monkeypatch.setenv("ADO_WORK_ITEM_PAT", "pat")
+    config.reset_config()
+    yield
+    config.reset_config()
+
+
+def test_snapshot_is_cached_immutable_and_precomputed(monkeypatch):
+    """Test the snapshot is reused, frozen, and carries ready-made headers and URLs."""
+    cfg = config.get_config()
+
+    assert config.get_config() is cfg
+    assert cfg.ado_base_url == "https://dev.azure.com/org/proj/_apis/wit"
+    assert cfg.ado_headers["Authorization"] == "Basic OnBhdA=="
+    assert cfg.github_headers["Authorization"] == "Bearer test-pat"
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        cfg.github_owner = "other"
+    with pytest.raises(TypeError):
+        cfg.ado_headers["Authorization"] = "Basic x"
+
+    # Ordinary settings are fixed for the instance's lifetime
+    monkeypatch.setenv("GITHUB_OWNER", "other-owner")
+    assert config.get_config() is cfg
+
+
+def test_unresolved_keyvault_reference_fails_fast_until_resolved(monkeypatch):
+    """Test an unresolved reference is cached as an error, and resolving it reloads the snapshot."""
+    monkeypatch.setenv("GH_WORKFLOW_DISPATCH_PAT", KEYVAULT_REFERENCE)
+    monkeypatch.setenv("ADO_WORK_ITEM_PAT", KEYVAULT_REFERENCE)
+    cfg = config.get_config()
+
+    assert cfg.keyvault_unresolved == ("GH_WORKFLOW_DISPATCH_PAT", "ADO_WORK_ITEM_PAT")
+    assert not cfg.github_headers and not cfg.ado_configured
+    with mock.patch("function_app.dispatch.http_session.post") as mock_post, \
+         mock.patch("function_app.ado_client.http_session.get") as mock_get:
+        success, message = dispatch_workflow(615, "Feature description")
+        assert ado_client.get_work_item(615) is None
+    assert success is False
+    assert "Key Vault secret not accessible" in message
+    mock_post.assert_not_called()
+    mock_get.assert_not_called()
+    assert config.get_config() is cfg
+
+    # The platform resolves the reference - next call picks it up
+    monkeypatch.setenv("GH_WORKFLOW_DISPATCH_PAT", "resolved-pat")
+    reloaded = config.get_config()
+    assert reloaded is not cfg
+    assert reloaded.keyvault_unresolved == ("ADO_WORK_ITEM_PAT",)
+    assert reloaded.github_headers["Authorization"] == "Bearer resolved-pat"
+
+
+def test_validate_default_target_optional_with_routes(monkeypatch):
+    """Test GITHUB_OWNER / GITHUB_REPO are only required without a routing table."""
+    monkeypatch.delenv("GITHUB_OWNER")
+    monkeypatch.delenv("GITHUB_REPO")
+    config.reset_config()
+    cfg = config.get_config()
+
+    assert cfg.validate() == (False, ["GITHUB_OWNER", "GITHUB_REPO"])
+    assert cfg.validate(require_default_target=False) == (True, [])
@@ -0,0 +1,85 @@
+"""
+Unit tests for bounded feature_description assembly.
+"""
+from function_app import context_builder
+from function_app.context_builder import CLARIFICATIONS_HEADER, TRUNCATION_MARKER, build_feature_context
+
+
+def _issue(issue_id, comments=(), description="", changed_date=None):
+    return {
+        "id": issue_id,
+        "title": f"Question {issue_id}",
+        "description": description,
+        "comments": list(comments),
+        "changed_date": changed_date,
+    }
+
+
+def test_strip_html_from_ado_comment():
+    """Test ADO comment HTML is reduced to readable Markdown."""
+    html = "<div>Use <b>OAuth</b>&nbsp;2.0</div><div><br></div><ul><li>Google</li><li>GitHub &amp; GitLab</li></ul>"
+
+    assert context_builder.strip_html(html) == "Use **OAuth** 2.0\n\n- Google\n- GitHub & GitLab"
+    assert context_builder.strip_html("plain &lt;text&gt;") == "plain <text>"
+    assert context_builder.strip_html(None) == ""
+
+
+def test_small_context_matches_unbudgeted_format():
+    """Test everything is kept, in the established layout, when under budget."""
+    context = build_feature_context(
+        "create a hockey simulator game",
+        [_issue(1, comments=["<p>Answer one</p>"], description="<div>Which league?</div>")],
+    )
+
+    assert context.text == (
+        "create a hockey simulator game\n\n"
+        f"{CLARIFICATIONS_HEADER}\n\n"
+        "--- Closed Issue #1: Question 1 ---\n"
+        "Description: Which league?\n"
+        "Comments:\n"
+        "- Answer one"
+    )
+    assert context.truncated is False
+    assert context.included_issues == 1
+
+
+def test_budget_ranks_recent_issues_and_omits_the_rest():
+    """Test newest Issues are kept and older ones are dropped with a marker."""
+    issues = [
+        _issue(issue_id, comments=["x" * 300], changed_date=f"2025-01-{issue_id:02d}T00:00:00Z")
+        for issue_id in range(1, 11)
+    ]
+
+    context = build_feature_context("base", issues, max_bytes=1200, max_tokens=10_000)
+
+    assert context.size_bytes <= 1200
+    assert context.text.index("Issue #10") < context.text.index("Issue #9")
+    assert "Issue #1:" not in context.text
+    assert "more closed Issues omitted" in context.text
+    assert context.included_issues + context.truncated_issues + context.omitted_issues == 10
+    # Nothing is lost from the full text
+    assert all(f"Issue #{issue_id}:" in context.full_text for issue_id in range(1, 11))
+
+
+def test_token_budget_and_comment_cap():
+    """Test the token budget binds before the byte budget and long comments are capped."""
+    context = build_feature_context(
+        "base",
+        [_issue(1, comments=["y" * 5000])],
+        max_bytes=100_000,
+        max_tokens=1000,
+        max_comment_chars=2000,
+    )
+
+    assert len(context.text) <= 4000
+    assert TRUNCATION_MARKER in context.text
+    assert "y" * 5000 in context.full_text
+
+
+def test_oversized_base_description_is_cut():
+    """Test a huge base description still respects the byte budget (multi-byte safe)."""
+    context = build_feature_context("é" * 10_000, [], max_bytes=1000, max_tokens=10_000)
+
+    assert context.size_bytes <= 1000
+    assert context.text.endswith(TRUNCATION_MARKER)
+    assert context.full_text == "é" * 10_000
@@ -0,0 +1,182 @@
+"""
+Unit tests for create-ado-issues.py: local Issue title cleanup and the
+concurrent LLM stage.
+"""
+import importlib.util
+import json
+import os
+import sys
+import threading
+import time
+from unittest import mock
+
+import pytest
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+SCRIPTS_DIR = os.path.join(ROOT, ".github", "scripts")
+sys.path.insert(0, SCRIPTS_DIR)
+sys.path.insert(0, os.path.join(ROOT, "function_app"))
+
+_spec = importlib.util.spec_from_file_location("create_ado_issues", os.path.join(SCRIPTS_DIR, "create-ado-issues.py"))
+create_ado_issues = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(create_ado_issues)
+
+clean_topic_locally = create_ado_issues.clean_topic_locally
+
+
+class FakeAPIError(Exception):
+    """Stand-in for openai.APIStatusError (status_code + response headers)."""
+
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.response = mock.Mock(headers=headers or {})
+
+
+class FakeClient:
+    """OpenAI-shaped client whose create() records concurrency and replays scripted errors."""
+
+    def __init__(self, errors=(), delay=0.0):
+        self.errors = list(errors)
+        self.delay = delay
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        self.chat = mock.Mock()
+        self.chat.completions.create.side_effect = self._create
+
+    def _create(self, **kwargs):
+        with self._lock:
+            self.calls += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            error = self.errors.pop(0) if self.errors else None
+        try:
+            if self.delay:
+                time.sleep(self.delay)
+            if error:
+                raise error
+            return {"model": kwargs.get("model")}
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+@pytest.fixture(autouse=True)
+def reset_llm_slots():
+    """Restore the default in-flight limit after each test."""
+    yield
+    create_ado_issues.configure_llm_concurrency(create_ado_issues.LLM_MAX_IN_FLIGHT)
+
+
+def test_question_prefixes_are_stripped():
+    """Test repeated "Question N:" style prefixes are all removed."""
+    assert clean_topic_locally("Question 2: Question 2: Data retention") == "Data retention"
+    assert clean_topic_locally("Q3 - Export formats") == "Export formats"
+    assert clean_topic_locally("#4. Storage tier") == "Storage tier"
+    assert clean_topic_locally("5) Regions") == "Regions"
+
+
+def test_markdown_markers_are_stripped():
+    """Test heading, emphasis and code markers around the topic are removed."""
+    assert clean_topic_locally("## **Question 1: `Retention`**") == "Retention"
+    assert clean_topic_locally("> _Tier choice_") == "Tier choice"
+
+
+def test_plain_topic_is_unchanged():
+    """Test a topic with nothing to strip comes back as is (numbers inside are kept)."""
+    assert clean_topic_locally("Support 2 regions") == "Support 2 regions"
+
+
+def test_unsuitable_topics_are_left_to_the_llm():
+    """Test empty, multi-line, overlong, table and HTML topics return None."""
+    assert clean_topic_locally("") is None
+    assert clean_topic_locally(None) is None
+    assert clean_topic_locally("Question 1:") is None
+    assert clean_topic_locally("Retention\nand tiers") is None
+    assert clean_topic_locally("x" * (create_ado_issues.TOPIC_MAX_CHARS + 1)) is None
+    assert clean_topic_locally("| Option | Answer |") is None
+    assert clean_topic_locally("Retention <b>policy</b>") is None
+
+
+def test_chat_completion_never_exceeds_max_in_flight():
+    """Test concurrent chat_completion calls never hold more than the configured slots."""
+    create_ado_issues.configure_llm_concurrency(2)
+    client = FakeClient(delay=0.02)
+
+    threads = [threading.Thread(target=create_ado_issues.chat_completion, args=(client,), kwargs={"model": "m"}) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert client.calls == 8
+    assert client.max_in_flight == 2
+
+
+def test_chat_completion_retries_429_with_retry_after(monkeypatch):
+    """Test a 429 is retried after the server-requested Retry-After wait."""
+    sleeps = []
+    monkeypatch.setattr(create_ado_issues.time, "sleep", sleeps.append)
+    client = FakeClient(errors=[FakeAPIError(429, {"retry-after": "7"}), FakeAPIError(429, {"retry-after-ms": "250"})])
+
+    response = create_ado_issues.chat_completion(client, model="m")
+
+    assert response == {"model": "m"}
+    assert client.calls == 3
+    assert sleeps == [7.0, 0.25]
+
+
+def test_chat_completion_does_not_retry_client_errors(monkeypatch):
+    """Test a non-retryable status is raised on the first attempt."""
+    monkeypatch.setattr(create_ado_issues.time, "sleep", lambda s: pytest.fail("should not sleep"))
+    client = FakeClient(errors=[FakeAPIError(400)])
+
+    with pytest.raises(FakeAPIError):
+        create_ado_issues.chat_completion(client, model="m")
+    assert client.calls == 1
+
+
+def test_results_print_in_question_order_when_prepared_out_of_order(tmp_path, monkeypatch, capsys):
+    """Test buffered per-question output and results follow question order, not completion order."""
+    questions = [{"topic": f"Topic {n}", "question": f"Question text {n}?"} for n in (1, 2, 3)]
+    questions_path = tmp_path / "questions.json"
+    questions_path.write_text(json.dumps(questions))
+    last_done = threading.Event()
+
+    def fake_prepare(i, q, args, api_key, client):
+        # Question 1 finishes only after question 3, so completion order is 2/3, then 1
+        if i == 1:
+            assert last_done.wait(5)
+        create_ado_issues.log(f"prepared {i}")
+        if i == 3:
+            last_done.set()
+        return {"question_num": i, "title": f"Q{i}: {q['topic']}", "description": "body",
+                "tags": "clarification", "idempotency_key": f"42-{i}"}
+
+    def fake_create(feature_id, issue, existing_keys):
+        return {"idempotency_key": issue["idempotency_key"], "title": issue["title"], "status": "created", "id": 100 + issue["question_num"]}
+
+    monkeypatch.setattr(create_ado_issues, "prepare_issue", fake_prepare)
+    monkeypatch.setattr(create_ado_issues, "create_issue_if_missing", fake_create)
+    monkeypatch.setattr(create_ado_issues, "get_existing_idempotency_keys", lambda feature_id: {})
+    for name in ("ADO_ORG_URL", "ADO_PROJECT"):
+        monkeypatch.setenv(name, "")
+    monkeypatch.setenv("ADO_WORK_ITEM_PAT", "pat")
+    monkeypatch.delenv("AZURE_OPENAI_API_KEY", raising=False)
+    monkeypatch.delenv("GITHUB_STEP_SUMMARY", raising=False)
+    monkeypatch.setattr(sys, "argv", [
+        "create-ado-issues.py", "--questions-json", str(questions_path), "--feature-id", "42",
+        "--branch", "feature/x", "--org-url", "https://dev.azure.com/org", "--project", "proj",
+        "--llm-concurrency", "3",
+    ])
+
+    assert create_ado_issues.main() == 0
+
+    out = capsys.readouterr().out
+    prepared_lines = [line for line in out.splitlines() if line.startswith("prepared ")]
+    assert prepared_lines == ["prepared 1", "prepared 2", "prepared 3"]
+    rows = [line for line in out.splitlines() if line.startswith("| ") and "created" in line]
+    assert [row.split("|")[1].strip() for row in rows] == ["1", "2", "3"]
+    assert "| 101 |" in rows[0]
@@ -0,0 +1,204 @@
+"""
+Unit tests for the TTL cache and webhook deduplication layer.
+"""
+from unittest import mock
+
+import pytest
+
+from function_app import dedup, dispatch, job_queue, pipeline
+from function_app.cache import TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_ttl_cache_expiry_and_lru():
+    """Test entries expire after their TTL and the least recently used is evicted."""
+    clock = FakeClock()
+    cache = TTLCache(maxsize=2, ttl_seconds=10, clock=clock)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # a is now most recently used
+    cache.set("c", 3)
+
+    assert "b" not in cache
+    assert cache.get("a") == 1
+    clock.now += 11
+    assert cache.get("a") is None
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_ttl_cache_add_is_set_if_absent():
+    """Test add only stores when the key is absent or expired."""
+    clock = FakeClock()
+    cache = TTLCache(ttl_seconds=5, clock=clock)
+    assert cache.add("k", "first") is True
+    assert cache.add("k", "second") is False
+    assert cache.get("k") == "first"
+    clock.now += 6
+    assert cache.add("k", "third") is True
+
+
+def _deduplicator(cooldown_seconds=60):
+    return dedup.Deduplicator(dedup.InMemoryDedupStore(), revision_ttl_seconds=3600, cooldown_seconds=cooldown_seconds)
+
+
+def test_duplicate_revision_is_suppressed():
+    """Test the same (work item, rev) only dispatches once."""
+    deduplicator = _deduplicator(cooldown_seconds=0)
+
+    assert deduplicator.check(615, 5) == (True, "new revision")
+    should_dispatch, reason = deduplicator.check(615, 5)
+    assert should_dispatch is False
+    assert "duplicate revision" in reason
+    assert deduplicator.check(615, 6)[0] is True
+    assert deduplicator.check(616, 5)[0] is True
+
+    stats = deduplicator.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 3
+
+
+def test_cooldown_collapses_burst():
+    """Test a column change followed by a field change dispatches once."""
+    deduplicator = _deduplicator(cooldown_seconds=60)
+
+    assert deduplicator.check(615, 5)[0] is True
+    should_dispatch, reason = deduplicator.check(615, 6)
+    assert should_dispatch is False
+    assert "60s" in reason
+    assert deduplicator.stats()["cooldown"] == 1
+
+
+def test_cooldown_does_not_keep_newer_revision_claim():
+    """Test a newer rev suppressed by the cooldown can dispatch once the cooldown expires."""
+    clock = FakeClock()
+    store = dedup.InMemoryDedupStore()
+    store.cache = TTLCache(ttl_seconds=3600, clock=clock)
+    deduplicator = dedup.Deduplicator(store, revision_ttl_seconds=3600, cooldown_seconds=60)
+
+    assert deduplicator.check(615, 5)[0] is True
+    assert deduplicator.check(615, 6)[0] is False  # same burst, newer rev
+    assert store.get("rev-615-6") is None
+
+    clock.now += 61
+    assert deduplicator.check(615, 6) == (True, "new revision")
+    assert deduplicator.check(615, 5)[0] is False
+
+
+def test_release_lets_redelivery_through():
+    """Test a failed dispatch releases its claims."""
+    deduplicator = _deduplicator()
+
+    assert deduplicator.check(615, 5)[0] is True
+    deduplicator.release(615, 5)
+    assert deduplicator.check(615, 5)[0] is True
+
+
+def test_superseded_revision():
+    """Test queued jobs older than the newest seen revision are superseded."""
+    deduplicator = _deduplicator()
+    deduplicator.note_revision(615, 5)
+    deduplicator.note_revision(615, 7)
+    deduplicator.note_revision(615, 6)
+
+    assert deduplicator.is_superseded(615, 5) is True
+    assert deduplicator.is_superseded(615, 7) is False
+    assert deduplicator.is_superseded(615, None) is False
+
+
+@mock.patch("function_app.dispatch.dispatch_workflow", return_value=(True, "Workflow dispatched successfully"))
+@mock.patch("function_app.ado_client.get_child_issues", return_value=[])
+def test_pipeline_skips_duplicate_hook(mock_children, mock_dispatch, monkeypatch):
+    """Test the pipeline dispatches a redelivered hook only once."""
+    monkeypatch.setenv("DEDUP_BACKEND", "memory")
+    dedup.reset_deduplicator()
+    resource = {
+        "workItemId": 615,
+        "rev": 5,
+        "revision": {"rev": 5, "fields": {"System.Title": "t", "System.ChangedBy": "PO <po@example.com>"}},
+    }
+
+    first = pipeline.process_work_item(615, resource, "corr-1")
+    second = pipeline.process_work_item(615, resource, "corr-2")
+
+    assert first == (True, "Workflow dispatched successfully")
+    assert second[0] is True
+    assert second[1].startswith(dedup.SKIPPED)
+    assert mock_dispatch.call_count == 1
+    dedup.reset_deduplicator()
+
+
+@mock.patch("function_app.dispatch.dispatch_workflow", return_value=(True, "Workflow dispatched successfully"))
+@mock.patch("function_app.ado_client.get_child_issues", return_value=[])
+def test_worker_drops_superseded_job(mock_children, mock_dispatch, monkeypatch):
+    """Test only the latest revision of a queued burst is dispatched."""
+    monkeypatch.setenv("DEDUP_BACKEND", "memory")
+    dedup.reset_deduplicator()
+    deduplicator = dedup.get_deduplicator()
+
+    jobs = []
+    for rev in (5, 6):
+        resource = {"workItemId": 615, "rev": rev, "revision": {"rev": rev, "fields": {"System.Title": "t"}}}
+        jobs.append(job_queue.build_job(615, resource, f"corr-{rev}"))
+        deduplicator.note_revision(615, rev)
+
+    with mock.patch("function_app.ado_client.get_work_item_revision", return_value=None):
+        results = [pipeline.process_job(job) for job in jobs]
+
+    assert results[0] == (True, f"{dedup.SKIPPED}: superseded by a newer revision")
+    assert results[1] == (True, "Workflow dispatched successfully")
+    assert mock_dispatch.call_count == 1
+    dedup.reset_deduplicator()
+
+
+@mock.patch("function_app.ado_client.get_child_issues", return_value=[])
+def test_failed_deferred_retry_releases_claim(mock_children, monkeypatch):
+    """Test a deferred retry that finally fails releases the claim of its first attempt."""
+    monkeypatch.setenv("DEDUP_BACKEND", "memory")
+    dedup.reset_deduplicator()
+    resource = {
+        "workItemId": 615,
+        "rev": 5,
+        "revision": {"rev": 5, "fields": {"System.Title": "t", "System.ChangedBy": "PO <po@example.com>"}},
+    }
+
+    with mock.patch("function_app.dispatch.dispatch_workflow", return_value=(False, f"{dispatch.RETRY_SCHEDULED}: attempt 2")):
+        assert pipeline.process_work_item(615, resource, "corr-1", defer_retries=True)[0] is False
+    with mock.patch("function_app.dispatch.dispatch_workflow", return_value=(False, "Dispatch failed: 503")):
+        assert pipeline.process_work_item(615, resource, "corr-1", attempt=1, defer_retries=True)[0] is False
+
+    # ADO's redelivery of the hook is let through again
+    assert dedup.get_deduplicator().check(615, 5) == (True, "new revision")
+    dedup.reset_deduplicator()
+
+
+@mock.patch("function_app.ado_client.get_child_issues", return_value=[])
+def test_unexpected_error_releases_claim(mock_children, monkeypatch):
+    """Test an exception after the claim (a failing retry enqueue) releases it and propagates."""
+    monkeypatch.setenv("DEDUP_BACKEND", "memory")
+    dedup.reset_deduplicator()
+    resource = {
+        "workItemId": 615,
+        "rev": 5,
+        "revision": {"rev": 5, "fields": {"System.Title": "t", "System.ChangedBy": "PO <po@example.com>"}},
+    }
+
+    def dispatch_with_failing_scheduler(**kwargs):
+        kwargs["retry_scheduler"](1.0, 1)
+
+    queue = mock.Mock()
+    queue.enqueue.side_effect = OSError("queue unavailable")
+    with mock.patch("function_app.job_queue.get_job_queue", return_value=queue), \
+            mock.patch("function_app.dispatch.dispatch_workflow", side_effect=dispatch_with_failing_scheduler):
+        with pytest.raises(OSError):
+            pipeline.process_work_item(615, resource, "corr-1", defer_retries=True)
+
+    assert dedup.get_deduplicator().check(615, 5) == (True, "new revision")
+    dedup.reset_deduplicator()
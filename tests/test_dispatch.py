@@ -7,10 +7,10 @@ from unittest import mock
 import pytest
 import requests
 
-from function_app.dispatch import dispatch_workflow
+from function_app.dispatch import RETRY_SCHEDULED, dispatch_workflow
 
 
-@mock.patch("function_app.dispatch.requests.post")
+@mock.patch("function_app.dispatch.http_session.post")
 def test_dispatch_workflow_success(mock_post):
     """Test successful workflow dispatch."""
     os.environ["GITHUB_OWNER"] = "test-owner"
@@ -24,15 +24,39 @@ def test_dispatch_workflow_success(mock_post):
     
     success, message = dispatch_workflow(
         work_item_id=123,
-        branch_hint="feature/wi-123"
+        description_placeholder="Feature description"
     )
     
     assert success is True
     assert message == "dispatched"
     mock_post.assert_called_once()
+    assert "context_sha256" not in mock_post.call_args.kwargs["json"]["inputs"]
 
 
-@mock.patch("function_app.dispatch.requests.post")
+@mock.patch("function_app.dispatch.http_session.post")
+def test_dispatch_workflow_context_sha256_input(mock_post):
+    """Test a handed-off context is dispatched as the context_sha256 input."""
+    os.environ["GITHUB_OWNER"] = "test-owner"
+    os.environ["GITHUB_REPO"] = "test-repo"
+    os.environ["GH_WORKFLOW_DISPATCH_PAT"] = "test-pat"
+    
+    mock_response = mock.Mock()
+    mock_response.status_code = 204
+    mock_post.return_value = mock_response
+    
+    success, _ = dispatch_workflow(
+        work_item_id=123,
+        description_placeholder="Summary",
+        context_sha256="a" * 64
+    )
+    
+    assert success is True
+    inputs = mock_post.call_args.kwargs["json"]["inputs"]
+    assert inputs["context_sha256"] == "a" * 64
+    assert inputs["feature_description"] == "Summary"
+
+
+@mock.patch("function_app.dispatch.http_session.post")
 def test_dispatch_workflow_missing_env_vars(mock_post):
     """Test dispatch fails with missing environment variables."""
     # Clear env vars
@@ -41,7 +65,7 @@ def test_dispatch_workflow_missing_env_vars(mock_post):
     
     success, message = dispatch_workflow(
         work_item_id=123,
-        branch_hint="feature/wi-123"
+        description_placeholder="Feature description"
     )
     
     assert success is False
@@ -49,7 +73,7 @@ def test_dispatch_workflow_missing_env_vars(mock_post):
     mock_post.assert_not_called()
 
 
-@mock.patch("function_app.dispatch.requests.post")
+@mock.patch("function_app.dispatch.http_session.post")
 def test_dispatch_workflow_client_error_no_retry(mock_post):
     """Test dispatch doesn't retry on client errors (404, 401, etc.)."""
     os.environ["GITHUB_OWNER"] = "test-owner"
@@ -60,11 +84,12 @@ def test_dispatch_workflow_client_error_no_retry(mock_post):
     mock_response = mock.Mock()
     mock_response.status_code = 404
     mock_response.text = "Not Found"
+    mock_response.headers = {}
     mock_post.return_value = mock_response
     
     success, message = dispatch_workflow(
         work_item_id=123,
-        branch_hint="feature/wi-123"
+        description_placeholder="Feature description"
     )
     
     assert success is False
@@ -73,7 +98,7 @@ def test_dispatch_workflow_client_error_no_retry(mock_post):
     assert mock_post.call_count == 1
 
 
-@mock.patch("function_app.dispatch.requests.post")
+@mock.patch("function_app.dispatch.http_session.post")
 @mock.patch("function_app.dispatch.time.sleep")
 def test_dispatch_workflow_retry_on_500(mock_sleep, mock_post):
     """Test dispatch retries on server errors (500)."""
@@ -85,6 +110,7 @@ def test_dispatch_workflow_retry_on_500(mock_sleep, mock_post):
     mock_response_500 = mock.Mock()
     mock_response_500.status_code = 500
     mock_response_500.text = "Internal Server Error"
+    mock_response_500.headers = {}
     
     mock_response_204 = mock.Mock()
     mock_response_204.status_code = 204
@@ -93,7 +119,7 @@ def test_dispatch_workflow_retry_on_500(mock_sleep, mock_post):
     
     success, message = dispatch_workflow(
         work_item_id=123,
-        branch_hint="feature/wi-123"
+        description_placeholder="Feature description"
     )
     
     assert success is True
@@ -104,8 +130,9 @@ def test_dispatch_workflow_retry_on_500(mock_sleep, mock_post):
     assert mock_sleep.call_count == 2
 
 
-@mock.patch("function_app.dispatch.requests.post")
-def test_dispatch_workflow_timeout(mock_post):
+@mock.patch("function_app.dispatch.http_session.post")
+@mock.patch("function_app.dispatch.time.sleep")
+def test_dispatch_workflow_timeout(mock_sleep, mock_post):
     """Test dispatch handles timeout."""
     os.environ["GITHUB_OWNER"] = "test-owner"
     os.environ["GITHUB_REPO"] = "test-repo"
@@ -116,10 +143,73 @@ def test_dispatch_workflow_timeout(mock_post):
     
     success, message = dispatch_workflow(
         work_item_id=123,
-        branch_hint="feature/wi-123"
+        description_placeholder="Feature description"
     )
     
     assert success is False
     assert "timeout" in message.lower()
     # Should retry 3 times
     assert mock_post.call_count == 3
+
+
+@mock.patch("function_app.dispatch.http_session.post")
+@mock.patch("function_app.dispatch.time.sleep")
+def test_dispatch_workflow_honors_retry_after(mock_sleep, mock_post):
+    """Test a rate-limited 403 with Retry-After is retried after the requested delay."""
+    os.environ["GITHUB_OWNER"] = "test-owner"
+    os.environ["GITHUB_REPO"] = "test-repo"
+    os.environ["GH_WORKFLOW_DISPATCH_PAT"] = "test-pat"
+    
+    throttled = mock.Mock()
+    throttled.status_code = 403
+    throttled.text = "You have exceeded a secondary rate limit"
+    throttled.headers = {"Retry-After": "7"}
+    
+    accepted = mock.Mock()
+    accepted.status_code = 204
+    
+    mock_post.side_effect = [throttled, accepted]
+    
+    success, message = dispatch_workflow(work_item_id=123)
+    
+    assert success is True
+    mock_sleep.assert_called_once_with(7.0)
+
+
+@mock.patch("function_app.dispatch.http_session.post")
+@mock.patch("function_app.dispatch.time.sleep")
+def test_dispatch_workflow_defers_retry(mock_sleep, mock_post):
+    """Test retryable failures are handed to retry_scheduler instead of sleeping."""
+    os.environ["GITHUB_OWNER"] = "test-owner"
+    os.environ["GITHUB_REPO"] = "test-repo"
+    os.environ["GH_WORKFLOW_DISPATCH_PAT"] = "test-pat"
+    
+    mock_response = mock.Mock()
+    mock_response.status_code = 502
+    mock_response.text = "Bad Gateway"
+    mock_response.headers = {}
+    mock_post.return_value = mock_response
+    
+    scheduled = []
+    success, message = dispatch_workflow(
+        work_item_id=123,
+        retry_scheduler=lambda delay, next_attempt: scheduled.append((delay, next_attempt))
+    )
+    
+    assert success is False
+    assert message.startswith(RETRY_SCHEDULED)
+    assert mock_post.call_count == 1
+    mock_sleep.assert_not_called()
+    assert scheduled[0][1] == 1
+    assert 1.6 <= scheduled[0][0] <= 2.4  # RETRY_BACKOFF_DELAYS[0] with 20% jitter
+    
+    # Resuming at the last attempt gives up instead of scheduling again
+    scheduled.clear()
+    success, message = dispatch_workflow(
+        work_item_id=123,
+        retry_scheduler=lambda delay, next_attempt: scheduled.append((delay, next_attempt)),
+        attempt=2
+    )
+    assert success is False
+    assert "after 3 attempts" in message
+    assert scheduled == []
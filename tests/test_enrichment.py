@@ -0,0 +1,67 @@
+"""
+Unit tests for closed Issue enrichment and its comment cache.
+"""
+from unittest import mock
+
+from function_app import ado_client, enrichment
+
+
+def _issues(revs):
+    return [
+        {"id": issue_id, "title": f"Issue {issue_id}", "description": "", "rev": rev, "changed_date": f"2025-01-0{rev}T00:00:00Z"}
+        for issue_id, rev in revs.items()
+    ]
+
+
+@mock.patch("function_app.ado_client.get_work_item_comments")
+@mock.patch("function_app.ado_client.get_child_issues")
+def test_only_changed_issues_are_refetched(mock_children, mock_comments):
+    """Test a repeat run fetches comments only for Issues whose rev moved."""
+    enrichment.clear_cache()
+    mock_comments.side_effect = lambda wi_id, raise_on_error=False: [f"answer {wi_id}"]
+
+    mock_children.return_value = _issues({1: 3, 2: 4, 3: 2})
+    first = enrichment.get_closed_issues_with_comments(615)
+    assert mock_comments.call_count == 3
+    assert [issue["comments"] for issue in first] == [["answer 1"], ["answer 2"], ["answer 3"]]
+
+    mock_comments.reset_mock()
+    mock_children.return_value = _issues({1: 3, 2: 5, 3: 2})
+    second = enrichment.get_closed_issues_with_comments(615)
+
+    mock_comments.assert_called_once_with(2, raise_on_error=True)
+    assert [issue["comments"] for issue in second] == [["answer 1"], ["answer 2"], ["answer 3"]]
+    assert enrichment.get_cache_stats()["hits"] == 2
+    enrichment.clear_cache()
+
+
+@mock.patch("function_app.ado_client.get_work_item_comments")
+@mock.patch("function_app.ado_client.get_child_issues")
+def test_failed_fetch_is_not_cached(mock_children, mock_comments):
+    """Test a failed comment fetch is retried on the next run instead of caching []."""
+    enrichment.clear_cache()
+    mock_children.return_value = _issues({1: 3})
+    mock_comments.side_effect = ado_client.requests.exceptions.Timeout()
+
+    assert enrichment.get_closed_issues_with_comments(615)[0]["comments"] == []
+
+    mock_comments.side_effect = lambda wi_id, raise_on_error=False: ["late answer"]
+    assert enrichment.get_closed_issues_with_comments(615)[0]["comments"] == ["late answer"]
+    assert mock_comments.call_count == 2
+    enrichment.clear_cache()
+
+
+@mock.patch("function_app.ado_client.get_work_item_comments")
+@mock.patch("function_app.ado_client.get_child_issues")
+def test_issue_without_version_is_always_fetched(mock_children, mock_comments):
+    """Test Issues with no rev/ChangedDate are never served from cache."""
+    enrichment.clear_cache()
+    mock_children.return_value = [{"id": 1, "title": "t", "description": ""}, {"title": "no id"}]
+    mock_comments.return_value = ["answer"]
+
+    enrichment.get_closed_issues_with_comments(615)
+    issues = enrichment.get_closed_issues_with_comments(615)
+
+    assert mock_comments.call_count == 2
+    assert [issue["id"] for issue in issues] == [1]
+    enrichment.clear_cache()
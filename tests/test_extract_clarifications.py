@@ -0,0 +1,102 @@
+"""
+Unit tests for section chunking and streamed JSON parsing in extract-clarifications-llm.py.
+"""
+import importlib.util
+import os
+import sys
+
+import pytest
+
+SCRIPTS_DIR = os.path.join(os.path.dirname(__file__), "..", ".github", "scripts")
+sys.path.insert(0, SCRIPTS_DIR)
+
+_spec = importlib.util.spec_from_file_location("extract_clarifications_llm", os.path.join(SCRIPTS_DIR, "extract-clarifications-llm.py"))
+extract = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(extract)
+
+
+def _feed_all(parser, pieces):
+    items = []
+    for piece in pieces:
+        items.extend(parser.feed(piece))
+    return items
+
+
+def test_split_keeps_preamble_with_first_section():
+    """Test the preamble joins the first section and sections are packed up to max_chars."""
+    spec = "# Title\nmeta\n## A\naaa\n## B\nbbb\n## C\nccc\n"
+
+    chunks = extract.split_spec_sections(spec, max_chars=32)
+
+    assert chunks == ["# Title\nmeta\n## A\naaa\n## B\nbbb\n", "## C\nccc\n"]
+    assert "".join(chunks) == spec
+
+
+def test_split_handles_log_timestamps_and_oversized_sections():
+    """Test timestamped headers split and an oversized section stays whole."""
+    spec = "2025-10-27T14:30:00.1234567Z ## A\n" + "x" * 50 + "\n2025-10-27T14:30:01.0000000Z ## B\nb\n### not a split\n"
+
+    chunks = extract.split_spec_sections(spec, max_chars=20)
+
+    assert len(chunks) == 2
+    assert chunks[1].endswith("### not a split\n")
+
+
+def test_parser_yields_objects_as_they_complete():
+    """Test objects are yielded as soon as their closing brace arrives, ignoring a code fence."""
+    parser = extract.IncrementalJSONArrayParser()
+
+    assert parser.feed('```json\n[{"topic": "a"}, {"to') == [{"topic": "a"}]
+    assert parser.feed('pic": "b"}') == [{"topic": "b"}]
+    assert parser.feed(']\n```') == []
+    assert parser.done
+    parser.close()
+
+
+def test_parser_waits_for_delimiter_after_scalars():
+    """Test a number at the end of the buffer is not taken until a ',' or ']' follows."""
+    parser = extract.IncrementalJSONArrayParser()
+
+    assert parser.feed("[12") == []
+    assert parser.feed("3") == []
+    assert parser.feed(", tru") == [123]
+    assert parser.feed("e ") == []
+    assert parser.feed("]") == [True]
+    parser.close()
+
+
+def test_parser_matches_one_shot_parse_for_any_split():
+    """Test feeding the stream in arbitrary pieces yields the same elements as json.loads."""
+    text = '[1, 2.5, "x]", {"a": [1, 2]}, null, -7, [3]]'
+    expected = [1, 2.5, "x]", {"a": [1, 2]}, None, -7, [3]]
+
+    for size in range(1, len(text) + 1):
+        parser = extract.IncrementalJSONArrayParser()
+        assert _feed_all(parser, [text[i:i + size] for i in range(0, len(text), size)]) == expected
+        parser.close()
+
+
+def test_parser_close_rejects_incomplete_array():
+    """Test close raises when the stream ends before ']' or without any array."""
+    parser = extract.IncrementalJSONArrayParser()
+    parser.feed('[{"topic": "a"}, 4')
+    with pytest.raises(ValueError):
+        parser.close()
+
+    with pytest.raises(ValueError):
+        extract.IncrementalJSONArrayParser().close()
+
+
+def test_first_incremental_run_uses_chunked_extraction(tmp_path, monkeypatch):
+    """Test a run without clarifications.md extracts whole sections and fingerprints the result."""
+    spec = "# F\n\n## Requirements\n\nKeep events [NEEDS CLARIFICATION: How long should events be kept?]\n"
+    question = {"topic": "Retention", "question": "How long should events be kept?", "context": "c", "answer_options": ""}
+    monkeypatch.setattr(extract, "extract_markers_with_llm", lambda content: [dict(question)])
+    monkeypatch.setattr(extract, "extract_records_with_llm", lambda *args: pytest.fail("per-marker extraction on a first run"))
+    output = tmp_path / "clarifications.md"
+
+    assert extract.update_clarifications_md(spec, output, "feature") is True
+
+    content = output.read_text()
+    assert "## Question 1: Retention" in content
+    assert extract.parse_clarifications(content).fingerprints() == set(extract.fingerprint_markers(list(extract.scan_markers(spec))))
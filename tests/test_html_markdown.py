@@ -0,0 +1,58 @@
+"""
+Unit tests for single-pass HTML to Markdown conversion.
+"""
+from function_app.html_markdown import html_to_markdown
+
+
+def test_ado_description_blocks_and_inline_markup():
+    """Test headings, paragraphs, line breaks, emphasis and entities."""
+    html = (
+        "<h2>Auth</h2><div>Use <b>OAuth</b>&nbsp;2.0 &amp; <i>PKCE</i></div>"
+        "<div><br></div><p>line one<br>line <code>two</code></p>"
+    )
+
+    assert html_to_markdown(html) == "## Auth\n\nUse **OAuth** 2.0 & *PKCE*\n\nline one\nline `two`"
+
+
+def test_nested_lists_and_links():
+    """Test ordered/unordered nesting, list items wrapping divs, and links."""
+    html = (
+        '<ol><li><div>Pick a provider</div><ul><li><a href="https://example.com/idp">IdP docs</a></li>'
+        "<li>fallback</li></ul></li><li>Configure</li></ol>"
+    )
+
+    assert html_to_markdown(html) == (
+        "1. Pick a provider\n"
+        "   - [IdP docs](https://example.com/idp)\n"
+        "   - fallback\n"
+        "2. Configure"
+    )
+
+
+def test_table_becomes_pipe_table():
+    """Test tables render as GFM with a header row, padded rows and escaped pipes."""
+    html = (
+        "<table><tr><th>Option</th><th>Answer</th></tr>"
+        "<tr><td>A</td><td>Yes | no</td></tr><tr><td>B</td></tr></table>"
+    )
+
+    assert html_to_markdown(html) == (
+        "| Option | Answer |\n"
+        "|---|---|\n"
+        "| A | Yes \\| no |\n"
+        "| B |  |"
+    )
+
+
+def test_pre_blockquote_and_discarded_content():
+    """Test preformatted text is kept verbatim, quotes are prefixed and scripts dropped."""
+    html = "<pre>  a\n  b</pre><blockquote><p>quoted</p><p>two</p></blockquote><script>x()</script>end"
+
+    assert html_to_markdown(html) == "```\n  a\n  b\n```\n\n> quoted\n>\n> two\n\nend"
+
+
+def test_empty_and_plain_input():
+    """Test empty input and plain text with entities."""
+    assert html_to_markdown(None) == ""
+    assert html_to_markdown("") == ""
+    assert html_to_markdown("plain &lt;text&gt;  here") == "plain <text> here"
@@ -0,0 +1,82 @@
+"""
+Unit tests for pooled HTTP sessions.
+"""
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from function_app import http_session
+
+
+class _KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = b"{}"
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def local_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _KeepAliveHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    http_session.reset_sessions()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+    http_session.reset_sessions()
+
+
+def test_session_is_shared_per_host(local_server):
+    """Test the same session is returned for every URL on a host."""
+    first = http_session.get_session(f"{local_server}/a")
+    second = http_session.get_session(f"{local_server}/b?x=1")
+
+    assert first is second
+    assert http_session.get_session("https://api.github.com/repos") is not first
+
+
+def test_connections_are_reused(local_server):
+    """Test sequential requests to one host reuse a single connection."""
+    for _ in range(3):
+        response = http_session.get(f"{local_server}/ping", timeout=5)
+        assert response.status_code == 200
+
+    stats = http_session.get_connection_stats("127.0.0.1")
+    assert stats["requests"] == 3
+    assert stats["new_connections"] == 1
+    assert stats["reused_connections"] == 2
+
+
+def test_keep_alive_disabled_opens_new_connections(local_server, monkeypatch):
+    """Test HTTP_KEEP_ALIVE=false sends Connection: close on every request."""
+    monkeypatch.setenv("HTTP_KEEP_ALIVE", "false")
+    http_session.reset_sessions()
+
+    for _ in range(2):
+        http_session.get(f"{local_server}/ping", timeout=5)
+
+    stats = http_session.get_connection_stats("127.0.0.1")
+    assert stats["new_connections"] == 2
+    assert stats["reused_connections"] == 0
+
+
+def test_host_pool_limits(monkeypatch):
+    """Test per-host pool size overrides are applied."""
+    monkeypatch.setenv("HTTP_POOL_HOST_LIMITS", "dev.azure.com=16, api.github.com=2")
+    http_session.reset_sessions()
+
+    session = http_session.get_session("https://dev.azure.com/org")
+    adapter = session.get_adapter("https://dev.azure.com/org")
+
+    assert adapter._pool_maxsize == 16
+    http_session.reset_sessions()
@@ -0,0 +1,134 @@
+"""
+Unit tests for the async-mode job queue.
+"""
+import time
+from unittest import mock
+
+import pytest
+
+from function_app import ado_client, dedup, job_queue
+from function_app.models import DispatchJob
+
+
+def _resource(description="create a hockey simulator game"):
+    return {
+        "workItemId": 615,
+        "rev": 5,
+        "revisedBy": {"uniqueName": "rustem@example.com", "displayName": "Rustem"},
+        "revision": {
+            "rev": 5,
+            "fields": {
+                "System.Title": "hockey simulator game",
+                "System.Description": description,
+                "System.BoardColumn": "Specification",
+                "Microsoft.VSTS.Common.StackRank": 1999884457.0,
+            },
+        },
+    }
+
+
+def test_build_job_is_compact():
+    """Test only the fields the pipeline needs are carried in the job."""
+    job = job_queue.build_job(615, _resource(), "corr-1")
+
+    assert job.rev == 5
+    assert job.resource["revisedBy"] == {"uniqueName": "rustem@example.com"}
+    assert set(job.resource["revision"]["fields"]) == {"System.Title", "System.Description"}
+
+    # The compact resource still resolves from the payload without ADO calls
+    with mock.patch("function_app.ado_client.get_work_item_revision") as mock_revision:
+        details = ado_client.resolve_work_item_details(615, DispatchJob.from_json(job.to_json()).resource)
+    assert details.source == "payload"
+    assert details.changed_by == "rustem@example.com"
+    mock_revision.assert_not_called()
+
+
+def test_build_job_drops_oversized_revision():
+    """Test huge descriptions are left for the worker to fetch by rev."""
+    job = job_queue.build_job(615, _resource(description="x" * 100_000), "corr-1")
+
+    assert "revision" not in job.resource
+    assert job.rev == 5
+    assert len(job.to_json()) < 1024
+
+
+def test_memory_queue_honors_delay():
+    """Test delayed jobs stay invisible until due."""
+    queue = job_queue.InMemoryJobQueue()
+    queue.enqueue(DispatchJob(work_item_id=1, correlation_id="a"), delay_seconds=0.2)
+    queue.enqueue(DispatchJob(work_item_id=2, correlation_id="b"))
+
+    assert queue.dequeue().work_item_id == 2
+    assert queue.dequeue() is None
+    time.sleep(0.25)
+    assert queue.dequeue().work_item_id == 1
+
+
+def test_sqlite_queue_roundtrip(tmp_path):
+    """Test the SQLite stand-in persists jobs across instances."""
+    path = str(tmp_path / "jobs.sqlite3")
+    job_queue.SqliteJobQueue(path).enqueue(job_queue.build_job(615, _resource(), "corr-1"))
+
+    queue = job_queue.SqliteJobQueue(path)
+    assert len(queue) == 1
+    job = queue.dequeue()
+    assert job.work_item_id == 615
+    assert job.correlation_id == "corr-1"
+    assert len(queue) == 0
+
+
+def test_drain_runs_handler_and_survives_errors():
+    """Test drain processes every job even when the handler raises."""
+    queue = job_queue.InMemoryJobQueue()
+    for wi_id in (1, 2, 3):
+        queue.enqueue(DispatchJob(work_item_id=wi_id, correlation_id=str(wi_id)))
+
+    seen = []
+
+    def handler(job):
+        seen.append(job.work_item_id)
+        if job.work_item_id == 2:
+            raise RuntimeError("boom")
+
+    assert queue.drain(handler) == 3
+    assert seen == [1, 2, 3]
+
+
+def test_get_job_queue_rejects_unknown_backend(monkeypatch):
+    """Test an unknown backend name fails loudly."""
+    monkeypatch.setenv("JOB_QUEUE_BACKEND", "carrier-pigeon")
+    job_queue.reset_job_queue()
+    with pytest.raises(ValueError):
+        job_queue.get_job_queue()
+    job_queue.reset_job_queue()
+
+
+@mock.patch("function_app.ado_client.get_child_issues", return_value=[])
+@mock.patch("function_app.dispatch.http_session.post")
+def test_worker_requeues_retryable_dispatch_failure(mock_post, mock_children, monkeypatch):
+    """Test queued jobs go back on the queue with a delay instead of sleeping."""
+    from function_app import pipeline
+
+    monkeypatch.setenv("GITHUB_OWNER", "test-owner")
+    monkeypatch.setenv("GITHUB_REPO", "test-repo")
+    monkeypatch.setenv("GH_WORKFLOW_DISPATCH_PAT", "test-pat")
+    monkeypatch.setenv("JOB_QUEUE_BACKEND", "memory")
+    job_queue.reset_job_queue()
+    dedup.reset_deduplicator()
+
+    mock_response = mock.Mock()
+    mock_response.status_code = 503
+    mock_response.text = "Service Unavailable"
+    mock_response.headers = {"Retry-After": "0"}
+    mock_post.return_value = mock_response
+
+    queue = job_queue.get_job_queue()
+    success, message = pipeline.process_job(job_queue.build_job(615, _resource(), "corr-1"))
+
+    assert success is False
+    assert message.startswith("retry_scheduled")
+    retried = queue.dequeue()
+    assert retried.attempt == 1
+    assert retried.work_item_id == 615
+    assert retried.resource["revision"]["fields"]["System.Title"] == "hockey simulator game"
+    job_queue.reset_job_queue()
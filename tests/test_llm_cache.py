@@ -0,0 +1,87 @@
+"""
+Unit tests for the on-disk LLM response cache used by the clarification scripts.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".github", "scripts"))
+
+from llm_cache import LLMCache, cache_key  # noqa: E402
+
+
+def test_cache_key_changes_with_template_model_and_inputs():
+    """Test each part of the key changes it, and None inputs count as empty."""
+    key = cache_key("template", "gpt-5-nano", "spec", "q")
+
+    assert key == cache_key("template", "gpt-5-nano", "spec", "q")
+    assert key != cache_key("template v2", "gpt-5-nano", "spec", "q")
+    assert key != cache_key("template", "other-model", "spec", "q")
+    assert key != cache_key("template", "gpt-5-nano", "spec", "q2")
+    assert cache_key("t", "m", None) == cache_key("t", "m", "")
+
+
+def test_set_then_get_round_trips(tmp_path):
+    """Test a stored response is returned and counted as a hit."""
+    cache = LLMCache(str(tmp_path))
+    key = cache_key("t", "m", "input")
+
+    assert cache.get(key) is None
+    cache.set(key, "[{\"topic\": \"a\"}]", model="m")
+
+    assert cache.get(key) == "[{\"topic\": \"a\"}]"
+    assert (tmp_path / key[:2] / f"{key}.json").exists()
+    assert cache.stats() == {"hits": 1, "misses": 1, "writes": 1, "evictions": 0}
+
+
+def test_corrupt_entry_is_a_miss(tmp_path):
+    """Test an unreadable entry is treated as a miss instead of raising."""
+    cache = LLMCache(str(tmp_path))
+    key = cache_key("t", "m", "input")
+    path = tmp_path / key[:2] / f"{key}.json"
+    path.parent.mkdir()
+    path.write_text("{not json")
+
+    assert cache.get(key) is None
+    assert cache.stats()["misses"] == 1
+
+
+def test_eviction_drops_least_recently_used(tmp_path):
+    """Test going over max_bytes deletes the entries read least recently."""
+    cache = LLMCache(str(tmp_path), max_bytes=250)
+    keys = [cache_key("t", "m", str(n)) for n in range(3)]
+    for n, key in enumerate(keys[:2]):
+        cache.set(key, "x" * 50)
+        os.utime(cache._path(key), (1000 + n, 1000 + n))
+    cache.get(keys[0])  # touches keys[0] - keys[1] is now the oldest
+
+    cache.set(keys[2], "x" * 50)
+
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) == "x" * 50
+    assert cache.get(keys[2]) == "x" * 50
+    assert cache.stats()["evictions"] == 1
+
+
+def test_overwriting_a_key_does_not_inflate_size(tmp_path):
+    """Test rewriting the same key replaces its bytes instead of adding to them."""
+    cache = LLMCache(str(tmp_path), max_bytes=10_000)
+    keys = [cache_key("t", "m", str(n)) for n in range(2)]
+    for key in keys:
+        cache.set(key, "x" * 50)
+
+    for _ in range(5):
+        cache.set(keys[0], "x" * 50)
+
+    assert cache._size == sum(size for _, size, _ in cache._entries())
+    assert cache.stats()["evictions"] == 0
+    assert cache.get(keys[1]) == "x" * 50
+
+
+def test_disabled_cache_never_reads_or_writes(tmp_path):
+    """Test a disabled cache is a no-op."""
+    cache = LLMCache(str(tmp_path), enabled=False)
+    cache.set("k" * 64, "content")
+
+    assert cache.get("k" * 64) is None
+    assert list(tmp_path.iterdir()) == []
+    assert cache.summary() == "🗄️  LLM cache: disabled"
@@ -0,0 +1,96 @@
+"""
+Unit tests for per-request stage metrics and latency histograms.
+"""
+import json
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from function_app import metrics
+
+
+@pytest.fixture(autouse=True)
+def clean_metrics():
+    metrics.reset_metrics()
+    yield
+    metrics.reset_metrics()
+
+
+def test_stage_and_count_are_noops_outside_a_request():
+    """Test instrumented code runs normally when no request is tracked."""
+    with metrics.stage("anything"):
+        metrics.count("calls")
+    assert metrics.current() is None
+    assert metrics.snapshot() == {}
+
+
+def test_track_request_records_stages_and_counts(caplog):
+    """Test one structured record per request with accumulated stages and counters."""
+    with caplog.at_level(logging.INFO, logger="function_app.metrics"):
+        with metrics.track_request("spec_dispatch", "corr-1") as request_metrics:
+            with metrics.stage("validate"):
+                time.sleep(0.002)
+            with metrics.stage("validate"):
+                pass
+            metrics.count("github_dispatch_attempts")
+            metrics.count("github_dispatch_attempts")
+            request_metrics.status = 204
+
+    records = [json.loads(r.getMessage()) for r in caplog.records if "request_summary" in r.getMessage()]
+    assert len(records) == 1
+    record = records[0]
+    assert record["correlation_id"] == "corr-1"
+    assert record["status"] == 204
+    assert record["stages_ms"]["validate"] >= 2
+    assert record["calls"] == {"github_dispatch_attempts": 2}
+    assert record["total_ms"] >= record["stages_ms"]["validate"]
+
+    snapshot = metrics.snapshot()
+    assert snapshot["spec_dispatch.total_ms"]["count"] == 1
+    assert snapshot["spec_dispatch.calls.github_dispatch_attempts"]["p50"] == 2
+    assert "spec_dispatch.stage.validate_ms" in snapshot
+
+
+def test_track_request_marks_exceptions():
+    """Test a raising request is still recorded."""
+    with pytest.raises(RuntimeError):
+        with metrics.track_request("spec_dispatch", "corr-2"):
+            raise RuntimeError("boom")
+    assert metrics.snapshot()["spec_dispatch.total_ms"]["count"] == 1
+
+
+def test_histogram_percentiles():
+    """Test nearest-rank percentiles over the sample window."""
+    histogram = metrics.Histogram(window=1000)
+    for value in range(1, 101):
+        histogram.observe(float(value))
+    summary = histogram.summary()
+    assert summary["count"] == 100
+    assert summary["p50"] == 50
+    assert summary["p95"] == 95
+    assert summary["p99"] == 99
+    assert summary["max"] == 100
+    assert summary["mean"] == 50.5
+
+
+def test_histogram_window_keeps_recent_samples():
+    """Test old samples age out of the percentiles but stay in the count."""
+    histogram = metrics.Histogram(window=10)
+    for value in range(100):
+        histogram.observe(float(value))
+    summary = histogram.summary()
+    assert summary["count"] == 100
+    assert summary["p50"] >= 90
+
+
+def test_bind_counts_thread_pool_calls_against_the_request():
+    """Test pool workers wrapped with bind() add to the submitting request."""
+    def fetch(_):
+        metrics.count("http.dev.azure.com")
+
+    with metrics.track_request("spec_dispatch", "corr-3") as request_metrics:
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            list(executor.map(metrics.bind(fetch), range(8)))
+        assert request_metrics.counters["http.dev.azure.com"] == 8
@@ -0,0 +1,108 @@
+"""
+Unit tests for the pre-parse early-reject fast path.
+"""
+import json
+import pytest
+from function_app import prefilter
+from function_app.config import reset_config
+from function_app.validation import reset_rule_engine, validate_event
+
+
+@pytest.fixture(autouse=True)
+def rule_env(monkeypatch):
+    monkeypatch.setenv("AI_USER_MATCH", "AI Teammate")
+    monkeypatch.setenv("SPEC_COLUMN_NAME", "Specification – Doing")
+    monkeypatch.delenv("VALIDATION_RULES", raising=False)
+    monkeypatch.delenv("HOOK_SUBSCRIPTION_IDS", raising=False)
+    reset_config()
+    reset_rule_engine()
+    prefilter.reset_json_backend()
+    yield
+    reset_config()
+    reset_rule_engine()
+    prefilter.reset_json_backend()
+
+
+def _payload(work_item_type="Feature", column="Specification", done=False, event_type="workitem.updated",
+             description="<div>Big HTML</div>"):
+    return {
+        "subscriptionId": "sub-1",
+        "eventType": event_type,
+        "resource": {
+            "workItemId": 123,
+            "fields": {"System.BoardColumn": {"oldValue": "Backlog", "newValue": column}},
+            "revision": {
+                "fields": {
+                    "System.WorkItemType": work_item_type,
+                    "System.AssignedTo": "AI Teammate <ai@example.com>",
+                    "System.BoardColumn": column,
+                    "System.BoardColumnDone": done,
+                    "System.Description": description
+                }
+            }
+        }
+    }
+
+
+def _raw(payload) -> bytes:
+    return json.dumps(payload).encode()
+
+
+def test_matching_delivery_passes():
+    """Test a delivery validate_event accepts is never rejected early."""
+    payload = _payload()
+
+    assert prefilter.quick_reject(_raw(payload)) is None
+    assert validate_event(payload) == (True, "ok")
+
+
+@pytest.mark.parametrize("payload, reason", [
+    (_payload(event_type="workitem.created"), "Invalid event type"),
+    (_payload(work_item_type="Bug"), "Invalid work item type"),
+    (_payload(column="Planning"), "Column mismatch"),
+    (_payload(done=True), "Column state is 'Done'"),
+])
+def test_noise_rejected_before_parse(payload, reason):
+    """Test other types, columns and Done cards are rejected from the raw bytes."""
+    assert reason in prefilter.quick_reject(_raw(payload))
+
+
+def test_ambiguous_or_out_of_window_falls_through(monkeypatch):
+    """Test escaped values, quoted text in descriptions and keys past the scan window are not rejected."""
+    escaped = _raw(_payload(column="Spec–ification")).replace("–".encode(), b"\\u2013")
+    assert prefilter.quick_reject(escaped) is None
+
+    quoted = _payload(description='"System.WorkItemType": "Bug"')
+    quoted["resource"]["revision"]["fields"] = {"System.Description": quoted["resource"]["revision"]["fields"]["System.Description"]}
+    assert prefilter.quick_reject(_raw(quoted)) is None
+
+    monkeypatch.setenv("PREFILTER_SCAN_BYTES", "64")
+    assert prefilter.quick_reject(_raw(_payload(work_item_type="Bug"))) is None
+
+
+def test_subscription_allow_list(monkeypatch):
+    """Test HOOK_SUBSCRIPTION_IDS against the custom header, then the body."""
+    monkeypatch.setenv("HOOK_SUBSCRIPTION_IDS", "sub-1, sub-2")
+
+    assert prefilter.quick_reject(_raw(_payload())) is None
+    assert prefilter.quick_reject(_raw(_payload()), {"X-ADO-Subscription": "sub-2"}) is None
+    assert "Unknown subscription" in prefilter.quick_reject(_raw(_payload()), {"X-ADO-Subscription": "other"})
+
+    other = _payload()
+    other["subscriptionId"] = "other"
+    assert "Unknown subscription" in prefilter.quick_reject(_raw(other))
+
+
+def test_json_backend_selection(monkeypatch):
+    """Test the stdlib fallback and that both backends raise ValueError on bad input."""
+    monkeypatch.setenv("JSON_BACKEND", "json")
+    assert prefilter.json_backend() == "json"
+    assert prefilter.loads(b'{"a": 1}') == {"a": 1}
+    with pytest.raises(ValueError):
+        prefilter.loads(b"{not json")
+
+    prefilter.reset_json_backend()
+    monkeypatch.setenv("JSON_BACKEND", "auto")
+    assert prefilter.json_backend() in ("json", "orjson")
+    with pytest.raises(ValueError):
+        prefilter.loads(b"{not json")
@@ -0,0 +1,57 @@
+"""
+Unit tests for the retry policy.
+"""
+import random
+import time
+from email.utils import formatdate
+
+from function_app.retry import RetryPolicy, is_rate_limited, retry_after_delay
+
+
+def test_backoff_uses_shared_constants():
+    """Test backoff follows RETRY_BACKOFF_DELAYS when jitter is disabled."""
+    policy = RetryPolicy(jitter_ratio=0)
+
+    assert [policy.backoff_delay(a) for a in range(3)] == [2, 6, 14]
+    assert policy.backoff_delay(3) == 28  # Doubles past the end of the table
+    assert policy.can_retry(1) is True
+    assert policy.can_retry(2) is False
+
+
+def test_backoff_jitter_bounds_and_cap():
+    """Test jitter stays within the ratio and delays never exceed max_delay."""
+    policy = RetryPolicy(jitter_ratio=0.5, max_delay=10, rng=random.Random(42))
+
+    for _ in range(50):
+        assert 1.0 <= policy.backoff_delay(0) <= 3.0
+    assert policy.backoff_delay(2) <= 10
+
+
+def test_retry_after_seconds_and_http_date():
+    """Test both Retry-After forms are understood."""
+    assert retry_after_delay({"Retry-After": "30"}) == 30.0
+
+    now = 1_700_000_000
+    delay = retry_after_delay({"Retry-After": formatdate(now + 45, usegmt=True)}, now=now)
+    assert 44 <= delay <= 46
+
+
+def test_rate_limit_reset_only_when_exhausted():
+    """Test X-RateLimit-Reset applies only when no requests remain."""
+    now = 1_700_000_000
+    headers = {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": str(now + 120)}
+
+    assert retry_after_delay(headers, now=now) == 120
+    assert retry_after_delay({"X-RateLimit-Remaining": "12", "X-RateLimit-Reset": str(now + 120)}, now=now) is None
+
+    live_headers = {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": str(int(time.time()) + 120)}
+    assert RetryPolicy(jitter_ratio=0).delay_for(0, live_headers) > 100  # Server hint wins over backoff
+
+
+def test_is_rate_limited():
+    """Test throttling 403s are told apart from permission errors."""
+    assert is_rate_limited(429, {}) is True
+    assert is_rate_limited(403, {"X-RateLimit-Remaining": "0"}) is True
+    assert is_rate_limited(403, {"Retry-After": "60"}) is True
+    assert is_rate_limited(403, {"X-RateLimit-Remaining": "4999"}) is False
+    assert is_rate_limited(404, {"Retry-After": "60"}) is False
@@ -0,0 +1,111 @@
+"""
+Unit tests for multi-target routing.
+"""
+import json
+from unittest import mock
+
+import pytest
+
+from function_app import config, job_queue, routing
+from function_app.dispatch import dispatch_workflow
+from function_app.models import DispatchJob
+from function_app.validation import ValidationRule
+
+
+TABLE = [
+    {"name": "contoso-default", "match": {"project": "Contoso"}, "repo": "contoso/specs"},
+    {"name": "payments", "match": {"project": "Contoso", "area_path": "Contoso\\Payments"},
+     "repo": "contoso/payments", "workflow": "payments-spec.yml", "ref": "release",
+     "inputs": {"board": "{area_path}", "source": "{project}#{work_item_id}"}},
+    {"name": "payments-epics", "match": {"project": "Contoso", "area_path": "Contoso\\Payments", "work_item_type": "Epic"},
+     "repo": "contoso/payments", "workflow": "epic-spec.yml"},
+    {"name": "fabrikam-spec", "match": {"project": "Fabrikam", "column": "Specification – Doing"}, "repo": "fabrikam/specs"},
+]
+
+
+@pytest.fixture(autouse=True)
+def routing_env(monkeypatch):
+    monkeypatch.setenv("ROUTING_TABLE", json.dumps(TABLE))
+    monkeypatch.delenv("ROUTING_TABLE_PATH", raising=False)
+    routing.reset_routing_table()
+    yield
+    routing.reset_routing_table()
+
+
+def _resource(project="Contoso", area_path="Contoso", work_item_type="Feature", column="Specification"):
+    return {
+        "workItemId": 615,
+        "revision": {
+            "rev": 3,
+            "fields": {
+                "System.TeamProject": project,
+                "System.AreaPath": area_path,
+                "System.WorkItemType": work_item_type,
+                "System.BoardColumn": column,
+            }
+        }
+    }
+
+
+def test_most_specific_route_wins():
+    """Test child area paths inherit the deepest configured area, then the most exact keys."""
+    assert routing.resolve_route(615, _resource()).name == "contoso-default"
+    assert routing.resolve_route(615, _resource(area_path="Contoso\\Payments\\Cards")).name == "payments"
+    assert routing.resolve_route(615, _resource(area_path="contoso\\payments", work_item_type="Epic")).name == "payments-epics"
+    assert routing.resolve_route(615, _resource(project="Fabrikam", area_path="Fabrikam")).name == "fabrikam-spec"
+    assert routing.resolve_route(615, _resource(project="Fabrikam", column="Backlog")) is None
+
+
+def test_route_inputs_rendered_and_carried_by_job():
+    """Test the inputs template is filled in and survives the queue round trip."""
+    route = routing.resolve_route(615, _resource(area_path="Contoso\\Payments"))
+    assert route.inputs == {"board": "Contoso\\Payments", "source": "Contoso#615"}
+
+    job = job_queue.build_job(615, _resource(), "corr-1", route=route)
+    assert routing.Route.from_dict(DispatchJob.from_json(job.to_json()).route) == route
+
+
+def test_rule_workflow_used_without_route():
+    """Test a validation rule's workflow applies when no route matches."""
+    rule = ValidationRule("epics", frozenset({"Epic"}), frozenset({"Discovery"}), frozenset({"ai teammate"}), "epic.yml")
+
+    route = routing.resolve_route(615, _resource(project="Other"), rule)
+    assert route.workflow == "epic.yml"
+    assert route.repo is None
+
+
+def test_invalid_repo_rejected(monkeypatch):
+    """Test repos must be owner/name."""
+    monkeypatch.setenv("ROUTING_TABLE", json.dumps([{"name": "bad", "repo": "a/b/c"}]))
+    routing.reset_routing_table()
+
+    with pytest.raises(ValueError):
+        routing.get_routing_table()
+
+
+@pytest.mark.parametrize("inputs", [{"work_item_id": "1"}, {"context_sha256": "x"}, {"board name": "x"}, {"9lives": "x"}])
+def test_invalid_route_inputs_rejected(inputs):
+    """Test route inputs must be valid input names and not shadow the dispatch inputs."""
+    with pytest.raises(ValueError):
+        routing.compile_route({"name": "bad", "inputs": inputs})
+
+
+@mock.patch("function_app.dispatch.http_session.post")
+def test_dispatch_uses_route_target(mock_post, monkeypatch):
+    """Test the route's repo/workflow/ref and inputs reach the dispatch request."""
+    monkeypatch.setenv("GITHUB_OWNER", "default-owner")
+    monkeypatch.setenv("GITHUB_REPO", "default-repo")
+    monkeypatch.setenv("GH_WORKFLOW_DISPATCH_PAT", "test-pat")
+    config.reset_config()
+    mock_post.return_value = mock.Mock(status_code=204)
+
+    route = routing.resolve_route(615, _resource(area_path="Contoso\\Payments"))
+    success, _ = dispatch_workflow(615, "Feature description", route=route)
+
+    assert success is True
+    url = mock_post.call_args.args[0]
+    payload = mock_post.call_args.kwargs["json"]
+    assert url == "https://api.github.com/repos/contoso/payments/actions/workflows/payments-spec.yml/dispatches"
+    assert payload["ref"] == "release"
+    assert payload["inputs"]["board"] == "Contoso\\Payments"
+    assert payload["inputs"]["work_item_id"] == "615"
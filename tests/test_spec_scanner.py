@@ -0,0 +1,80 @@
+"""
+Unit tests for the single-pass [NEEDS CLARIFICATION] marker scanner.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".github", "scripts"))
+
+from spec_scanner import scan_markers  # noqa: E402
+
+SPEC = """# Feature: Audit export
+
+## User Scenarios
+
+Admins export events [NEEDS CLARIFICATION: Which formats are required?] daily.
+
+## Requirements
+
+- FR-001 retention [NEEDS CLARIFICATION: How long should events be kept?]
+  and storage [NEEDS CLARIFICATION: Hot or cool tier?]
+
+---
+
+## Notes
+"""
+
+
+def test_markers_in_order_with_their_sections():
+    """Test every marker is found in order and tagged with the header in effect."""
+    records = list(scan_markers(SPEC))
+
+    assert [r["question"] for r in records] == [
+        "Which formats are required?",
+        "How long should events be kept?",
+        "Hot or cool tier?",
+    ]
+    assert [r["section"] for r in records] == ["User Scenarios", "Requirements", "Requirements"]
+    assert records[0]["context"].endswith("Admins export events")
+
+
+def test_markers_in_one_block_share_its_end():
+    """Test the question block runs to the next horizontal rule or header."""
+    records = list(scan_markers(SPEC))
+
+    assert records[1]["full_block"].endswith("Hot or cool tier?]")
+    assert records[2]["full_block"] == "[NEEDS CLARIFICATION: Hot or cool tier?]"
+    assert records[0]["full_block"].endswith("daily.")
+
+
+def test_copilot_question_block_fields():
+    """Test topic, question text and suggested answers come from a generated question block."""
+    spec = (
+        "## Question 1: Data retention\n\n"
+        "[NEEDS CLARIFICATION: retention?]\n\n"
+        "**What we need to know**: How long are audit events kept?\n\n"
+        "**Suggested Answers**:\n\n| Option | Answer |\n|---|---|\n| A | 30 days |\n\n"
+        "**Your choice**: _\n"
+    )
+    record = next(scan_markers(spec))
+
+    assert record["section"] == "Question 1: Data retention"
+    assert record["question"] == "How long are audit events kept?"
+    assert record["answer_options"].startswith("| Option | Answer |")
+    assert record["topic"] == "retention"
+
+
+def test_topic_falls_back_to_truncated_question():
+    """Test markers outside a question block get the question as topic, cut at 50 chars."""
+    question = "Should exports include events from every region and every tenant?"
+    record = next(scan_markers(f"No header [NEEDS CLARIFICATION: {question}]"))
+
+    assert record["section"] == "Unknown Section"
+    assert record["topic"] == question.replace("?", "")[:50] + "..."
+
+
+def test_marker_on_header_line_uses_header_text_before_it():
+    """Test a marker inside a header line takes only the header text before the marker."""
+    spec = "## Scope\ntext\n## Limits [NEEDS CLARIFICATION: max size?]\n"
+
+    assert next(scan_markers(spec))["section"] == "Limits "
@@ -1,40 +1,63 @@
 """
 Unit tests for validation logic.
 """
+import json
 import os
 import pytest
-from function_app.validation import validate_event
+from function_app.config import reset_config
+from function_app.validation import validate_event, match_event, reset_rule_engine
 
 
-def test_validate_event_happy_path():
-    """Test validation passes for workitem.updated event."""
-    os.environ["AI_USER_MATCH"] = "AI Teammate"
-    os.environ["SPEC_COLUMN_NAME"] = "Specification – Doing"
-    
-    event = {
+@pytest.fixture(autouse=True)
+def rule_env(monkeypatch):
+    """Default single-rule config; rules are recompiled per test."""
+    monkeypatch.setenv("AI_USER_MATCH", "AI Teammate")
+    monkeypatch.setenv("SPEC_COLUMN_NAME", "Specification – Doing")
+    monkeypatch.delenv("VALIDATION_RULES", raising=False)
+    reset_config()
+    reset_rule_engine()
+    yield
+    reset_config()
+    reset_rule_engine()
+
+
+def _event(work_item_type="Feature", assignee=None, column="Specification", done=False):
+    return {
         "eventType": "workitem.updated",
         "resource": {
             "workItemId": 123,
-            "fields": {
-                "System.WorkItemType": "Feature",
-                "System.AssignedTo": {"displayName": "AI Teammate"},
-                "System.BoardColumn": "Specification – Doing"
+            "revision": {
+                "fields": {
+                    "System.WorkItemType": work_item_type,
+                    "System.AssignedTo": assignee if assignee is not None else {"displayName": "AI Teammate"},
+                    "System.BoardColumn": column,
+                    "System.BoardColumnDone": done
+                }
             }
         }
     }
-    
-    is_valid, reason = validate_event(event)
+
+
+def test_validate_event_happy_path():
+    """Test validation passes for workitem.updated event."""
+    is_valid, reason = validate_event(_event())
     assert is_valid is True
     assert reason == "ok"
 
 
+def test_validate_event_string_assignee():
+    """Test "DisplayName <email>" assignees match case-insensitively."""
+    is_valid, reason = validate_event(_event(assignee="ai teammate <ai@example.com>"))
+    assert is_valid is True
+
+
 def test_validate_event_invalid_type():
     """Test validation fails for non-update events."""
     event = {
         "eventType": "workitem.created",
         "resource": {"workItemId": 123}
     }
-    
+
     is_valid, reason = validate_event(event)
     assert is_valid is False
     assert "Invalid event type" in reason
@@ -43,68 +66,71 @@ def test_validate_event_invalid_type():
 def test_validate_event_missing_event_type():
     """Test validation fails when eventType missing."""
     event = {"resource": {"workItemId": 123}}
-    
+
     is_valid, reason = validate_event(event)
     assert is_valid is False
 
 
 def test_validate_event_wrong_work_item_type():
     """Test validation fails for non-Feature work items."""
-    event = {
-        "eventType": "workitem.updated",
-        "resource": {
-            "workItemId": 123,
-            "fields": {
-                "System.WorkItemType": "Bug",
-                "System.AssignedTo": {"displayName": "AI Teammate"},
-                "System.BoardColumn": "Specification – Doing"
-            }
-        }
-    }
-    
-    is_valid, reason = validate_event(event)
+    is_valid, reason = validate_event(_event(work_item_type="Bug"))
     assert is_valid is False
     assert "Invalid work item type" in reason
 
 
 def test_validate_event_wrong_assignee():
     """Test validation fails for wrong assignee."""
-    os.environ["AI_USER_MATCH"] = "AI Teammate"
-    
-    event = {
-        "eventType": "workitem.updated",
-        "resource": {
-            "workItemId": 123,
-            "fields": {
-                "System.WorkItemType": "Feature",
-                "System.AssignedTo": {"displayName": "Human Developer"},
-                "System.BoardColumn": "Specification – Doing"
-            }
-        }
-    }
-    
-    is_valid, reason = validate_event(event)
+    is_valid, reason = validate_event(_event(assignee={"displayName": "Human Developer"}))
     assert is_valid is False
     assert "Assignee mismatch" in reason
 
 
 def test_validate_event_wrong_column():
     """Test validation fails for wrong board column."""
-    os.environ["SPEC_COLUMN_NAME"] = "Specification – Doing"
-    
-    event = {
-        "eventType": "workitem.updated",
-        "resource": {
-            "workItemId": 123,
-            "fields": {
-                "System.WorkItemType": "Feature",
-                "System.AssignedTo": {"displayName": "AI Teammate"},
-                "System.BoardColumn": "Planning – Doing"
-            }
-        }
-    }
-    
-    is_valid, reason = validate_event(event)
+    is_valid, reason = validate_event(_event(column="Planning"))
     assert is_valid is False
     assert "Column mismatch" in reason
 
+
+def test_validate_event_done_column():
+    """Test validation fails once the card is in the Done sub-column."""
+    is_valid, reason = validate_event(_event(done=True))
+    assert is_valid is False
+    assert "Column state is 'Done'" in reason
+
+
+def test_validation_rules_select_workflow(monkeypatch):
+    """Test several rules map types/columns/users to their own workflows."""
+    monkeypatch.setenv("VALIDATION_RULES", json.dumps([
+        {"name": "features", "work_item_types": ["Feature"], "columns": ["Specification – Doing"],
+         "ai_users": ["AI Teammate"], "workflow": "spec-kit-specify.yml"},
+        {"name": "epics", "work_item_types": ["Epic", "Feature"], "columns": ["Discovery"],
+         "ai_users": ["AI Architect", "AI Teammate"], "workflow": "spec-kit-epic.yml"}
+    ]))
+    reset_config()
+    reset_rule_engine()
+
+    rule, reason = match_event(_event())
+    assert rule.name == "features"
+    assert rule.workflow == "spec-kit-specify.yml"
+
+    rule, reason = match_event(_event(work_item_type="Feature", column="Discovery"))
+    assert rule.name == "epics"
+
+    rule, reason = match_event(_event(work_item_type="Epic", assignee={"displayName": "AI Architect"}, column="Discovery"))
+    assert rule.workflow == "spec-kit-epic.yml"
+
+    # Both candidate rules reject - the one that got furthest explains why
+    rule, reason = match_event(_event(work_item_type="Feature", assignee={"displayName": "Human"}, column="Discovery"))
+    assert rule is None
+    assert "Assignee mismatch" in reason
+
+
+def test_validation_rules_require_fields(monkeypatch):
+    """Test incomplete rules are rejected when compiled."""
+    monkeypatch.setenv("VALIDATION_RULES", json.dumps([{"name": "broken", "work_item_types": ["Feature"]}]))
+    reset_config()
+    reset_rule_engine()
+
+    with pytest.raises(ValueError):
+        validate_event(_event())